@@ -50,6 +50,8 @@ setup(
     ],
     extras_require = {
         'setproctitle': ['setproctitle'],
+        'orjson': ['orjson'],
+        'numpy': ['numpy'],
     },
     tests_require = [
         'pytest==5.3.5',
@@ -88,7 +88,7 @@ class SettingsAPI(abc.Mapping, RequestPoller):
         return len(self._cache)
 
 
-    def __init__(self, srvapi, interval=1):
+    def __init__(self, srvapi, interval=1, max_interval=None):
         self._cache = {}
         self._descriptions = {}
         self._converters = {}
@@ -102,7 +102,8 @@ class SettingsAPI(abc.Mapping, RequestPoller):
         self._srvapi = srvapi
         self._on_update = blinker.Signal()
 
-        super().__init__(self._srvapi.rpc.session_get, interval=interval)
+        super().__init__(self._srvapi.rpc.session_get, interval=interval,
+                         max_interval=max_interval)
         self.on_response(self._handle_session_get)
         self.on_error(self._handle_error)
 
@@ -13,6 +13,7 @@ from collections import namedtuple
 
 import blinker
 
+from ..filters import TorrentFilter
 from ..poll import RequestPoller
 from ..utils import const, convert
 
@@ -23,6 +24,9 @@ log = make_logger(__name__)
 TorrentCount = namedtuple('TorrentCount', ('active', 'downloading', 'isolated',
                                            'stopped', 'total', 'uploading'))
 
+# TorrentCount fields that are counted in the torrent list
+_TCOUNT_FILTERS = {field:TorrentFilter(field) for field in ('downloading', 'isolated', 'uploading')}
+
 
 class StatusAPI():
     """Transmission daemon status information"""
@@ -40,6 +44,10 @@ class StatusAPI():
         self._poller_stats.poll(*args, **kwargs)
         self._poller_tcount.poll(*args, **kwargs)
 
+    def report_activity(self, *args, **kwargs):
+        self._poller_stats.report_activity(*args, **kwargs)
+        self._poller_tcount.report_activity(*args, **kwargs)
+
     @property
     def running(self):
         return self._poller_stats.running
@@ -53,8 +61,18 @@ class StatusAPI():
         self._poller_stats.interval = interval
         self._poller_tcount.interval = interval
 
+    @property
+    def max_interval(self):
+        return self._poller_stats.max_interval
+
+    @max_interval.setter
+    def max_interval(self, max_interval):
+        self._poller_stats.max_interval = max_interval
+        self._poller_tcount.max_interval = max_interval
 
-    def __init__(self, srvapi, interval=1):
+
+    def __init__(self, srvapi, interval=1, max_interval=None):
+        self._srvapi = srvapi
         self._session_stats_updated = False
         self._tcounts_updated = False
         self._reset_session_stats()
@@ -62,7 +80,7 @@ class StatusAPI():
         self._on_update = blinker.Signal()
 
         self._poller_stats = RequestPoller(srvapi.rpc.session_stats,
-                                           interval=interval)
+                                           interval=interval, max_interval=max_interval)
         self._poller_stats.on_response(self._handle_session_stats)
         self._poller_stats.on_error(lambda e: log.debug('Ignoring exception: %r', e),
                                     autoremove=False)
@@ -71,7 +89,7 @@ class StatusAPI():
         # request a minimalistic torrent list.
         self._poller_tcount = RequestPoller(srvapi.torrent.torrents,
                                             keys=('rate-down', 'rate-up', 'status'),
-                                            interval=interval)
+                                            interval=interval, max_interval=max_interval)
         self._poller_tcount.on_response(self._handle_torrent_list)
 
     def _reset_session_stats(self):
@@ -128,13 +146,10 @@ class StatusAPI():
                 active=stats['activeTorrentCount']
             )
         if tlist is not None:
-            from ..ttypes import Status
-            ISOLATED = Status.ISOLATED
-            tc_args.update(
-                isolated=len(tuple(filter(lambda t: ISOLATED in t['status'], tlist))),
-                downloading=len(tuple(filter(lambda t: t['rate-down'] > 0, tlist))),
-                uploading=len(tuple(filter(lambda t: t['rate-up'] > 0, tlist)))
-            )
+            # Only torrents that changed since the previous call are matched
+            cache = self._srvapi.torrent.filter_cache
+            for field,tfilter in _TCOUNT_FILTERS.items():
+                tc_args[field] = sum(tfilter.matches(tlist, cache=cache))
         return TorrentCount(**tc_args)
 
     def _get_transfer_rate(self, direction):
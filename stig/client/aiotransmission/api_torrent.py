@@ -9,45 +9,174 @@
 # GNU General Public License for more details
 # http://www.gnu.org/licenses/gpl-3.0.txt
 
+import asyncio
 import base64
+import marshal
 import os
 import time
-from collections import abc
+from collections import OrderedDict, abc
 from string import hexdigits as HEXDIGITS
 
+import blinker
 from natsort import humansorted
 
 from .. import ClientError
 from ..base import TorrentAPIBase
+from ..columns import Columns
 from ..constants import MAX_TORRENT_FILE_SIZE
+from ..filtercache import FilterCache
 from ..filters import FileFilter, TorrentFilter
+from ..sorters import TorrentSorter
 from ..ttypes import Path, SizeInBytes
 from ..utils import URL, Bandwidth, Bool, BoolOrBandwidth, Response
-from .torrent import Torrent, TorrentFields
+from .torrent import CompactRaw, Torrent, TorrentFields, expensive_fields, fields_cost
 
 from ...logging import make_logger  # isort:skip
 log = make_logger(__name__)
 
 
+class TorrentChanges():
+    """
+    Changes to cached torrents
+
+    added:   Set of IDs of new torrents
+    removed: Set of IDs of removed torrents
+    changed: Map IDs of updated torrents to sets of Torrent keys that depend on
+             changed values
+
+    A torrent ID can be in `removed` and `added` if the torrent was replaced.
+    Torrents in `added` are not in `changed`.
+    """
+    def __init__(self):
+        self.added = set()
+        self.removed = set()
+        self.changed = {}
+
+    def add(self, tid):
+        self.changed.pop(tid, None)
+        self.added.add(tid)
+
+    def remove(self, tid):
+        self.changed.pop(tid, None)
+        self.added.discard(tid)
+        self.removed.add(tid)
+
+    def change(self, tid, keys):
+        if keys and tid not in self.added:
+            changed = self.changed
+            if tid in changed:
+                changed[tid].update(keys)
+            else:
+                changed[tid] = set(keys)
+
+    def merge(self, other):
+        """Add changes from `other` TorrentChanges instance"""
+        for tid in other.removed:
+            self.remove(tid)
+        for tid in other.added:
+            self.add(tid)
+        for tid,keys in other.changed.items():
+            self.change(tid, keys)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return '<%s added=%r, removed=%r, changed=%r>' % (
+            type(self).__name__, self.added, self.removed, self.changed)
+
+
+# Torrent keys that TorrentFilter and TorrentSorter can evaluate on columns
+COLUMN_KEYS = frozenset(
+    [spec.column[0] for spec in TorrentFilter.BOOLEAN_FILTERS.values() if spec.column] +
+    [spec.column for spec in TorrentFilter.COMPARATIVE_FILTERS.values() if spec.column] +
+    [key for spec in TorrentSorter.SORTSPECS.values() for key in spec.columns]
+)
+
+
 class _TorrentCache():
-    def __init__(self, raw_torrents=()):
-        self._tdict = {}  # Map torrent IDs to Torrent objects
+    def __init__(self, raw_torrents=(), compact=False, columnar=False):
+        self._tdict = OrderedDict()   # Map torrent IDs to Torrent objects
+        self._hdict = {}              # Map torrent hashes to torrent IDs
+        self._changes = TorrentChanges()
+        self._columns = None
+        self._filter_cache = FilterCache()
+        self.compact = compact
+        self.columnar = columnar
+
+    @property
+    def columnar(self):
+        """Whether numeric values are also stored in columns (see `columns`)"""
+        return self._columns is not None
+
+    @columnar.setter
+    def columnar(self, columnar):
+        if columnar and self._columns is None:
+            self._columns = Columns(COLUMN_KEYS)
+            for tid,t in self._tdict.items():
+                self._columns.add(tid, t)
+        elif not columnar:
+            self._columns = None
+
+    @property
+    def columns(self):
+        """`client.columns.Columns` instance with all cached torrents or None"""
+        return self._columns
+
+    @property
+    def filter_cache(self):
+        """`client.filtercache.FilterCache` instance with all cached torrents"""
+        return self._filter_cache
+
+    @property
+    def compact(self):
+        """Whether raw torrent values are stored as CompactRaw instances"""
+        return self._compact
+
+    @compact.setter
+    def compact(self, compact):
+        self._compact = bool(compact)
+        # Convert raw values of existing torrents in place so nobody ends up
+        # with a stale Torrent object
+        for t in self._tdict.values():
+            if self._compact and not isinstance(t._raw, CompactRaw):
+                t._raw = CompactRaw(t._raw)
+            elif not self._compact and isinstance(t._raw, CompactRaw):
+                t._raw = dict(t._raw)
 
     def update(self, raw_torrents):
+        """Update or add torrents and return TorrentChanges instance"""
         # import time ; start = time.time()
         tdict = self._tdict
+        hdict = self._hdict
+        columns = self._columns
+        filter_cache = self._filter_cache
+        changes = TorrentChanges()
         for rt in raw_torrents:
             tid = rt['id']
+            if 'hashString' in rt:
+                hdict[rt['hashString']] = tid
             if tid in tdict:
                 # Update existing torrent
                 # log.debug('Updating torrent #%d, %d keys: %s', tid, len(rt), tuple(rt))
-                tdict[tid].update(rt)
+                changed_keys = tdict[tid].update(rt)
+                changes.change(tid, changed_keys)
+                if changed_keys:
+                    filter_cache.invalidate(tid, changed_keys)
+                    if columns is not None:
+                        columns.invalidate(tid, changed_keys)
             else:
                 # Add new torrent
                 # log.debug('Adding torrent #%d, %d keys: %s', tid, len(rt), tuple(rt))
-                tdict[tid] = Torrent(rt)
+                t = tdict[tid] = Torrent(CompactRaw(rt) if self._compact else rt)
+                changes.add(tid)
+                filter_cache.add(tid, t)
+                if columns is not None:
+                    columns.add(tid, t)
         # log.debug('Updated %d cached with %d new torrents in %.3fms',
         #           len(tdict), len(raw_torrents), (time.time()-start)*1000)
+        self._changes.merge(changes)
+        return changes
 
     def purge(self, existing_tids):
         """Remove torrents with IDs that are not in `existing_ids`"""
@@ -57,14 +186,79 @@ class _TorrentCache():
         if removed_tids:
             log.debug('Clearing cached torrents: %r', removed_tids)
         for tid in removed_tids:
-            del tdict[tid]
+            self._remove(tid)
+        return removed_tids
+
+    def remove(self, *tids):
+        """Remove torrents with IDs `tids`"""
+        tdict = self._tdict
+        removed_tids = tuple(tid for tid in tids if tid in tdict)
+        if removed_tids:
+            log.debug('Removing cached torrents: %r', removed_tids)
+        for tid in removed_tids:
+            self._remove(tid)
+        return removed_tids
+
+    def _remove(self, tid):
+        t = self._tdict.pop(tid)
+        if 'hash' in t:
+            self._hdict.pop(t['hash'], None)
+        if self._columns is not None:
+            self._columns.remove(tid)
+        self._filter_cache.remove(tid)
+        self._changes.remove(tid)
+
+    def pop_changes(self):
+        """Return TorrentChanges instance with all changes since the previous call"""
+        changes = self._changes
+        self._changes = TorrentChanges()
+        return changes
 
     def get(self, *ids):
-        """Return tuple of Torrent objects"""
+        """
+        Return tuple of Torrent objects
+
+        ids: Torrent IDs or hashes; if not given, all torrents are returned
+
+        Torrents are returned in the same order as `ids` or in the order they
+        were added.  Unknown IDs and hashes are ignored and duplicates are only
+        returned once.
+        """
+        tdict = self._tdict
         if ids:
-            return tuple(t for tid,t in self._tdict.items() if tid in ids)
+            hdict = self._hdict
+            tids = OrderedDict.fromkeys(hdict.get(id) if isinstance(id, str) else id
+                                        for id in ids)
+            return tuple(tdict[tid] for tid in tids if tid in tdict)
         else:
-            return tuple(self._tdict.values())
+            return tuple(tdict.values())
+
+    @property
+    def hashes(self):
+        """Map torrent IDs to hashes of all cached torrents with known hash"""
+        return {tid:h for h,tid in self._hdict.items()}
+
+    def get_raw(self, hashes=None, exclude_fields=()):
+        """
+        Return raw values of all cached torrents by hash
+
+        hashes:         Map torrent IDs to hashes or None to use cached hashes
+        exclude_fields: Sequence of RPC field names that are not returned
+
+        Return dictionary that maps torrent hashes to dictionaries that map RPC
+        field names to raw values.  Torrents may have different fields.
+        Torrents without known hash are ignored.
+        """
+        if hashes is None:
+            hashes = self.hashes
+        exclude_fields = frozenset(exclude_fields)
+        return {hashes[tid]: {field: value for field,value in t._raw.items()
+                              if field not in exclude_fields}
+                for tid,t in self._tdict.items() if tid in hashes}
+
+    def has_fields(self, tlist, fields):
+        """Whether all Torrents in `tlist` have cached values for all RPC `fields`"""
+        return all(field in t._raw for t in tlist for field in fields)
 
     def __len__(self):
         return len(self._tdict)
@@ -75,16 +269,244 @@ class _TorrentCache():
                                         tlist=tlist or '(empty)')
 
 
+# Transmission reports torrents as "recently-active" if they changed in the
+# last 60 seconds (RECENTLY_ACTIVE_SECONDS in libtransmission/rpcimpl.c).  We
+# must request all torrents if our last request is older than that.
+RECENTLY_ACTIVE_MAX_AGE = 50
+
+# Increase this if the format of snapshots changes
+SNAPSHOT_FORMAT = 2
+# Ignore snapshots that are older than this many seconds
+SNAPSHOT_MAX_AGE = 7 * 24 * 3600
+# Don't store these RPC fields in snapshots because they are big and only needed
+# for single torrents, which are requested anyway
+SNAPSHOT_EXCLUDE_FIELDS = ('hashString', 'files', 'fileStats', 'peers', 'pieces',
+                           'priorities', 'wanted')
+
+
 class TorrentAPI(TorrentAPIBase):
     """High-level abstraction of the Transmission RPC protocol"""
 
-    def __init__(self, rpc):
+    def __init__(self, rpc, compact=False, columnar=False):
+        """
+        rpc: TransmissionRPC instance
+        compact: Whether to store raw torrent values as CompactRaw instances,
+                 which needs less memory but is slower
+        columnar: Whether to store numeric values of all torrents in columns to
+                  filter and sort them faster (see `columns`)
+        """
         self.rpc = rpc
-        self._tcache = _TorrentCache()
+        self._tcache = _TorrentCache(compact=compact, columnar=columnar)
+        self._synced_fields = frozenset()  # Up-to-date fields of all cached torrents
+        self._synced_time = float('-inf')  # When all torrents were last requested
+        self._snapshot_version = None  # Daemon version of loaded snapshot
+        self.stale = False
+        self._on_change = blinker.Signal()
+        rpc.on('connected', self._remove_snapshot_of_other_version)
+
+    @property
+    def compact(self):
+        """
+        Whether to store raw torrent values as CompactRaw instances
+
+        This needs less memory per torrent but makes accessing values slower.
+        """
+        return self._tcache.compact
+
+    @compact.setter
+    def compact(self, compact):
+        self._tcache.compact = compact
+
+    @property
+    def columnar(self):
+        """
+        Whether to store numeric values of all cached torrents in columns
+
+        This allows filtering and sorting many torrents at once.
+        """
+        return self._tcache.columnar
+
+    @columnar.setter
+    def columnar(self, columnar):
+        self._tcache.columnar = columnar
+
+    @property
+    def columns(self):
+        """
+        `client.columns.Columns` instance with all cached torrents or None
+
+        This can be passed to the `apply` methods of TorrentFilter and
+        TorrentSorter.
+        """
+        return self._tcache.columns
+
+    @property
+    def filter_cache(self):
+        """
+        `client.filtercache.FilterCache` instance with all cached torrents
+
+        This can be passed to the `apply` method of TorrentFilter.
+        """
+        return self._tcache.filter_cache
+
+    def on_change(self, callback, autoremove=True):
+        """
+        Register `callback` to be called when requested torrents have changed
+
+        `callback` gets the instance of this class.
+
+        If `autoremove` is True, `callback` is removed automatically when it is
+        deleted.
+        """
+        log.debug('Registering %r to receive torrent changes', callback)
+        self._on_change.connect(callback, weak=autoremove)
 
     def clearcache(self):
         """Remove all torrents from cache"""
         self._tcache.purge(existing_tids=())
+        self._synced_fields = frozenset()
+        self.stale = False
+
+    def pop_changes(self):
+        """
+        Return changes to cached torrents since the previous call
+
+        The return value is a TorrentChanges instance with the attributes
+        `added` and `removed` (sets of torrent IDs) and `changed` (maps torrent
+        IDs to sets of keys that depend on changed values).
+        """
+        return self._tcache.pop_changes()
+
+    def cached_torrents(self, keys, tfilter=None):
+        """
+        Return cached torrents without making a request
+
+        keys:    Wanted Torrent keys
+        tfilter: TorrentFilter instance or None for all torrents
+
+        Return tuple of Torrents or None if the values needed by `tfilter` are
+        not cached for all torrents or any of `keys` is not cached for all
+        matching torrents.
+        """
+        tcache = self._tcache
+        synced_fields = self._synced_fields
+        tlist = tcache.get()
+        if tfilter is not None:
+            filter_fields = TorrentFields(*tfilter.needed_keys)
+            if not (synced_fields.issuperset(filter_fields) or
+                    tcache.has_fields(tlist, filter_fields)):
+                return None
+            tlist = tuple(tfilter.apply(tlist, columns=tcache.columns,
+                                        cache=tcache.filter_cache))
+        fields = TorrentFields(*keys)
+        if not (synced_fields.issuperset(fields) or tcache.has_fields(tlist, fields)):
+            return None
+        return tlist
+
+    async def save_snapshot(self, path):
+        """
+        Write cached torrents to file `path`
+
+        All cached fields of each torrent are saved except for
+        SNAPSHOT_EXCLUDE_FIELDS.  Torrents are stored by hash because torrent
+        IDs change when the daemon restarts.  If hashes aren't cached, they are
+        requested.
+
+        Return True on success, False otherwise.
+        """
+        if not len(self._tcache) or not self.rpc.connected:
+            log.debug('Not writing snapshot: No cached torrents or not connected')
+            return False
+
+        hashes = self._tcache.hashes
+        if len(hashes) >= len(self._tcache):
+            hashes = None
+        else:
+            try:
+                raw_tlist = await self.rpc.torrent_get(fields=('id', 'hashString'))
+            except ClientError as e:
+                log.debug('Not writing snapshot: %s', e)
+                return False
+            hashes = {rt['id']: rt['hashString'] for rt in raw_tlist}
+
+        snapshot = {'format': SNAPSHOT_FORMAT,
+                    'url': self.rpc.url,
+                    'version': self.rpc.version,
+                    'time': time.time(),
+                    'torrents': self._tcache.get_raw(hashes, exclude_fields=SNAPSHOT_EXCLUDE_FIELDS)}
+        # Write to temporary file first so we don't leave a broken snapshot
+        tmppath = path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmppath, 'wb') as f:
+                marshal.dump(snapshot, f)
+            os.replace(tmppath, path)
+        except (OSError, ValueError) as e:
+            log.debug('Failed to write snapshot %r: %r', path, e)
+            return False
+        else:
+            log.debug('Wrote snapshot of %d torrents to %r', len(snapshot['torrents']), path)
+            return True
+
+    def load_snapshot(self, path):
+        """
+        Add torrents from snapshot file `path` (see `save_snapshot`) to cache
+
+        Snapshots that were written for a different daemon, by an incompatible
+        version or more than SNAPSHOT_MAX_AGE seconds ago are removed.  If we
+        are not connected yet, the daemon version is checked when we connect.
+
+        Loaded torrents are marked as `stale` until all torrents are requested.
+        Torrent IDs from a snapshot may be wrong, so requesting torrents by ID
+        fails while `stale` is True.
+
+        Return True if any torrents were loaded, False otherwise.
+        """
+        try:
+            with open(path, 'rb') as f:
+                snapshot = marshal.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            error = 'Unreadable: %r' % e
+        else:
+            error = self._validate_snapshot(snapshot)
+
+        if error is not None:
+            log.debug('Removing snapshot %r: %s', path, error)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False
+
+        start = time.time()
+        self._tcache.update(dict(raw, hashString=hash)
+                            for hash,raw in snapshot['torrents'].items())
+        self._snapshot_version = snapshot['version']
+        self.stale = True
+        log.debug('Loaded snapshot of %d torrents in %.3fms',
+                  len(snapshot['torrents']), (time.time() - start) * 1e3)
+        return len(snapshot['torrents']) > 0
+
+    def _validate_snapshot(self, snapshot):
+        # Return error message or None if `snapshot` can be used
+        if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+            return 'Incompatible format'
+        elif snapshot['url'] != self.rpc.url:
+            return 'Different daemon: %s' % snapshot['url']
+        elif self.rpc.version is not None and snapshot['version'] != self.rpc.version:
+            return 'Different daemon version: %s' % snapshot['version']
+        elif time.time() - snapshot['time'] > SNAPSHOT_MAX_AGE:
+            return 'Too old'
+
+    def _remove_snapshot_of_other_version(self, rpc):
+        # The daemon version is unknown until we are connected
+        if self.stale and self._snapshot_version != rpc.version:
+            log.debug('Removing torrents from snapshot of daemon version %s',
+                      self._snapshot_version)
+            self.clearcache()
+            self._on_change.send(self)
 
     @staticmethod
     async def _request(method, *args, **kwargs):
@@ -221,18 +643,27 @@ class TorrentAPI(TorrentAPIBase):
         """
         Make 'torrent-get' RPC request
 
+        `ids` may also be the string "recently-active" to request only
+        torrents that changed recently.  Torrents that were removed recently
+        are removed from the cache.
+
         Return a Response object with 'raw_torrents' set to a tuple of torrents
         according to the RPC spec.
         """
-        from time import time
-        start = time()
+        start = time.time()
 
         if 'id' not in fields:
             fields = ('id',) + tuple(fields)
+        removed_tids = ()
         try:
             if ids is None:
                 # Request all IDs
                 raw_tlist = await self.rpc.torrent_get(fields=fields)
+            elif ids == 'recently-active':
+                # Request torrents that changed since they were last requested
+                response = await self.rpc.torrent_get(fields=fields, ids=ids)
+                raw_tlist = response['torrents']
+                removed_tids = response['removed']
             else:
                 if len(ids) > 0:
                     # Request given IDs
@@ -243,17 +674,42 @@ class TorrentAPI(TorrentAPIBase):
         except ClientError as e:
             return Response(success=False, raw_torrents=(), errors=(str(e),))
         else:
-            self._tcache.update(raw_tlist)
+            request_time = time.time() - start
+            cpu_start = time.process_time()
+
+            # Torrents from a snapshot may have different IDs now
+            if ids is None and self.stale:
+                self._tcache.purge(existing_tids=())
+                self.stale = False
+
+            changed = bool(self._tcache.update(raw_tlist))
 
             # If we just got a list of all torrents, we can check for torrents
             # that we still have cached but don't exist anymore and purge them.
             if ids is None:
                 tids = tuple(t['id'] for t in raw_tlist)
-                self._tcache.purge(existing_tids=tids)
-
-            log.debug('Requested %d torrents in %.3fms', len(raw_tlist), (time() - start) * 1e3)
+                changed = bool(self._tcache.purge(existing_tids=tids)) or changed
+            elif removed_tids:
+                changed = bool(self._tcache.remove(*removed_tids)) or changed
+
+            # Remember which fields are up to date for every cached torrent so
+            # we know if recently active torrents are enough next time.
+            if ids is None or ids == 'recently-active':
+                self._synced_fields = frozenset(fields)
+                self._synced_time = asyncio.get_event_loop().time()
+
+            log.debug('Requested %d %storrents in %.3fms, caching took %.3fms CPU time',
+                      len(raw_tlist), 'recently active ' if ids == 'recently-active' else '',
+                      request_time * 1e3, (time.process_time() - cpu_start) * 1e3)
+            if changed:
+                self._on_change.send(self)
             return Response(success=True, raw_torrents=raw_tlist)
 
+    def _can_request_recently_active(self, fields):
+        """Whether cached torrents only need to be updated with recently active torrents"""
+        return (self._synced_fields.issuperset(fields) and
+                asyncio.get_event_loop().time() - self._synced_time < RECENTLY_ACTIVE_MAX_AGE)
+
     def _get_torrents_from_cache(self, ids):
         """
         Get torrents from internal cache without making a request
@@ -273,29 +729,48 @@ class TorrentAPI(TorrentAPIBase):
             tlist = self._tcache.get(*ids)
 
             # Provide error for requested IDs that don't exist
-            existing_ids = tuple(t['id'] for t in tlist)
-            for tid in ids:
-                if tid not in existing_ids:
-                    errors.append('No torrent with ID: %d' % tid)
+            if len(tlist) < len(ids):
+                existing_ids = set(t['id'] for t in tlist)
+                for tid in ids:
+                    if tid not in existing_ids:
+                        errors.append('No torrent with ID: %d' % tid)
 
         # Success if we found any torrents or no torrents were requested
         success = len(tlist) > 0 or not ids
         log.debug('Got %d cached torrents in %.3fms', len(tlist), (time() - start) * 1e3)
         return Response(success=success, torrents=tlist, errors=errors)
 
-    async def _get_torrents_by_ids(self, keys, ids=None, from_cache=False):
+    async def _get_torrents_by_ids(self, keys, ids=None, from_cache=False, recently_active=False):
         """
         Return a Response object with 'torrents' set to a tuple of Torrents
 
-        keys:       'ALL' for all supported Torrent keys or a sequence of key
-                    strings (see client.ttypes.TYPES for available keys)
-        ids:        None for all torrents or a sequence of wanted IDs
-        from_cache: Whether to try to get the torrents from a previous request
+        keys:            'ALL' for all supported Torrent keys or a sequence of key
+                         strings (see client.ttypes.TYPES for available keys)
+        ids:             None for all torrents or a sequence of wanted IDs
+        from_cache:      Whether to try to get the torrents from a previous request
+        recently_active: Whether to request only recently active torrents if
+                         `ids` is None and the cache has all other torrents
         """
         if keys == 'ALL':
             fields = TorrentFields(keys)
         else:
             fields = TorrentFields(*keys)
+        return await self._get_torrents_by_fields(fields, ids, from_cache=from_cache,
+                                                  recently_active=recently_active)
+
+    async def _get_torrents_by_fields(self, fields, ids=None, from_cache=False, recently_active=False):
+        """
+        Same as `_get_torrents_by_ids`, but with a sequence of RPC `fields`
+
+        Only `fields` are requested, but the returned torrents provide all
+        cached values.
+        """
+        if self.stale:
+            # Torrents from a snapshot may have different IDs now
+            if ids:
+                return Response(success=False, torrents=(),
+                                errors=('Torrent list is not up to date yet',))
+            from_cache = False
 
         if from_cache:
             response = self._get_torrents_from_cache(ids)
@@ -313,7 +788,10 @@ class TorrentAPI(TorrentAPIBase):
             else:
                 log.debug('Some fields are missing from torrent - enforcing request')
 
-        response = await self._request_torrents(fields, ids)
+        if recently_active and ids is None and self._can_request_recently_active(fields):
+            response = await self._request_torrents(fields, 'recently-active')
+        else:
+            response = await self._request_torrents(fields, ids)
         if not response.success:
             return Response(success=False, torrents=(), errors=response.errors)
         else:
@@ -338,24 +816,47 @@ class TorrentAPI(TorrentAPIBase):
 
             tlist = ()
 
-            # Request all torrents with the keys needed to filter them
-            log.debug('Requesting full list with filter keys: %s', tfilter.needed_keys)
-            response = await self._get_torrents_by_ids(keys=tfilter.needed_keys,
-                                                       from_cache=from_cache)
+            # Request all torrents with the fields needed to filter them and
+            # any other fields only for matching torrents.  Filters that need
+            # expensive fields (see FIELD_COSTS) are only applied to torrents
+            # that match the other filters.
+            filter_fields = TorrentFields(*tfilter.needed_keys)
+            wanted_fields = TorrentFields(keys) if keys == 'ALL' else TorrentFields(*keys)
+            cheap_keys = tuple(key for key in tfilter.needed_keys
+                               if not expensive_fields(TorrentFields(key)))
+            narrowing_filter = tfilter.relaxed(cheap_keys)
+            if narrowing_filter == TorrentFilter():
+                # Every torrent could match without the expensive fields
+                narrowing_filter = tfilter
+            narrowing_fields = TorrentFields(*narrowing_filter.needed_keys)
+            deferred_fields = (filter_fields + wanted_fields) - narrowing_fields
+            log.debug('Requesting full list with filter fields: %s', narrowing_fields)
+            response = await self._get_torrents_by_fields(narrowing_fields, from_cache=from_cache)
             if not response.success:
                 return Response(success=False, torrents=(), errors=response.errors)
             else:
-                # Find IDs of torrents that match tfilter
-                wanted_ids = tuple(t['id'] for t in tfilter.apply(response.torrents))
+                # Find IDs of torrents that match tfilter or may match it
+                wanted_ids = tuple(t['id'] for t in narrowing_filter.apply(response.torrents,
+                                                                           columns=self._tcache.columns,
+                                                                           cache=self._tcache.filter_cache))
                 log.debug('Wanted IDs: %s', wanted_ids)
-                if len(wanted_ids) > 0:
-                    # Get only wanted torrents with all wanted keys
-                    response = await self._get_torrents_by_ids(keys, wanted_ids,
-                                                               from_cache=from_cache)
+                self._log_fetch_plan(tfilter, ((narrowing_fields, len(response.torrents)),
+                                               (deferred_fields, len(wanted_ids))),
+                                     filter_fields + wanted_fields)
+                if len(wanted_ids) > 0 and deferred_fields:
+                    # Get only wanted torrents with remaining fields
+                    response = await self._get_torrents_by_fields(deferred_fields, wanted_ids,
+                                                                  from_cache=from_cache)
                     if not response.success:
                         return Response(success=False, torrents=(), errors=response.errors)
                     else:
                         tlist = tuple(response.torrents)
+                elif len(wanted_ids) > 0:
+                    # Filter fields include all wanted fields
+                    tlist = self._get_torrents_from_cache(wanted_ids).torrents
+
+                if narrowing_filter is not tfilter:
+                    tlist = tuple(tfilter.apply(tlist))
 
             success = len(tlist) > 0
             msgs = errors = ()
@@ -366,14 +867,30 @@ class TorrentAPI(TorrentAPIBase):
                         (len(tlist), tfilter, '' if len(tlist) == 1 else 's'),)
             return Response(success=success, torrents=tlist, msgs=msgs, errors=errors)
 
-    async def torrents(self, torrents=None, keys='ALL', from_cache=False):
+    @staticmethod
+    def _log_fetch_plan(tfilter, plan, all_fields):
+        # `plan` is a sequence of (fields, number of torrents) tuples; costs are
+        # estimated in units of one simple field for one torrent
+        cost = sum(count * fields_cost(fields) for fields,count in plan)
+        single_cost = plan[0][1] * fields_cost(all_fields)
+        log.debug('Fetch plan for %s: %s; estimated cost is %d instead of %d',
+                  tfilter, ', '.join('%s for %d torrents' % (','.join(sorted(fields)) or 'nothing', count)
+                                     for fields,count in plan),
+                  cost, single_cost)
+
+    async def torrents(self, torrents=None, keys='ALL', from_cache=False, recently_active=False):
         """
         Get torrents
 
-        torrents:   Sequence of torrent IDs, TorrentFilter object (or its string
-                    representation) or None for all torrents
-        keys:       tuple of Torrent keys to fetch or 'ALL' for all torrents
-        from_cache: Whether to try to get the torrents from a previous request
+        torrents:        Sequence of torrent IDs, TorrentFilter object (or its string
+                         representation) or None for all torrents
+        keys:            tuple of Torrent keys to fetch or 'ALL' for all torrents
+        from_cache:      Whether to try to get the torrents from a previous request
+        recently_active: Whether to request only torrents that changed recently
+                         and get all other torrents from cache; this is only
+                         possible if `torrents` is None and all torrents were
+                         requested with the same or more keys less than a minute
+                         ago, otherwise all torrents are requested
 
         Return Response with the following properties:
             torrents: Tuple of Torrent objects with requested torrents
@@ -382,7 +899,10 @@ class TorrentAPI(TorrentAPIBase):
             errors:   List of error messages
         """
         if torrents is None:
-            return await self._get_torrents_by_ids(keys, from_cache=from_cache)
+            return await self._get_torrents_by_ids(keys, from_cache=from_cache,
+                                                   recently_active=recently_active)
+        elif recently_active:
+            raise ValueError('Only all torrents can be requested as recently active: %r' % (torrents,))
         elif isinstance(torrents, (str, TorrentFilter)):
             return await self._get_torrents_by_filter(keys, tfilter=torrents,
                                                       from_cache=from_cache)
@@ -0,0 +1,92 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details
+# http://www.gnu.org/licenses/gpl-3.0.txt
+
+"""
+JSON decoding with the fastest available library
+
+Requests are always encoded with the standard library because they are small
+and may contain tuple and float subclasses that other libraries reject.
+"""
+
+import json
+from collections import namedtuple
+
+from ...logging import make_logger  # isort:skip
+log = make_logger(__name__)
+
+
+Codec = namedtuple('Codec', ('name', 'loads'))
+Codec.__doc__ = """
+JSON implementation
+
+name: Name of the implementation
+loads: Callable that takes UTF-8 encoded bytes and returns the decoded object
+"""
+
+_codecs = {}
+_preferred = []
+
+
+def register(name, loads):
+    """
+    Make JSON implementation available under `name`
+
+    Codecs that are registered later are preferred by `get`.
+    """
+    _codecs[name] = Codec(name, loads)
+    if name in _preferred:
+        _preferred.remove(name)
+    _preferred.insert(0, name)
+
+
+def get(name=None):
+    """
+    Return registered Codec instance
+
+    name: Name of the codec or None for the preferred codec
+
+    Raise ValueError if there is no codec registered as `name`.
+    """
+    if name is None:
+        name = _preferred[0]
+    try:
+        return _codecs[name]
+    except KeyError:
+        raise ValueError('Unknown JSON codec: %r' % (name,))
+
+
+def names():
+    """Names of registered codecs, preferred codec first"""
+    return tuple(_preferred)
+
+
+def _stdlib_loads(body):
+    # json.loads() only accepts bytes since Python 3.6
+    return json.loads(body.decode('utf-8'))
+
+
+register('json', loads=_stdlib_loads)
+
+try:
+    import ujson
+except ImportError:
+    pass
+else:
+    register('ujson', loads=ujson.loads)
+
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    register('orjson', loads=orjson.loads)
+
+log.debug('Available JSON codecs: %s', ', '.join(names()))
@@ -13,6 +13,7 @@
 
 import asyncio
 import json
+import time
 import warnings
 
 import async_timeout
@@ -20,6 +21,7 @@ from blinker import Signal
 
 from ..errors import AuthError, ClientError, ConnectionError, RPCError, TimeoutError
 from ..utils import URL
+from . import codec
 
 from ...logging import make_logger  # isort:skip
 log = make_logger(__name__)
@@ -29,6 +31,11 @@ AUTH_ERROR_CODE = 401
 CSRF_ERROR_CODE = 409
 CSRF_HEADER = 'X-Transmission-Session-Id'
 TIMEOUT = 10
+MAX_REQUESTS = 4
+
+# Responses with more bytes are decoded in a thread so they don't block the
+# event loop
+EXECUTOR_DECODE_SIZE = 1024 * 1024
 
 
 class TransmissionRPC():
@@ -42,7 +49,8 @@ class TransmissionRPC():
     """
 
     def __init__(self, host='localhost', port=9091, *, tls=False, user='',
-                 password='', path='/transmission/rpc', enabled=True):
+                 password='', path='/transmission/rpc', enabled=True,
+                 max_requests=MAX_REQUESTS, json_codec=None):
         self.host = host
         self.port = port
         self.path = path
@@ -53,10 +61,13 @@ class TransmissionRPC():
         self._session = None
         self._enabled_event = asyncio.Event()
         self.enabled = enabled
-        self._request_lock = asyncio.Lock()
+        self.max_requests = max_requests
+        self.json_codec = json_codec
         self._connecting_lock = asyncio.Lock()
         self._connection_tested = False
         self._connection_exception = None
+        self._requests_in_flight = 0
+        self._disconnect_reason = None
         self._timeout = TIMEOUT
         self._version = None
         self._rpcversion = None
@@ -252,6 +263,40 @@ class TransmissionRPC():
     def timeout(self, timeout):
         self._timeout = float(timeout)
 
+    @property
+    def max_requests(self):
+        """
+        Maximum number of requests that are sent in parallel
+
+        Any further requests wait until one of the ongoing requests is finished.
+        All requests share the same connection; only connecting is serialized.
+        """
+        return self._max_requests
+
+    @max_requests.setter
+    def max_requests(self, max_requests):
+        max_requests = int(max_requests)
+        if max_requests < 1:
+            raise ValueError('Maximum number of requests must be at least 1: %r' % (max_requests,))
+        self._max_requests = max_requests
+        # Requests that are already waiting for the previous semaphore are
+        # still handled by it.
+        self._request_semaphore = asyncio.Semaphore(max_requests)
+
+    @property
+    def json_codec(self):
+        """
+        Name of the JSON implementation (see `codec.names`)
+
+        Setting this to None picks the fastest available implementation.
+        """
+        return self._codec.name
+
+    @json_codec.setter
+    def json_codec(self, name):
+        self._codec = codec.get(name)
+        log.debug('Using JSON codec: %s', self._codec.name)
+
     @property
     def enabled(self):
         """
@@ -361,6 +406,23 @@ class TransmissionRPC():
                       reason if reason is not None else 'for no reason')
             self._on_disconnected.send(self)
 
+    async def _autoconnect(self, method):
+        # Parallel requests must not reconnect while another request is
+        # connecting.  There is no `await` between checking the lock and
+        # calling connect(), so only the first request ends up connecting.
+        if self._connecting_lock.locked():
+            log.debug('Waiting for ongoing connection attempt for %r', method)
+            async with self._connecting_lock:
+                pass
+            if self.connected:
+                return
+            elif self._connection_exception is not None:
+                raise self._connection_exception
+
+        if not self.connected:
+            log.debug('Autoconnecting for %r', method)
+            await self.connect()
+
     async def _reset(self):
         if self._session is not None:
             await self._session.close()
@@ -369,9 +431,20 @@ class TransmissionRPC():
         self._rpcversion = None
         self._rpcversionmin = None
         self._connection_tested = False
+        self._disconnect_reason = None
+
+    async def _disconnect_after_failure(self):
+        # Parallel requests share the connection, so a failed request only
+        # disconnects when all other requests are finished
+        if self._requests_in_flight == 0 and self._disconnect_reason is not None:
+            reason = self._disconnect_reason
+            self._disconnect_reason = None
+            if self.connected:
+                await self.disconnect(reason)
 
     async def _post(self, data):
         async with async_timeout.timeout(self.timeout):
+            start = time.monotonic()
             response = await self._session.post(self.url, data=data, headers=self._headers)
 
             if response.status == CSRF_ERROR_CODE:
@@ -389,14 +462,25 @@ class TransmissionRPC():
                 raise AuthError(self.url)
 
             else:
-                import aiohttp
+                body = await response.read()
+                network_time = time.monotonic() - start
                 try:
-                    answer = await response.json()
-                except aiohttp.ClientResponseError:
+                    answer = await self._decode(body)
+                except ValueError:
                     raise RPCError('Server sent malformed JSON: %s' % await response.text())
                 else:
+                    log.debug('Received %d bytes from %s in %.3fms, decoding took %.3fms',
+                              len(body), self.url, network_time * 1e3,
+                              (time.monotonic() - start - network_time) * 1e3)
                     return answer
 
+    async def _decode(self, body):
+        if len(body) > EXECUTOR_DECODE_SIZE:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self._codec.loads, body)
+        else:
+            return self._codec.loads(body)
+
     async def _send_request(self, post_data):
         """
         Send RPC POST request to daemon
@@ -404,7 +488,9 @@ class TransmissionRPC():
         post_data: Any valid RPC request as JSON string
 
         If applicable, returns response['arguments']['torrents'] or
-        response['arguments'], otherwise response.
+        response['arguments'], otherwise response.  If
+        response['arguments'] also contains 'removed' (i.e. "recently-active"
+        torrents were requested), response['arguments'] is returned.
 
         Raises ClientError.
         """
@@ -427,7 +513,7 @@ class TransmissionRPC():
                 raise RPCError(answer['result'].capitalize())
             else:
                 if 'arguments' in answer:
-                    if 'torrents' in answer['arguments']:
+                    if 'torrents' in answer['arguments'] and 'removed' not in answer['arguments']:
                         return answer['arguments']['torrents']
                     else:
                         return answer['arguments']
@@ -449,27 +535,38 @@ class TransmissionRPC():
         async def request(arguments=None, **kwargs):
             arguments = arguments or {}
 
-            async with self._request_lock:
+            async with self._request_semaphore:
                 if not self.connected:
-                    log.debug('Autoconnecting for %r', method)
-                    await self.connect()
+                    await self._autoconnect(method)
 
                 arguments.update(**kwargs)
                 rpc_request = json.dumps({'method'    : method.replace('_', '-'),
                                           'arguments' : arguments})
 
+                self._requests_in_flight += 1
                 try:
-                    return await self._send_request(rpc_request)
+                    response = await self._send_request(rpc_request)
                 except ClientError as e:
-                    log.debug('Caught ClientError in %r request: %r', method, e)
+                    error = e
+                else:
+                    error = None
+                finally:
+                    self._requests_in_flight -= 1
+
+                if error is None:
+                    await self._disconnect_after_failure()
+                    return response
+                else:
+                    log.debug('Caught ClientError in %r request: %r', method, error)
 
                     # RPCError does not mean host is unreachable, there was just a
                     # misunderstanding, so we're still connected.
-                    if not isinstance(e, RPCError) and self.connected:
-                        await self.disconnect(str(e))
+                    if not isinstance(error, RPCError):
+                        self._disconnect_reason = str(error)
+                    await self._disconnect_after_failure()
 
-                    self._on_error.send(self, error=e)
-                    raise
+                    self._on_error.send(self, error=error)
+                    raise error
 
         request.__name__ = method
         request.__qualname__ = method
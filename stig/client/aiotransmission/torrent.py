@@ -11,8 +11,11 @@
 
 """Torrent class and value modifiers for compatibility with ttypes"""
 
+import operator
 import os
 import time
+from collections import abc
+from itertools import compress, count
 
 from .. import base, ttypes
 from ..utils import LazyDict
@@ -103,14 +106,15 @@ def _is_isolated(t):
     # Torrent has trackers?
     trackerStats = t['trackerStats']
     if trackerStats:
-        # Did we try to connect to a tracker?
-        if any(tracker['hasAnnounced'] for tracker in trackerStats):
-            # Did at least one tracker respond?
-            if any(tracker['lastAnnounceSucceeded'] for tracker in trackerStats):
+        # Did at least one tracker respond?  Otherwise, did we try to connect
+        # to a tracker?  If we didn't try yet, assume non-isolation.
+        has_announced = False
+        for tracker in trackerStats:
+            if tracker['lastAnnounceSucceeded']:
                 return False
-        # We didn't try yet; assume non-isolation
-        else:
-            return False
+            if tracker['hasAnnounced']:
+                has_announced = True
+        return has_announced
     return True  # No way to find any peers
 
 
@@ -135,10 +139,20 @@ def _find_error(t):
     return ''
 
 
-def _status(t):
-    Status = ttypes.Status
-    statuses = []
+_STATUS_BITS = ttypes.Status.BITS
+_STATUS_STOPPED   = _STATUS_BITS[ttypes.Status.STOPPED]
+_STATUS_VERIFY    = _STATUS_BITS[ttypes.Status.VERIFY]
+_STATUS_QUEUED    = _STATUS_BITS[ttypes.Status.QUEUED]
+_STATUS_ISOLATED  = _STATUS_BITS[ttypes.Status.ISOLATED]
+_STATUS_INIT      = _STATUS_BITS[ttypes.Status.INIT]
+_STATUS_DOWNLOAD  = _STATUS_BITS[ttypes.Status.DOWNLOAD]
+_STATUS_UPLOAD    = _STATUS_BITS[ttypes.Status.UPLOAD]
+_STATUS_CONNECTED = _STATUS_BITS[ttypes.Status.CONNECTED]
+_STATUS_SEED      = _STATUS_BITS[ttypes.Status.SEED]
+_STATUS_IDLE      = _STATUS_BITS[ttypes.Status.IDLE]
 
+def _status(t):
+    """Return bitmask for ttypes.Status"""
     # RPC values for 'status' field:
     # TR_STATUS_STOPPED        = 0, /* Torrent is stopped */
     # TR_STATUS_CHECK_WAIT     = 1, /* Queued to check files */
@@ -149,35 +163,34 @@ def _status(t):
     # TR_STATUS_SEED           = 6  /* Seeding */
     t_status = t['status']
     if t_status == 0:
-        statuses.append(Status.STOPPED)
-    elif t_status in (1, 2):
-        statuses.append(Status.VERIFY)
+        return _STATUS_STOPPED | _STATUS_IDLE
+
+    bits = 0
+    if t_status in (1, 2):
+        bits |= _STATUS_VERIFY
     if t_status in (1, 3, 5):
-        statuses.append(Status.QUEUED)
+        bits |= _STATUS_QUEUED
 
-    if Status.STOPPED not in statuses:
-        if _is_isolated(t):
-            statuses.append(Status.ISOLATED)
-        if t['metadataPercentComplete'] < 1:
-            statuses.append(Status.INIT)
+    if _is_isolated(t):
+        bits |= _STATUS_ISOLATED
+    if t['metadataPercentComplete'] < 1:
+        bits |= _STATUS_INIT
 
-        if Status.QUEUED not in statuses:
-            if t['peersConnected'] > 0:
-                if t['rateDownload'] > 0:
-                    statuses.append(Status.DOWNLOAD)
-                if t['rateUpload'] > 0:
-                    statuses.append(Status.UPLOAD)
-                statuses.append(Status.CONNECTED)
+    if not bits & _STATUS_QUEUED:
+        if t['peersConnected'] > 0:
+            if t['rateDownload'] > 0:
+                bits |= _STATUS_DOWNLOAD
+            if t['rateUpload'] > 0:
+                bits |= _STATUS_UPLOAD
+            bits |= _STATUS_CONNECTED
 
-            if t['percentDone'] >= 1:
-                statuses.append(Status.SEED)
+        if t['percentDone'] >= 1:
+            bits |= _STATUS_SEED
 
-    if all(x not in statuses for x in (Status.UPLOAD,
-                                       Status.DOWNLOAD,
-                                       Status.VERIFY)):
-        statuses.append(Status.IDLE)
+    if not bits & (_STATUS_UPLOAD | _STATUS_DOWNLOAD | _STATUS_VERIFY):
+        bits |= _STATUS_IDLE
 
-    return statuses
+    return bits
 
 
 class TorrentFileID(tuple):
@@ -195,93 +208,372 @@ class TorrentFileID(tuple):
     def __repr__(self):
         return 'TorrentFileID(torrent_id=%d, file_id=%d)' % self
 
-class TorrentFileTree(base.TorrentFileTreeBase):
-    @classmethod
-    def create(cls, raw_torrent):
+
+class TorrentFileIDs(tuple):
+    """Tuple of TorrentFileIDs that computes its hash only once"""
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = super().__hash__()
+            return self._hash
+
+class _FlatFiles():
+    """
+    Values of a torrent's files in flat lists indexed by file index
+
+    TorrentFile instances are only created when they are needed and only
+    updated if their values change.
+    """
+
+    _get_name = operator.itemgetter('name')
+    _get_stats = operator.itemgetter('bytesCompleted', 'wanted', 'priority')
+
+    def __init__(self, raw_torrent):
+        self.tid = raw_torrent['id']
+        self.location = raw_torrent['downloadDir']
         fileStats = raw_torrent['fileStats']
         if len(fileStats) < 1:
             # filelist is empty if torrent was added by hash and metadata isn't
             # downloaded yet.
-            filelist = [{'tid': -1, 'id': TorrentFileID(-1, -1), 'name': raw_torrent['name'],
-                         'priority': 0, 'length': 0, 'wanted': True, 'bytesCompleted': 0}]
+            self.has_metadata = False
+            self.ids = [TorrentFileID(-1, -1)]
+            self.names = [raw_torrent['name']]
+            self.sizes = [0]
+            stats = [(0, True, 0)]
         else:
-            # Combine 'files' and 'fileStats' fields and add the 'id' key to each
-            # file, which is a (torrent ID, file list index) tuple
-            tid = raw_torrent['id']
-            filelist = ({'id': TorrentFileID(tid, i), **f, **fS}
-                        for i,(f,fS) in enumerate(zip(raw_torrent['files'], fileStats)))
-        return cls(raw_torrent['id'], raw_torrent['downloadDir'], filelist, path=())
-
-    def __init__(self, torrent_id, torrent_location, filelist, path):
-        log.debug('Creating new TorrentFileTree for torrent %r: %r', torrent_id, path)
-        path_str = os.sep.join(path)
-        super().__init__(torrent_location, path_str)
+            # The 'id' of each file is a (torrent ID, file list index) tuple
+            tid = self.tid
+            files = raw_torrent['files']
+            self.has_metadata = True
+            self.ids = [TorrentFileID(tid, i) for i in range(len(files))]
+            self.names = list(map(self._get_name, files))
+            self.sizes = [f['length'] for f in files]
+            stats = list(map(self._get_stats, fileStats))
+        self.stats = stats
+        self.downloaded = [s[0] for s in stats]
+        self.wanted = [s[1] for s in stats]
+        self.priorities = [s[2] for s in stats]
+        self.parts = [name.split(os.sep) for name in self.names]
+        self.entries = [None] * len(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def entry(self, index, path):
+        """Return TorrentFile for file `index` in directory `path`"""
+        entry = self.entries[index]
+        if entry is None:
+            entry = self.entries[index] = ttypes.TorrentFile(
+                tid=self.tid, id=self.ids[index],
+                name=self.parts[index][-1], path=path, location=self.location,
+                size_total=self.sizes[index],
+                size_downloaded=self.downloaded[index],
+                is_wanted=self.wanted[index],
+                priority=self.priorities[index])
+        return entry
 
+    def update(self, raw_torrent):
+        """
+        Update values from `raw_torrent`
+
+        Return indexes of changed files or None if the list of files changed.
+        """
+        fileStats = raw_torrent['fileStats']
+        if not self.has_metadata:
+            # There is nothing to update unless we get metadata
+            return [] if len(fileStats) < 1 else None
+        elif (len(fileStats) != len(self.names) or
+              not all(map(operator.eq, map(self._get_name, raw_torrent['files']), self.names))):
+            return None
+
+        entries = self.entries
+        location = raw_torrent['downloadDir']
+        if location != self.location:
+            self.location = location
+            for entry in entries:
+                if entry is not None:
+                    entry.update({'location': location})
+
+        # Only look at files with different 'fileStats'
+        stats = list(map(self._get_stats, fileStats))
+        changed = list(compress(count(), map(operator.ne, stats, self.stats)))
+        self.stats = stats
+        for index in changed:
+            downloaded, wanted, priority = stats[index]
+            self.downloaded[index] = downloaded
+            self.wanted[index] = wanted
+            self.priorities[index] = priority
+            entry = entries[index]
+            if entry is not None:
+                entry.update({'size-downloaded': downloaded,
+                              'is-wanted': wanted,
+                              'priority': priority})
+        return changed
+
+
+class TorrentFileTree(base.TorrentFileTreeBase):
+    """
+    Nested mapping of a torrent's files
+
+    Subtrees and TorrentFiles are created on first access from a flat list of
+    files that is shared by all subtrees.
+    """
+
+    @classmethod
+    def create(cls, raw_torrent):
+        flatfiles = _FlatFiles(raw_torrent)
+        return cls(flatfiles, range(len(flatfiles)), path=())
+
+    def __init__(self, flatfiles, indexes, path):
+        super().__init__(flatfiles.location, os.sep.join(path))
+        self._flatfiles = flatfiles
+        self._indexes = indexes
+        self._path_parts = path
+        self._subtrees = None
+        self._ids = None
+
+        # Running totals of all files in this tree; calculated on first access
+        # and then updated with the differences of changed files
+        self._size_total = None
+        self._size_downloaded = None
+        self._priorities = None  # Map priorities to number of files
+
+    @property
+    def _items(self):
+        items = self._subtrees
+        if items is None:
+            items = self._subtrees = self._create_items()
+        return items
+
+    def _create_items(self):
+        flatfiles = self._flatfiles
+        parts = flatfiles.parts
+        path = self._path_parts
+        path_str = self._path
+        depth = len(path)
         items = {}
         subdirs = {}
-        for entry in filelist:
-            parts = entry['name'].split(os.sep, 1)
-            if len(parts) == 1:
-                filename = parts[0]
-                items[filename] = ttypes.TorrentFile(
-                    tid=torrent_id, id=entry['id'],
-                    name=entry['name'], path=path_str, location=torrent_location,
-                    size_total=entry['length'],
-                    size_downloaded=entry['bytesCompleted'],
-                    is_wanted=entry['wanted'],
-                    priority=entry['priority'])
-
-            elif len(parts) == 2:
-                subdir, subpath = parts
+        for index in self._indexes:
+            file_parts = parts[index]
+            if len(file_parts) == depth + 1:
+                items[file_parts[depth]] = flatfiles.entry(index, path_str)
+            else:
+                subdir = file_parts[depth]
                 if subdir not in subdirs:
                     subdirs[subdir] = []
-                entry['name'] = subpath
-                subdirs[subdir].append(entry)
+                subdirs[subdir].append(index)
+
+        for subdir,indexes in subdirs.items():
+            items[subdir] = TorrentFileTree(flatfiles, indexes, path=path + (subdir,))
+        return items
+
+    @property
+    def location(self):
+        return self._flatfiles.location
+
+    @property
+    def id(self):
+        ids = self._ids
+        if ids is None:
+            ids = self._ids = TorrentFileIDs(map(self._flatfiles.ids.__getitem__, self._indexes))
+        return ids
+
+    @property
+    def tid(self):
+        return self._flatfiles.tid
+
+    def _calculate_totals(self):
+        flatfiles = self._flatfiles
+        indexes = self._indexes
+        self._size_total = sum(map(flatfiles.sizes.__getitem__, indexes))
+        self._size_downloaded = sum(map(flatfiles.downloaded.__getitem__, indexes))
+        priorities = {}
+        for index in indexes:
+            priority = self._effective_priority(flatfiles.stats[index])
+            priorities[priority] = priorities.get(priority, 0) + 1
+        self._priorities = priorities
+
+    @staticmethod
+    def _effective_priority(stats):
+        # Unwanted files have priority "off"
+        _, wanted, priority = stats
+        return priority if wanted else -2
+
+    @property
+    def size_total(self):
+        if self._size_total is None:
+            self._calculate_totals()
+        return ttypes.SizeInBytes(self._size_total)
+
+    @property
+    def size_downloaded(self):
+        if self._size_downloaded is None:
+            self._calculate_totals()
+        return ttypes.SizeInBytes(self._size_downloaded)
+
+    @property
+    def percent_downloaded(self):
+        if self._size_total is None:
+            self._calculate_totals()
+        try:
+            return ttypes.Percent(self._size_downloaded / self._size_total * 100)
+        except ZeroDivisionError:
+            return ttypes.Percent(0)
+
+    @property
+    def priority(self):
+        if self._priorities is None:
+            self._calculate_totals()
+        if len(self._priorities) == 1:
+            for priority in self._priorities:
+                return ttypes.TorrentFilePriority(priority)
+        return ''
+
+    def _update_totals(self, old_stats, new_stats):
+        self._size_downloaded += new_stats[0] - old_stats[0]
+        old_prio = self._effective_priority(old_stats)
+        new_prio = self._effective_priority(new_stats)
+        if old_prio != new_prio:
+            priorities = self._priorities
+            if priorities[old_prio] == 1:
+                del priorities[old_prio]
             else:
-                raise RuntimeError(parts)
+                priorities[old_prio] -= 1
+            priorities[new_prio] = priorities.get(new_prio, 0) + 1
+
+    def update(self, raw_torrent):
+        """
+        Update files that changed
+
+        Return False if the list of files changed (e.g. metadata was downloaded
+        or a file was renamed) and the tree must be created again.
+        """
+        flatfiles = self._flatfiles
+        old_stats = flatfiles.stats
+        changed = flatfiles.update(raw_torrent)
+        if changed is None:
+            return False
+
+        # Update running totals of this tree and all subtrees that contain a
+        # changed file and exist already
+        new_stats = flatfiles.stats
+        parts = flatfiles.parts
+        for index in changed:
+            tree = self
+            for part in parts[index]:
+                if tree._size_total is not None:
+                    tree._update_totals(old_stats[index], new_stats[index])
+                subtrees = tree._subtrees
+                if subtrees is None:
+                    break
+                tree = subtrees[part]
+                if tree.nodetype != 'parent':
+                    break
+        return True
+
+
+class _LazyList(abc.Sequence):
+    """
+    Sequence of objects that are created from a list of raw values on first access
+
+    update() takes a new raw torrent.  Objects that were created since the
+    previous update are reused for raw values with the same key (see `_key`).
+
+    Subclasses must implement `_raw_items`, `_key`, `_create` and `_update_item`.
+    """
 
-        for subdir,filelist in subdirs.items():
-            items[subdir] = TorrentFileTree(torrent_id, torrent_location,
-                                            filelist, path=path + (subdir,))
-        self._items = items
+    # RPC fields of the torrent that are passed to every object; objects are
+    # not reused if any of these change
+    _TORRENT_FIELDS = ('id', 'name')
+
+    def __init__(self, raw_torrent):
+        self._torrent = {field: raw_torrent[field] for field in self._TORRENT_FIELDS}
+        self._raws = self._raw_items(raw_torrent)
+        self._items = [None] * len(self._raws)
+        self._reusable = {}
+
+    def update(self, raw_torrent):
+        """Update from `raw_torrent` and return True"""
+        torrent = {field: raw_torrent[field] for field in self._TORRENT_FIELDS}
+        key = self._key
+        if torrent == self._torrent:
+            self._reusable = {key(raw):(raw, item)
+                              for raw,item in zip(self._raws, self._items)
+                              if item is not None}
+        else:
+            self._torrent = torrent
+            self._reusable = {}
+        self._raws = self._raw_items(raw_torrent)
+        self._items = [None] * len(self._raws)
+        return True
+
+    def _get_item(self, index):
+        item = self._items[index]
+        if item is None:
+            raw = self._raws[index]
+            previous = self._reusable.pop(self._key(raw), None)
+            if previous is None:
+                item = self._create(raw)
+            else:
+                previous_raw, item = previous
+                if raw != previous_raw:
+                    self._update_item(item, raw)
+            self._items[index] = item
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._get_item(i) for i in range(*index.indices(len(self._raws))))
+        return self._get_item(index)
+
+    def __iter__(self):
+        for index in range(len(self._raws)):
+            yield self._get_item(index)
+
+    def __len__(self):
+        return len(self._raws)
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, tuple(self))
+
+
+class PeerList(_LazyList):
+    _TORRENT_FIELDS = ('id', 'name', 'totalSize')
+
+    def _raw_items(self, raw_torrent):
+        return raw_torrent['peers']
+
+    def _key(self, raw_peer):
+        return (raw_peer['address'], raw_peer['port'])
 
     def update(self, raw_torrent):
-        def update_files(ftree, fileStats):
-            if not fileStats:
-                # We don't have any metadata yet, so there is nothing to update
-                return
-
-            for entry in ftree.values():
-                if isinstance(entry, ttypes.TorrentFile):
-                    # File ID is its index in the list provided by
-                    # Transmission (see _create_TorrentFileTree)
-                    index = entry['id'].file_id
-                    fstats = fileStats[index]
-                    entry.update({'size-downloaded': fstats['bytesCompleted'],
-                                  'is-wanted': fstats['wanted'],
-                                  'priority': fstats['priority'],
-                                  'location': raw_torrent['downloadDir']})
-                else:
-                    update_files(entry, fileStats)
-
-        update_files(self._items, raw_torrent['fileStats'])
-
-
-class PeerList(tuple):
-    def __new__(cls, t):
-        TorrentPeer = ttypes.TorrentPeer
-        return super().__new__(
-            cls,
-            (TorrentPeer(tid=t['id'], tname=t['name'], tsize=t['totalSize'],
-                         ip=p['address'], port=p['port'], client=p['clientName'],
-                         downloaded=p['progress'] * t['totalSize'],
-                         pdownloaded=p['progress'] * 100,
-                         rate_up=p['rateToPeer'], rate_down=p['rateToClient'])
-             for p in t['peers'])
-        )
-
-
-class TrackerList(tuple):
+        super().update(raw_torrent)
+        # Unchanged peers are reused without a new sample, but they are still
+        # connected and their estimated rates must not expire
+        tid = self._torrent['id']
+        touch = ttypes.TorrentPeer.rate_estimator.touch
+        for p in self._raws:
+            touch((tid, p['address'], p['port']))
+        return True
+
+    def _create(self, p):
+        t = self._torrent
+        return ttypes.TorrentPeer(tid=t['id'], tname=t['name'], tsize=t['totalSize'],
+                                  ip=p['address'], port=p['port'], client=p['clientName'],
+                                  downloaded=p['progress'] * t['totalSize'],
+                                  pdownloaded=p['progress'] * 100,
+                                  rate_up=p['rateToPeer'], rate_down=p['rateToClient'])
+
+    def _update_item(self, peer, p):
+        peer.update(client=p['clientName'],
+                    downloaded=p['progress'] * self._torrent['totalSize'],
+                    pdownloaded=p['progress'] * 100,
+                    rate_up=p['rateToPeer'], rate_down=p['rateToClient'])
+
+
+class TrackerList(_LazyList):
     _STATES_ANNOUNCE = {
         # From libtransmission/transmission.h:
         # /* we won't (announce,scrape) this torrent to this tracker because
@@ -345,34 +637,45 @@ class TrackerList(tuple):
         else:
             return ttypes.Timestamp.NEVER
 
-    def __new__(cls, raw_torrent):
-        return super().__new__(cls,
-            (ttypes.TorrentTracker(
-                (LazyDict({  # noqa: E128
-                    'id'                 : (raw_torrent['id'], raw_tracker['id']),
-                    'tid'                : raw_torrent['id'],
-                    'tname'              : raw_torrent['name'],
-                    'tier'               : raw_tracker['tier'],
+    def _raw_items(self, raw_torrent):
+        return raw_torrent['trackerStats']
+
+    def _key(self, raw_tracker):
+        return raw_tracker['id']
+
+    def _create(self, raw_tracker):
+        return ttypes.TorrentTracker(self._make_trkdict(raw_tracker))
+
+    def _update_item(self, tracker, raw_tracker):
+        tracker.update(self._make_trkdict(raw_tracker))
 
-                    'url-announce'       : raw_tracker['announce'],
-                    'url-scrape'         : raw_tracker['scrape'],
+    def _make_trkdict(self, raw_tracker):
+        cls = type(self)
+        raw_torrent = self._torrent
+        return LazyDict({
+            'id'                 : (raw_torrent['id'], raw_tracker['id']),
+            'tid'                : raw_torrent['id'],
+            'tname'              : raw_torrent['name'],
+            'tier'               : raw_tracker['tier'],
 
-                    'status-announce'    : cls._STATES_ANNOUNCE[raw_tracker['announceState']],
-                    'status-scrape'      : cls._STATES_SCRAPE[raw_tracker['scrapeState']],
+            'url-announce'       : raw_tracker['announce'],
+            'url-scrape'         : raw_tracker['scrape'],
 
-                    'error-announce'     : lambda: cls._error_announce(raw_tracker),
-                    'error-scrape'       : lambda: cls._error_scrape(raw_tracker),
+            'status-announce'    : cls._STATES_ANNOUNCE[raw_tracker['announceState']],
+            'status-scrape'      : cls._STATES_SCRAPE[raw_tracker['scrapeState']],
 
-                    'count-downloads'    : raw_tracker['downloadCount'],
-                    'count-leeches'      : raw_tracker['leecherCount'],
-                    'count-seeds'        : raw_tracker['seederCount'],
+            'error-announce'     : lambda: cls._error_announce(raw_tracker),
+            'error-scrape'       : lambda: cls._error_scrape(raw_tracker),
 
-                    'time-last-announce' : lambda: cls._last_time(raw_tracker, 'Announce'),
-                    'time-last-scrape'   : lambda: cls._last_time(raw_tracker, 'Scrape'),
-                    'time-next-announce' : lambda: cls._next_time(raw_tracker, 'Announce'),
-                    'time-next-scrape'   : lambda: cls._next_time(raw_tracker, 'Scrape'),
-                }))) for raw_tracker in raw_torrent['trackerStats'])
-        )
+            'count-downloads'    : raw_tracker['downloadCount'],
+            'count-leeches'      : raw_tracker['leecherCount'],
+            'count-seeds'        : raw_tracker['seederCount'],
+
+            'time-last-announce' : lambda: cls._last_time(raw_tracker, 'Announce'),
+            'time-last-scrape'   : lambda: cls._last_time(raw_tracker, 'Scrape'),
+            'time-next-announce' : lambda: cls._next_time(raw_tracker, 'Announce'),
+            'time-next-scrape'   : lambda: cls._next_time(raw_tracker, 'Scrape'),
+        })
 
 
 # Map our keys to tuples of needed RPC field names for those keys
@@ -431,14 +734,40 @@ DEPENDENCIES = {
     'files'                        : ('files', 'fileStats', 'downloadDir'),
 }
 
+# Rough cost of requesting a field for one torrent relative to a field with a
+# single value; lists must be collected by the daemon, transferred and decoded
+FIELD_COSTS = {
+    'fileStats': 20, 'files': 20, 'peers': 30, 'peersFrom': 2, 'pieces': 10,
+    'priorities': 5, 'trackers': 5, 'trackerStats': 15, 'wanted': 5, 'webseeds': 2,
+}
+
+
+def fields_cost(fields):
+    """Estimated cost of requesting RPC `fields` for one torrent (see FIELD_COSTS)"""
+    return sum(FIELD_COSTS.get(field, 1) for field in fields)
+
+
+def expensive_fields(fields):
+    """RPC `fields` that cost more than a single value (see FIELD_COSTS)"""
+    return tuple(field for field in fields if FIELD_COSTS.get(field, 1) > 1)
+
+
+# Map RPC field names to the keys that depend on them
+DEPENDENT_KEYS = {field: frozenset(key for key,fields in DEPENDENCIES.items() if field in fields)
+                  for fields in DEPENDENCIES.values() for field in fields}
+
 
 class Torrent(base.TorrentBase):
     """
     Information about a torrent as a mapping
 
     The available keys are specified in DEPENDENCIES and ttypes.TYPES.
+
+    `raw_torrent` may be a dictionary or a CompactRaw instance.
     """
 
+    __slots__ = ('_raw', '_cache')
+
     # Map our keys to callables that adjust the raw RPC values or create values
     # from multiple RPC values
     _MODIFIERS = {
@@ -480,30 +809,41 @@ class Torrent(base.TorrentBase):
         self._cache = {}
 
     def update(self, raw_torrent):
+        """
+        Update raw values from `raw_torrent` and invalidate cached values
+
+        Return set of keys that depend on any changed raw value
+        """
         cache = self._cache
         raw_old = self._raw
 
-        # Remove cached values if their original/raw value(s) differ
-        for k in tuple(cache):
-            # Each key depends on one or more RPC field
-            fields = DEPENDENCIES[k]
-            for field in fields:
-                new_value = raw_torrent.get(field)
-                old_value = raw_old.get(field)
-                if new_value is not None and new_value != old_value:
-                    # log.debug('Invalidating cached %s/%s: %r -> %r', k, field, old_value, new_value)
-                    # New and previous value differ - if we are dealing with
-                    # more complex data structures (e.g. a file tree), use the
-                    # update() method to update the object in cache instead of
-                    # removing it from the cache.
-                    value = cache[k]
-                    if hasattr(value, 'update') and all(field in raw_torrent for field in fields):
-                        value.update(raw_torrent)
-                    del cache[k]
-                    break
+        # Find keys that depend on any changed RPC field
+        get_old = raw_old.get
+        changed_fields = [field for field,new_value in raw_torrent.items()
+                          if new_value is not None and new_value != get_old(field)]
+        changed_keys = set()
+        for field in changed_fields:
+            changed_keys.update(DEPENDENT_KEYS.get(field, ()))
+
+        # Remove cached values if their original/raw value(s) differ.  Usually
+        # only a few values change, so we don't look at any other cached keys.
+        if changed_keys and cache:
+            for k in changed_keys.intersection(cache):
+                # log.debug('Invalidating cached %s', k)
+                # New and previous value differ - if we are dealing with
+                # more complex data structures (e.g. a file tree), use the
+                # update() method to update the object in cache instead of
+                # removing it from the cache.  update() returns whether that
+                # was possible.
+                value = cache[k]
+                if hasattr(value, 'update') and all(field in raw_torrent for field in DEPENDENCIES[k]):
+                    if value.update(raw_torrent):
+                        continue
+                del cache[k]
 
         # Now we can forget the old values
         raw_old.update(raw_torrent)
+        return changed_keys
 
     def __getitem__(self, key):
         cache = self._cache
@@ -629,8 +969,94 @@ class TorrentFields(tuple):
         else:
             return NotImplemented
 
+    def __sub__(self, other):
+        if isinstance(other, (type(self), set, list, tuple)):
+            return tuple(field for field in self if field not in other)
+        else:
+            return NotImplemented
+
     def __eq__(self, other):
         return set(self) == set(other)
 
     def __ne__(self, other):
         return not self.__eq__(other)
+
+
+_MISSING = object()
+
+class CompactRaw(abc.MutableMapping):
+    """
+    Raw torrent that stores values in a list instead of a dictionary
+
+    Every known RPC field has a fixed position in the list so field names are
+    stored only once for all torrents.  This needs considerably less memory per
+    torrent than a dictionary at the cost of slower access.  Unknown fields are
+    stored in a dictionary that is created on demand.
+    """
+
+    FIELDS = tuple(sorted(set(TorrentFields._RPC_FIELDS + TorrentFields._ALL_FIELDS)))
+    _INDEX = {field: i for i,field in enumerate(FIELDS)}
+
+    __slots__ = ('_values', '_extra')
+
+    def __init__(self, raw_torrent=()):
+        self._values = [_MISSING] * len(self.FIELDS)
+        self._extra = None
+        self.update(raw_torrent)
+
+    def update(self, raw_torrent):
+        if not hasattr(raw_torrent, 'items'):
+            raw_torrent = dict(raw_torrent)
+        index = self._INDEX
+        values = self._values
+        for field,value in raw_torrent.items():
+            i = index.get(field)
+            if i is not None:
+                values[i] = value
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[field] = value
+
+    def get(self, field, default=None):
+        i = self._INDEX.get(field)
+        if i is not None:
+            value = self._values[i]
+            return default if value is _MISSING else value
+        elif self._extra is not None:
+            return self._extra.get(field, default)
+        return default
+
+    def __getitem__(self, field):
+        value = self.get(field, _MISSING)
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def __setitem__(self, field, value):
+        self.update(((field, value),))
+
+    def __delitem__(self, field):
+        if field not in self:
+            raise KeyError(field)
+        i = self._INDEX.get(field)
+        if i is not None:
+            self._values[i] = _MISSING
+        else:
+            del self._extra[field]
+
+    def __contains__(self, field):
+        return self.get(field, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        for field,value in zip(self.FIELDS, self._values):
+            if value is not _MISSING:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, dict(self.items()))
@@ -18,11 +18,16 @@ from .aiotransmission.api_torrent import TorrentAPI
 from .aiotransmission.rpc import TransmissionRPC
 from .poll import RequestPoller
 from .trequestpool import TorrentRequestPool
+from .ttypes import TorrentPeer
 from .utils import SleepUneasy, cached_property
 
 from ..logging import make_logger  # isort:skip
 log = make_logger(__name__)
 
+# Seconds without user activity after which pollers stop polling faster when
+# requested torrents change (see API.report_activity)
+USER_IDLE_TIME = 300
+
 
 class API():
     """
@@ -41,12 +46,14 @@ class API():
     AuthError       = errors.AuthError
 
     def __init__(self, host='localhost', port=9091, *, tls=False, user=None,
-                 password=None, path='/transmission/rpc', interval=1):
+                 password=None, path='/transmission/rpc', interval=1, max_interval=None):
         self._rpc = TransmissionRPC(host=host, port=port, tls=tls, user=user,
                                     password=password, path=path)
         self._pollers = []
         self._manage_pollers_interval = SleepUneasy()
+        self._last_user_activity = None
         self.interval = interval
+        self.max_interval = max_interval
 
     @property
     def rpc(self):
@@ -64,6 +71,46 @@ class API():
         for poller in self._existing_pollers:
             poller.interval = self._interval
 
+    @property
+    def max_interval(self):
+        """
+        Maximum delay between polls of all pollers or None
+
+        If this is greater than `interval`, pollers increase their delay
+        between polls until `report_activity` is called.  This happens
+        automatically when requested torrents change.
+        """
+        return self._max_interval
+
+    @max_interval.setter
+    def max_interval(self, max_interval):
+        self._max_interval = float(max_interval) if max_interval is not None else None
+        for poller in self._existing_pollers:
+            poller.max_interval = self._max_interval
+
+    def report_activity(self, user=False):
+        """
+        Make all pollers poll every `interval` seconds again (see `max_interval`)
+
+        user: Whether the activity comes from the user (e.g. a keypress)
+
+        Activity that doesn't come from the user is ignored if the user wasn't
+        active during the last USER_IDLE_TIME seconds.  Starting to poll counts
+        as user activity (see `start_polling`).
+        """
+        now = asyncio.get_event_loop().time()
+        if user:
+            self._last_user_activity = now
+        elif (self._last_user_activity is not None and
+              now - self._last_user_activity > USER_IDLE_TIME):
+            return
+        for poller in self._existing_pollers:
+            if poller.running:
+                poller.report_activity()
+
+    def _handle_torrent_changes(self, torrentapi):
+        self.report_activity()
+
 
     def created(self, prop):
         """Whether property `prop` was created"""
@@ -73,40 +120,57 @@ class API():
     def torrent(self):
         """TorrentAPI singleton"""
         log.debug('Creating TorrentAPI singleton')
-        return TorrentAPI(self.rpc)
+        torrentapi = TorrentAPI(self.rpc)
+        torrentapi.on_change(self._handle_torrent_changes)
+        return torrentapi
 
     @cached_property(after_creation=lambda self: setattr(self, 'status_created', True))
     def status(self):
         """StatusAPI singleton"""
         log.debug('Creating StatusAPI singleton')
-        return StatusAPI(self, interval=self._interval)
+        return StatusAPI(self, interval=self._interval, max_interval=self._max_interval)
 
     @cached_property(after_creation=lambda self: setattr(self, 'settings_created', True))
     def settings(self):
         """SettingsAPI singleton"""
         log.debug('Creating SettingsAPI singleton')
-        return SettingsAPI(self, interval=self._interval)
+        return SettingsAPI(self, interval=self._interval, max_interval=self._max_interval)
 
     @cached_property(after_creation=lambda self: setattr(self, 'treqpool_created', True))
     def treqpool(self):
         """TorrentRequestPool singleton"""
         log.debug('Creating TorrentRequestPool singleton')
-        return TorrentRequestPool(self, interval=self._interval)
+        return TorrentRequestPool(self, interval=self._interval, max_interval=self._max_interval)
 
+    @cached_property(after_creation=lambda self: setattr(self, 'detailspool_created', True))
+    def detailspool(self):
+        """
+        TorrentRequestPool singleton for views that need expensive keys of few torrents
 
-    def create_poller(self, *args, interval=None, **kwargs):
+        File, peer and tracker lists and torrent details share this pool so
+        that all of them are updated with a single request.  It is separate
+        from `treqpool` because combining both would request files, peers,
+        etc. for all torrents in torrent lists.
+        """
+        log.debug('Creating details TorrentRequestPool singleton')
+        return TorrentRequestPool(self, interval=self._interval, max_interval=self._max_interval,
+                                  report_changes=False)
+
+
+    def create_poller(self, *args, interval=None, max_interval=None, **kwargs):
         """
         Create, start and return custom RequestPoller instance
 
-        All arguments are used to create the poller, except for `interval`,
-        which is ignored and replaced with this object's `interval` attribute so
-        all pollers have the same interval.
+        All arguments are used to create the poller, except for `interval` and
+        `max_interval`, which are ignored and replaced with this object's
+        attributes so all pollers have the same interval.
 
         The RequestPoller instance is treated like all other pollers, i.e. it
         is polled when `poll` is called, its interval is changed when
         `interval` is set, etc.
         """
-        poller = RequestPoller(*args, interval=self.interval, **kwargs)
+        poller = RequestPoller(*args, interval=self.interval, max_interval=self.max_interval,
+                               **kwargs)
         self._pollers.append(poller)
         self.manage_pollers_now()
         return poller
@@ -135,16 +199,11 @@ class API():
                     if poller in self._pollers:
                         self._pollers.remove(poller)
 
-        # To estimate peer download rates, we have to keep track of all the
-        # peers' progresses, and we need to prune that data from time to
-        # time. It's a bit dirty to put this here, but managing another task
-        # just for this isn't much better.
-        from .ttypes import TorrentPeer
         while True:
-            TorrentPeer.gc_peer_progress_data()
-
             log.debug('Managing pollers:')
             await manage()
+            if TorrentPeer.rate_estimator:
+                log.debug('Peer rate estimator: %r', TorrentPeer.rate_estimator.stats)
 
             # If a poller was added while we were managing the existing
             # pollers, it won't get started until the next interval.  This
@@ -160,7 +219,7 @@ class API():
         self._manage_pollers_interval.interrupt()
 
     # Standard pollers accessible through properties
-    _STD_POLLERS = ('status', 'settings', 'treqpool')
+    _STD_POLLERS = ('status', 'settings', 'treqpool', 'detailspool')
     @property
     def _existing_pollers(self):
         for pname in self._STD_POLLERS:
@@ -189,6 +248,8 @@ class API():
 
     async def start_polling(self):
         """Start all created pollers"""
+        # Sessions without any user input must become idle too
+        self._last_user_activity = asyncio.get_event_loop().time()
         for poller in self._existing_pollers:
             if not poller.running:
                 await poller.start()
@@ -27,6 +27,8 @@ class TorrentBase(abc.Mapping):
     '__getitem__' and '__iter__'.
     """
 
+    __slots__ = ()
+
     def update(self, raw_torrent):
         raise NotImplementedError()
 
@@ -96,10 +98,12 @@ class TorrentFileTreeBase(abc.Mapping):
     # ("parent" or "leaf")
     nodetype = 'parent'
 
+    # Subclasses must provide `_items`, a mapping of names to TorrentFiles and
+    # subtrees
+
     def __init__(self, location, path, *args, **kwargs):
         self._location = location  # Absolute download location
         self._path = path          # Path relative to location
-        self._items = NotImplemented
 
     @property
     def files(self):
@@ -132,6 +136,49 @@ class TorrentFileTreeBase(abc.Mapping):
     def id(self):
         return tuple(f['id'] for f in self.files)
 
+    # The following properties summarize the values of all TorrentFiles in the
+    # tree.  Subclasses may provide faster implementations.
+
+    @property
+    def tid(self):
+        """ID of the torrent"""
+        return next(self.files)['tid']
+
+    @property
+    def size_total(self):
+        """Combined size of all files"""
+        return self._sum_size('size-total')
+
+    @property
+    def size_downloaded(self):
+        """Combined downloaded bytes of all files"""
+        return self._sum_size('size-downloaded')
+
+    @property
+    def percent_downloaded(self):
+        """Percentage of downloaded bytes of all files"""
+        perc_dl_cls = type(next(self.files)['%downloaded'])
+        try:
+            return perc_dl_cls(self.size_downloaded / self.size_total * 100)
+        except ZeroDivisionError:
+            return perc_dl_cls(0)
+
+    @property
+    def priority(self):
+        """Priority of all files or empty string if files have different priorities"""
+        priorities = set(tfile['priority'] for tfile in self.files)
+        if len(priorities) == 1:
+            return priorities.pop()
+        else:
+            return ''
+
+    def _sum_size(self, key):
+        sizes = tuple(tfile[key] for tfile in self.files)
+        # Preserve the original type (Float)
+        first_size = sizes[0]
+        start_value = type(first_size)(0, unit=first_size.unit, prefix=first_size.prefix)
+        return sum(sizes, start_value)
+
     def __repr__(self):
         return '<%s path=%r: %r>' % (type(self).__name__, self._path, self._items)
 
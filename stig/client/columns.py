@@ -0,0 +1,258 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details
+# http://www.gnu.org/licenses/gpl-3.0.txt
+
+"""Numeric values of many items stored in one array per key"""
+
+import array
+import math
+import operator
+from itertools import repeat
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from ..logging import make_logger  # isort:skip
+log = make_logger(__name__)
+
+_id = id  # Our methods have an `id` argument
+
+
+class Columns():
+    """
+    Numeric values of items in one array per key
+
+    keys: Item keys with values that can be converted to `float`
+
+    Items are added with an ID and their values are only read when a column is
+    requested.  Columns are arrays of floats with one row per item.  Rows of
+    items that were invalidated (see `invalidate`) are read again the next time
+    their column is requested.
+
+    Comparisons and sorting are done with NumPy if it is installed.  Without
+    NumPy, only comparisons are done on columns.  Masks are NumPy arrays of
+    booleans in that case and lists of booleans otherwise.
+    """
+
+    def __init__(self, keys, use_numpy=True):
+        self._keys = frozenset(keys)
+        self._numpy = numpy if use_numpy else None
+        self.clear()
+
+    @property
+    def keys(self):
+        """Keys that can be provided as columns"""
+        return self._keys
+
+    @property
+    def uses_numpy(self):
+        """Whether NumPy is used for comparing and sorting"""
+        return self._numpy is not None
+
+    def clear(self):
+        """Remove all items"""
+        self._items = []    # Items by row
+        self._ids = []      # Item IDs by row
+        self._rows = {}     # Map item IDs to rows
+        self._objrows = {}  # Map id(item) to rows
+        self._columns = {}  # Map keys to arrays of values by row
+        self._stale = {}    # Map keys to sets of rows that must be read again
+
+    def add(self, id, item):
+        """Add `item` with ID `id` or replace the item with the same ID"""
+        if id in self._rows:
+            self.remove(id)
+        row = len(self._items)
+        self._items.append(item)
+        self._ids.append(id)
+        self._rows[id] = row
+        self._objrows[_id(item)] = row
+        for key,column in self._columns.items():
+            column.append(math.nan)
+            self._stale[key].add(row)
+
+    def remove(self, id):
+        """Remove item with ID `id`"""
+        row = self._rows.pop(id)
+        del self._objrows[_id(self._items[row])]
+        last = len(self._items) - 1
+        if row != last:
+            # Move last row to the removed row so we don't have to shift rows
+            item = self._items[row] = self._items[last]
+            last_id = self._ids[row] = self._ids[last]
+            self._rows[last_id] = row
+            self._objrows[_id(item)] = row
+            for key,column in self._columns.items():
+                column[row] = column[last]
+                stale = self._stale[key]
+                if last in stale:
+                    stale.discard(last)
+                    stale.add(row)
+        self._items.pop()
+        self._ids.pop()
+        for key,column in self._columns.items():
+            column.pop()
+            self._stale[key].discard(last)
+
+    def invalidate(self, id, keys):
+        """Read values of `keys` from item with ID `id` again when they are needed"""
+        row = self._rows.get(id)
+        if row is not None:
+            stale = self._stale
+            for key in self._keys.intersection(keys):
+                if key in stale:
+                    stale[key].add(row)
+
+    def invalidate_all(self):
+        """Read all values again when they are needed"""
+        self._columns.clear()
+        self._stale.clear()
+
+    def column(self, key):
+        """
+        Return array of values of `key` by row
+
+        Return None if `key` is not a column or any item doesn't provide it.
+        """
+        if key not in self._keys:
+            return None
+        column = self._columns.get(key)
+        try:
+            if column is None:
+                column = array.array('d', (float(item[key]) for item in self._items))
+                self._columns[key] = column
+                self._stale[key] = set()
+            else:
+                stale = self._stale[key]
+                items = self._items
+                while stale:
+                    row = stale.pop()
+                    try:
+                        column[row] = float(items[row][key])
+                    except BaseException:
+                        stale.add(row)
+                        raise
+        except (KeyError, TypeError, ValueError) as e:
+            log.debug('Column %r is not available: %r', key, e)
+            return None
+        return column
+
+    def rows(self, items):
+        """
+        Return rows of `items` as a sequence of integers
+
+        Return None if any item in `items` is unknown.
+        """
+        items = tuple(items)
+        rows = list(map(self._objrows.get, map(_id, items)))
+        if None in rows:
+            return None
+        # Make sure we didn't get a row of an item that was garbage collected
+        # and had the same id()
+        if not all(map(operator.is_, map(self._items.__getitem__, rows), items)):
+            return None
+        if self._numpy is not None:
+            return self._numpy.array(rows, dtype=self._numpy.intp)
+        return rows
+
+    def values(self, key, rows):
+        """
+        Return values of `key` in `rows` as an array
+
+        Return None if `key` is not available as a column (see `column`).
+        """
+        column = self.column(key)
+        if column is None:
+            return None
+        elif self._numpy is not None:
+            return self._numpy.frombuffer(column, dtype=self._numpy.float64)[rows]
+        else:
+            return list(map(column.__getitem__, rows))
+
+    def compare(self, key, rows, op, value, invert=False):
+        """
+        Return mask of `rows` where `op(<value of key>, value)` is true
+
+        op: Binary operator from the `operator` module that works the same
+            way for NumPy arrays and floats (e.g. `operator.gt`)
+
+        Return None if `key` is not available as a column (see `column`).
+        """
+        values = self.values(key, rows)
+        if values is None:
+            return None
+        elif self._numpy is not None:
+            mask = op(values, value)
+            return ~mask if invert else mask
+        elif invert:
+            return list(map(operator.not_, map(op, values, repeat(value))))
+        else:
+            return list(map(bool, map(op, values, repeat(value))))
+
+    def mask_and(self, a, b):
+        """Combine masks `a` and `b` with AND"""
+        if self._numpy is not None:
+            return a & b
+        return [x and y for x,y in zip(a, b)]
+
+    def mask_or(self, a, b):
+        """Combine masks `a` and `b` with OR"""
+        if self._numpy is not None:
+            return a | b
+        return [x or y for x,y in zip(a, b)]
+
+    def mask_list(self, mask):
+        """Return `mask` as list of booleans"""
+        if self._numpy is not None:
+            return mask.tolist()
+        return mask
+
+    def sort(self, items, keys, reverse=False, item_getter=lambda item: item):
+        """
+        Return list of `items` sorted by each key in `keys`
+
+        The result is the same as sorting with `sorted` by each key in the
+        given order (i.e. the last key has the highest priority).  Sorting is
+        stable, even with `reverse` set to True.
+
+        item_getter: Callable that gets an item of `items` and returns the
+                     object that was added to this instance
+
+        Return None if NumPy is not used (sorting with `sorted` is faster than
+        sorting rows without it), any item is unknown or any key is not
+        available as a column.
+        """
+        np = self._numpy
+        if np is None:
+            return None
+        items = tuple(items)
+        rows = self.rows(map(item_getter, items))
+        if rows is None:
+            return None
+
+        order = np.arange(len(items))
+        for key in keys:
+            values = self.values(key, rows[order])
+            if values is None or np.isnan(values).any():
+                # NaNs don't compare like sorted() compares them
+                return None
+            if reverse:
+                values = -values
+            order = order[np.argsort(values, kind='stable')]
+        return list(map(items.__getitem__, order.tolist()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return '<%s %d items, columns: %s>' % (type(self).__name__, len(self),
+                                               ', '.join(sorted(self._columns)))
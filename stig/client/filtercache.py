@@ -0,0 +1,124 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details
+# http://www.gnu.org/licenses/gpl-3.0.txt
+
+"""Remember which items match filters until their values change"""
+
+import operator
+from collections import OrderedDict
+
+from ..logging import make_logger  # isort:skip
+log = make_logger(__name__)
+
+_id = id  # Our methods have an `id` argument
+
+
+class _FilterResults():
+    __slots__ = ('needed_keys', 'matches', 'stale')
+
+    def __init__(self, needed_keys, stale):
+        self.needed_keys = frozenset(needed_keys)
+        self.matches = {}   # Map id(item) to True/False
+        self.stale = stale  # Set of id(item) that must be matched again
+
+
+class FilterCache():
+    """
+    Match results of items for the most recently used filters
+
+    max_filters: Maximum number of filters to remember results for
+
+    Items are added with an ID.  Results are stored for each filter and item and
+    are only computed again for items that were invalidated (see `invalidate`)
+    with any of the filter's `needed_keys`.
+    """
+
+    def __init__(self, max_filters=10):
+        self.max_filters = max_filters
+        self.clear()
+
+    def clear(self):
+        """Remove all items and results"""
+        self._items = {}                # Map id(item) to items
+        self._oids = {}                 # Map item IDs to id(item)
+        self._results = OrderedDict()   # Map filters to _FilterResults
+
+    def add(self, id, item):
+        """Add `item` with ID `id` or replace the item with the same ID"""
+        if id in self._oids:
+            self.remove(id)
+        oid = _id(item)
+        self._items[oid] = item
+        self._oids[id] = oid
+        for results in self._results.values():
+            results.stale.add(oid)
+
+    def remove(self, id):
+        """Remove item with ID `id`"""
+        oid = self._oids.pop(id, None)
+        if oid is not None:
+            del self._items[oid]
+            for results in self._results.values():
+                results.matches.pop(oid, None)
+                results.stale.discard(oid)
+
+    def invalidate(self, id, keys):
+        """Match item with ID `id` again for filters that need any of `keys`"""
+        oid = self._oids.get(id)
+        if oid is not None:
+            for results in self._results.values():
+                if not results.needed_keys.isdisjoint(keys):
+                    results.stale.add(oid)
+
+    def invalidate_all(self):
+        """Match all items again"""
+        self._results.clear()
+
+    def matches(self, filter, items, match):
+        """
+        Return list of booleans that say whether each of `items` matches `filter`
+
+        filter: Hashable filter with a `needed_keys` attribute
+        items:  Sequence of items that were added
+        match:  Callable that takes a sequence of items and returns a sequence
+                of booleans; it is only called with items that weren't matched
+                before or were invalidated since
+
+        Return None if any item in `items` is unknown.
+        """
+        oids = list(map(_id, items))
+        # Make sure we don't use results of another item that was garbage
+        # collected and had the same id()
+        if not all(map(operator.is_, map(self._items.get, oids), items)):
+            return None
+
+        results = self._results.get(filter)
+        if results is None:
+            results = self._results[filter] = _FilterResults(filter.needed_keys, set(self._items))
+            while len(self._results) > self.max_filters:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(filter)
+
+        stale = results.stale
+        if stale:
+            stale_oids = stale.intersection(oids)
+            if stale_oids:
+                stale_oids = tuple(stale_oids)
+                new_matches = match(tuple(map(self._items.__getitem__, stale_oids)))
+                results.matches.update(zip(stale_oids, new_matches))
+                stale.difference_update(stale_oids)
+        return list(map(results.matches.__getitem__, oids))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return '<%s %d items, %d filters>' % (type(self).__name__, len(self), len(self._results))
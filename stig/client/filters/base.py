@@ -23,21 +23,42 @@ log = make_logger(__name__)
 BOOLEAN = 'boolean'
 COMPARATIVE = 'comparative'
 
+_PATTERN_TYPE = type(re.compile(''))
+
 
 class BoolFilterSpec():
     """Boolean filter specification"""
 
     type = BOOLEAN
 
-    def __init__(self, func, *, needed_keys=(), aliases=(), description='No description'):
+    def __init__(self, func, *, needed_keys=(), aliases=(), description='No description',
+                 column=None, cost=None, volatile=False):
+        """
+        func        : Callable that takes an item and returns True/False
+        needed_keys : Needed keys for this filter
+        aliases     : Alternative names of this filter
+        column      : None or (KEY, OPERATOR, VALUE) tuple where `func(item)`
+                      is the same as `OPERATOR(item[KEY], VALUE)`; this allows
+                      evaluating the filter for many items at once (see
+                      `client.columns`)
+        cost        : Estimated relative cost of matching one item or None to
+                      guess it (see `Filter.cost`)
+        volatile    : Whether the result can change even if no value of
+                      `needed_keys` changes (e.g. because it depends on the
+                      current time)
+        """
         if not func:
             self.filter_function = None
             needed_keys = ()
+            column = None
         else:
             self.filter_function = func
         self.needed_keys = needed_keys
         self.aliases = aliases
         self.description = description
+        self.column = column
+        self.cost = cost
+        self.volatile = volatile
 
 
 class CmpFilterSpec():
@@ -47,7 +68,7 @@ class CmpFilterSpec():
 
     def __init__(self, *, value_type, value_getter=None, value_matcher=None,
                  value_convert=None, as_bool=None, needed_keys=(), aliases=(),
-                 description='No description'):
+                 description='No description', column=None, cost=None, volatile=False):
         """
         value_type    : Subclass of `type` (i.e. something that returns an instance when
                         called and can be passed to `isinstance` as the second argument
@@ -62,19 +83,35 @@ class CmpFilterSpec():
         as_bool       : Callable that takes an item and returns True/False
         needed_keys   : Needed keys for this filter
         aliases       : Alternative names of this filter
+        column        : Key of a numeric value that `value_getter` returns
+                        unmodified; this allows evaluating the filter for many
+                        items at once (see `client.columns`) if `value_matcher`
+                        and `as_bool` are not given
+        cost          : Estimated relative cost of matching one item or None to
+                        guess it (see `Filter.cost`)
+        volatile      : Whether the result can change even if no value of
+                        `needed_keys` changes (e.g. because it depends on the
+                        current time)
         """
         self.value_type = value_type
         self.needed_keys = needed_keys
         self.aliases = aliases
         self.description = description
         self.value_convert = value_convert if value_convert is not None else value_type
+        self.column = column if value_matcher is None and as_bool is None else None
+        self.cost = cost
+        self.volatile = volatile
 
+        # Key of the value that `value_getter` returns unmodified
         if value_getter is not None:
             self.value_getter = value_getter
+            value_key = column
         elif len(self.needed_keys) == 1:
             self.value_getter = lambda dct, k=needed_keys[0]: dct[k]
+            value_key = needed_keys[0]
         else:
             raise TypeError('Missing argument with needed_keys=%r: value_getter', self.needed_keys)
+        self._value_key = value_key if value_matcher is None else None
 
         if value_matcher is None:
             def value_matcher(item, op, user_value, vg=self.value_getter):
@@ -107,6 +144,39 @@ class CmpFilterSpec():
                 return vm(obj, op, val)
             return (f, self.needed_keys, invert)
 
+    # Operators that work the same way for floats and NumPy arrays
+    _COLUMN_OPERATORS = (operator.__eq__, operator.__gt__, operator.__lt__,
+                         operator.__ge__, operator.__le__)
+
+    def make_column_test(self, op, user_value):
+        """
+        Return (KEY, OPERATOR, VALUE) tuple for `make_filter` arguments or None
+
+        See `BoolFilterSpec`.
+        """
+        if self.column is None:
+            return None
+        elif op is None and user_value is None:
+            return (self.column, operator.__ne__, 0)
+        elif (op in self._COLUMN_OPERATORS and isinstance(user_value, (int, float))
+              and not isinstance(user_value, bool)):
+            return (self.column, op, float(user_value))
+        return None
+
+    def make_inline_test(self, op, user_value):
+        """
+        Return (KEY, OPERATOR, VALUE) tuple for `make_filter` arguments or None
+
+        Unlike `make_column_test`, VALUE and the value of KEY can be of any type
+        that supports OPERATOR.
+        """
+        column_test = self.make_column_test(op, user_value)
+        if column_test is not None:
+            return column_test
+        elif self._value_key is not None and op is not None and user_value is not None:
+            return (self._value_key, op, user_value)
+        return None
+
 
 class FilterSpecDict(abc.Mapping):
     """TODO"""
@@ -191,7 +261,7 @@ class Filter():
     @classmethod
     def _make_filter(cls, name, op, user_value, invert):
         """
-        Return filter function, needed keys and invert
+        Return filter function, needed keys, invert, column test and inline test
 
         Filter function takes a value and returns whether it matches
         `user_value`.
@@ -199,6 +269,12 @@ class Filter():
         Filter function and needed keys are both `None` if everything is
         matched.
 
+        Column test is a (KEY, OPERATOR, VALUE) tuple that is equivalent to the
+        filter function or None (see `BoolFilterSpec`).
+
+        Inline test is like column test, but KEY's value and VALUE may be of any
+        type (see `CmpFilterSpec.make_inline_test`).
+
         Raise ValueError on error
         """
         # Ensure value is wanted by filter, compatible to operator and of proper type
@@ -207,9 +283,16 @@ class Filter():
 
         fspec = cls._get_filter_spec(name)
         if fspec.type is BOOLEAN:
-            return (fspec.filter_function, fspec.needed_keys, invert)
+            return (fspec.filter_function, fspec.needed_keys, invert, fspec.column, fspec.column)
         elif fspec.type is COMPARATIVE:
-            return fspec.make_filter(cls.OPERATORS.get(op), user_value, invert)
+            op = cls.OPERATORS.get(op)
+            filter_func, needed_keys, invert = fspec.make_filter(op, user_value, invert)
+            if filter_func:
+                column_test = fspec.make_column_test(op, user_value)
+                inline_test = fspec.make_inline_test(op, user_value)
+            else:
+                column_test = inline_test = None
+            return (filter_func, needed_keys, invert, column_test, inline_test)
 
     @classmethod
     def _validate_user_value(cls, name, op, user_value):
@@ -333,7 +416,8 @@ class Filter():
         try:
             log.debug('  Getting filter spec: name=%r, op=%r, user_value=%r', name, op, user_value)
             # Get filter spec by `name`
-            filter_func, needed_keys, invert = self._make_filter(name, op, user_value, invert)
+            filter_func, needed_keys, invert, column_test, inline_test = \
+                self._make_filter(name, op, user_value, invert)
         except ValueError:
             # Filter spec lookup failed
             if self.DEFAULT_FILTER and user_value is op is None:
@@ -343,17 +427,23 @@ class Filter():
                 name, op, user_value = self.DEFAULT_FILTER, self.DEFAULT_OPERATOR, name
                 log.debug('  Using name as value for default filter: name=%r, op=%r, user_value=%r',
                           name, op, user_value)
-                filter_func, needed_keys, invert = self._make_filter(name, op, user_value, invert)
+                filter_func, needed_keys, invert, column_test, inline_test = \
+                    self._make_filter(name, op, user_value, invert)
             else:
                 # No DEFAULT_FILTER is set, so we can't default to it
                 raise
 
         log.debug('  Final filter: name=%r, invert=%r, op=%r, user_value=%r',
                   name, invert, op, user_value)
+        self._column_test = column_test
+        self._inline_test = inline_test
         self._filter_func = filter_func
         self._needed_keys = needed_keys
         self._name, self._invert, self._op, self._user_value = name, invert, op, user_value
         self._hash = hash((name, invert, op, user_value))
+        fspec = self._get_filter_spec(name) if filter_func else None
+        self._spec_cost = fspec.cost if fspec is not None else None
+        self._volatile = fspec.volatile if fspec is not None else False
 
     def apply(self, objs, invert=False, key=None):
         """Yield matching objects or `key` of each matching object"""
@@ -380,6 +470,17 @@ class Filter():
                     if bool(is_wanted(obj)) ^ invert:
                         yield obj[key]
 
+    def match_columns(self, columns, rows):
+        """
+        Return mask of matching `rows` in `columns` (see `client.columns`)
+
+        Return None if this filter can't be evaluated on columns.
+        """
+        column_test = self._column_test
+        if column_test is not None:
+            key, op, value = column_test
+            return columns.compare(key, rows, op, value, invert=self._invert)
+
     def match(self, obj):
         """Return True if `obj` matches, False otherwise"""
         is_wanted = self._filter_func
@@ -410,6 +511,76 @@ class Filter():
                     val = cliparser.quote(val, delims=(' ', '&', '|'), quotes=("'", '"'))
                 return name + op + val
 
+    # Python expressions for inline tests; `item` is the value of KEY
+    _OPERATOR_SOURCES = {
+        operator.__eq__: '{item} == {value}', operator.__ne__: '{item} != {value}',
+        operator.__gt__: '{item} > {value}', operator.__lt__: '{item} < {value}',
+        operator.__ge__: '{item} >= {value}', operator.__le__: '{item} <= {value}',
+        operator.__contains__: '{value} in {item}',
+    }
+
+    def source(self, namespace):
+        """
+        Return Python expression that is true if `obj` matches this filter
+
+        namespace: Dictionary that gets any objects the expression refers to
+
+        Inline tests (see `_make_filter`) are turned into expressions that
+        don't call any Python functions (e.g. "obj['size'] > _0").  Other
+        filters are called with `obj`.
+        """
+        def name(value):
+            name = '_%d' % len(namespace)
+            namespace[name] = value
+            return name
+
+        if self._filter_func is None:
+            expr = 'True'
+        elif self._inline_test is not None:
+            key, op, value = self._inline_test
+            item = 'obj[%r]' % (key,) if isinstance(key, str) else 'obj[%s]' % name(key)
+            template = self._OPERATOR_SOURCES.get(op)
+            if template is not None:
+                expr = template.format(item=item, value=name(value))
+            elif self._op == '=~' and isinstance(value, _PATTERN_TYPE):
+                expr = '%s(%s)' % (name(value.search), item)
+            else:
+                expr = '%s(%s, %s)' % (name(op), item, name(value))
+        else:
+            expr = '%s(obj)' % name(self._filter_func)
+        return ('not (%s)' if self._invert else '(%s)') % (expr,)
+
+    @property
+    def cost(self):
+        """
+        Estimated relative cost of matching one item
+
+        Numeric comparisons of a single value cost 1, other comparisons of a
+        single value cost 2 and everything else costs 3 unless the filter spec
+        provides a cost.  Regular expressions add 2.
+        """
+        if self._filter_func is None:
+            return 0
+        elif self._spec_cost is not None:
+            cost = self._spec_cost
+        elif self._inline_test is not None:
+            value = self._inline_test[2]
+            cost = 1 if isinstance(value, (int, float)) else 2
+        else:
+            cost = 3
+        return cost + 2 if self._op == '=~' else cost
+
+    # Rough guesses of how many items match an operator
+    _SELECTIVITIES = {'=': 0.1, '~': 0.3, '=~': 0.3}
+
+    @property
+    def selectivity(self):
+        """Estimated fraction of items that match (0 to 1)"""
+        if self._filter_func is None:
+            return 0 if self._invert else 1
+        selectivity = self._SELECTIVITIES.get(self._op, 0.5)
+        return 1 - selectivity if self._invert else selectivity
+
     @property
     def needed_keys(self):
         return self._needed_keys
@@ -422,6 +593,11 @@ class Filter():
     def inverted(self):
         return self._invert
 
+    @property
+    def volatile(self):
+        """Whether matches can change without any change of `needed_keys`"""
+        return self._volatile
+
     def __eq__(self, other):
         if isinstance(other, type(self)):
             for attr in ('_name', '_user_value', '_invert', '_op'):
@@ -469,6 +645,7 @@ class FilterChain(metaclass=_forward_attrs):
                              % (type(filters).__name__, filters))
 
         self._filterchains = ()
+        self._predicates = {}
 
         # Split `filters` at boolean operators
         parts = cliparser.tokenize(filters, delims=('&', '|'))
@@ -512,17 +689,124 @@ class FilterChain(metaclass=_forward_attrs):
             log.debug('Chained %r and %r to %r', filters, ops, fchain)
             self._filterchains = tuple(tuple(x) for x in fchain)
 
-    def apply(self, objects):
-        """Yield matching objects from iterable `objects`"""
-        chains = self._filterchains
-        if chains:
-            for obj in objects:
-                if any(all(f.match(obj) for f in AND_chain)
-                       for AND_chain in chains):
-                    yield obj
+    def apply(self, objects, columns=None, cache=None):
+        """
+        Yield matching objects from iterable `objects`
+
+        columns: None or `client.columns.Columns` instance that contains all
+                 `objects`; filters that support it are evaluated for all
+                 objects at once
+        cache:   None or `client.filtercache.FilterCache` instance that
+                 contains all `objects`; only objects that changed since this
+                 filter was last applied are matched
+        """
+        if self._filterchains:
+            objects = tuple(objects)
+            yield from itertools.compress(objects, self.matches(objects, columns=columns, cache=cache))
         else:
             yield from objects
 
+    def matches(self, objects, columns=None, cache=None):
+        """
+        Return list of booleans that say whether each of `objects` matches
+
+        See `apply` for `columns` and `cache`.
+        """
+        if not self._filterchains:
+            return [True] * len(objects)
+        elif cache is not None and not self.volatile:
+            matches = cache.matches(self, objects, lambda objs: self._matches(objs, columns))
+            if matches is not None:
+                return matches
+        return self._matches(objects, columns)
+
+    def _matches(self, objects, columns):
+        if columns is not None:
+            matches = self._match_columns(objects, columns)
+            if matches is not None:
+                return matches
+        return list(map(self._compile(self._filterchains), objects))
+
+    def _compile(self, chains):
+        """
+        Return function that takes an object and returns whether it matches
+        `chains`
+
+        chains: Tuple of tuples of filters (see `_filterchains`)
+
+        All filters are combined into a single Python expression.  Filters in
+        each AND chain are sorted so that filters that are cheap and likely to
+        fail come first, and AND chains are sorted so that chains that are cheap
+        and likely to match come first (see `Filter.cost` and
+        `Filter.selectivity`).
+        """
+        predicate = self._predicates.get(chains)
+        if predicate is not None:
+            return predicate
+
+        def and_rank(f):
+            return f.cost / max(1 - f.selectivity, 0.01)
+
+        OR_chains = []
+        namespace = {}
+        for AND_chain in chains:
+            AND_chain = sorted(AND_chain, key=and_rank)
+            # Expected cost of evaluating the chain and probability of a match
+            cost, selectivity = 0, 1
+            for f in AND_chain:
+                cost += f.cost * selectivity
+                selectivity *= f.selectivity
+            source = ' and '.join(f.source(namespace) for f in AND_chain)
+            OR_chains.append((cost / max(selectivity, 0.01), source))
+        OR_chains.sort(key=lambda chain: chain[0])
+
+        source = 'lambda obj: True if %s else False' % (
+            ' or '.join('(%s)' % (source,) for _,source in OR_chains),)
+        log.debug('Compiled %r: %s', self, source)
+        predicate = self._predicates[chains] = eval(source, namespace)
+        return predicate
+
+    def _match_columns(self, objects, columns):
+        # Return list of booleans for `objects` or None if no filter can be
+        # evaluated on `columns`
+        rows = columns.rows(objects)
+        if rows is None:
+            return None
+
+        # Evaluate filters on columns and remember the other ones
+        masks = []
+        for AND_chain in self._filterchains:
+            mask = None
+            other_filters = []
+            for f in AND_chain:
+                m = f.match_columns(columns, rows)
+                if m is None:
+                    other_filters.append(f)
+                elif mask is None:
+                    mask = m
+                else:
+                    mask = columns.mask_and(mask, m)
+            masks.append((mask, other_filters))
+        if all(mask is None for mask,_ in masks):
+            return None
+
+        # Combine AND_chains that don't need any other filters with OR
+        matches = None
+        for mask,other_filters in masks:
+            if not other_filters:
+                matches = mask if matches is None else columns.mask_or(matches, mask)
+        matches = columns.mask_list(matches) if matches is not None else [False] * len(objects)
+
+        # Match remaining objects individually
+        for mask,other_filters in masks:
+            if other_filters:
+                mask = columns.mask_list(mask) if mask is not None else None
+                match = self._compile((tuple(other_filters),))
+                for i,obj in enumerate(objects):
+                    if not matches[i] and (mask is None or mask[i]) and match(obj):
+                        matches[i] = True
+        return matches
+
     def match(self, obj):
         """Whether `obj` matches this filter chain"""
         # All filters in an AND_chain must match for the AND_chain to
@@ -531,8 +815,7 @@ class FilterChain(metaclass=_forward_attrs):
         if not chains:
             return True
         else:
-            return any(all(f.match(obj) for f in AND_chain)
-                       for AND_chain in chains)
+            return self._compile(chains)(obj)
 
     @property
     def needed_keys(self):
@@ -543,6 +826,31 @@ class FilterChain(metaclass=_forward_attrs):
                 keys.update(filter.needed_keys)
         return tuple(keys)
 
+    @property
+    def volatile(self):
+        """Whether matches can change without any change of `needed_keys`"""
+        return any(f.volatile for chain in self._filterchains for f in chain)
+
+    def relaxed(self, keys):
+        """
+        Return filter chain without the filters that need any keys except `keys`
+
+        Every object that matches this chain also matches the returned chain,
+        which can find candidates before the other keys are known.  If all
+        filters of an AND chain are removed, the returned chain matches
+        everything.  If no filters are removed, this chain is returned.
+        """
+        keys = set(keys)
+        if keys.issuperset(self.needed_keys):
+            return self
+        OR_chains = []
+        for AND_chain in self._filterchains:
+            AND_chain = [f for f in AND_chain if keys.issuperset(f.needed_keys)]
+            if not AND_chain:
+                return type(self)()
+            OR_chains.append('&'.join(str(f) for f in AND_chain))
+        return type(self)('|'.join(OR_chains))
+
     def __eq__(self, other):
         if not isinstance(other, type(self)):
             return NotImplemented
@@ -554,6 +862,9 @@ class FilterChain(metaclass=_forward_attrs):
             other_fc_sets = set(frozenset(x) for x in other._filterchains)
             return self_fc_sets == other_fc_sets
 
+    def __hash__(self):
+        return hash(frozenset(frozenset(x) for x in self._filterchains))
+
     def __str__(self):
         if len(self._filterchains) < 1:
             return ''
@@ -65,6 +65,7 @@ class _SingleFilter(Filter):
                                        description='Match VALUE against peer client'),
         'host'        : _CmpFilterSpec(value_getter=lambda p: rdns.gethostbyaddr_from_cache(p['ip']) or p['ip'],
                                        value_type=TorrentPeer.TYPES['ip'],
+                                       cost=5,
                                        description='Match VALUE against peer host name or IP address'),
         'port'        : _CmpFilterSpec(value_getter=lambda p: p['port'],
                                        value_type=TorrentPeer.TYPES['port'],
@@ -11,6 +11,8 @@
 
 """Filtering Torrents by their values"""
 
+import operator
+
 from ..ttypes import TYPES as VALUETYPES
 from ..ttypes import Status
 from ..utils import Bandwidth, BoolOrBandwidth, convert
@@ -24,16 +26,17 @@ def _desc(text):
     return text
 
 
-_STATUS_VERIFY    = Status.VERIFY
-_STATUS_DOWNLOAD  = Status.DOWNLOAD
-_STATUS_UPLOAD    = Status.UPLOAD
-_STATUS_INIT      = Status.INIT
-_STATUS_CONNECTED = Status.CONNECTED
-_STATUS_ISOLATED  = Status.ISOLATED
-_STATUS_QUEUED    = Status.QUEUED
-_STATUS_SEED      = Status.SEED
-_STATUS_IDLE      = Status.IDLE
-_STATUS_STOPPED   = Status.STOPPED
+_STATUS_VERIFY    = Status.BITS[Status.VERIFY]
+_STATUS_DOWNLOAD  = Status.BITS[Status.DOWNLOAD]
+_STATUS_UPLOAD    = Status.BITS[Status.UPLOAD]
+_STATUS_INIT      = Status.BITS[Status.INIT]
+_STATUS_CONNECTED = Status.BITS[Status.CONNECTED]
+_STATUS_ISOLATED  = Status.BITS[Status.ISOLATED]
+_STATUS_QUEUED    = Status.BITS[Status.QUEUED]
+_STATUS_SEED      = Status.BITS[Status.SEED]
+_STATUS_IDLE      = Status.BITS[Status.IDLE]
+_STATUS_STOPPED   = Status.BITS[Status.STOPPED]
+_STATUS_CONNECTED_OR_VERIFY = _STATUS_CONNECTED | _STATUS_VERIFY
 
 
 class _SingleFilter(Filter):
@@ -45,41 +48,44 @@ class _SingleFilter(Filter):
                                        description='All torrents'),
         'complete'    : BoolFilterSpec(lambda t: t['%downloaded'] >= 100,
                                        needed_keys=('%downloaded',),
+                                       column=('%downloaded', operator.__ge__, 100),
                                        aliases=('cmp',),
                                        description='Torrents with all wanted files downloaded'),
-        'stopped'     : BoolFilterSpec(lambda t: _STATUS_STOPPED in t['status'],
+        'stopped'     : BoolFilterSpec(lambda t: bool(t['status'] & _STATUS_STOPPED),
                                        needed_keys=('status',),
                                        aliases=('stp',),
                                        description='Torrents that are not allowed to up- or download'),
-        'active'      : BoolFilterSpec(lambda t: _STATUS_CONNECTED in t['status'] or _STATUS_VERIFY in t['status'],
+        'active'      : BoolFilterSpec(lambda t: bool(t['status'] & _STATUS_CONNECTED_OR_VERIFY),
                                        needed_keys=('peers-connected', 'status'),
                                        aliases=('act',),
                                        description='Torrents connected to peers or being verified'),
         'uploading'   : BoolFilterSpec(lambda t: t['rate-up'] > 0,
                                        needed_keys=('rate-up',),
+                                       column=('rate-up', operator.__gt__, 0),
                                        aliases=('upg',),
                                        description='Torrents using upload bandwidth'),
         'downloading' : BoolFilterSpec(lambda t: t['rate-down'] > 0,
                                        needed_keys=('rate-down',),
+                                       column=('rate-down', operator.__gt__, 0),
                                        aliases=('dng',),
                                        description='Torrents using download bandwidth'),
-        'leeching'    : BoolFilterSpec(lambda t: t['%downloaded'] < 100 and _STATUS_STOPPED not in t['status'],
+        'leeching'    : BoolFilterSpec(lambda t: t['%downloaded'] < 100 and not t['status'] & _STATUS_STOPPED,
                                        needed_keys=('%downloaded', 'status'),
                                        aliases=('lcg',),
                                        description='Unstopped torrents downloading or waiting for seeds'),
-        'seeding'     : BoolFilterSpec(lambda t: t['%downloaded'] >= 100 and _STATUS_STOPPED not in t['status'],
+        'seeding'     : BoolFilterSpec(lambda t: t['%downloaded'] >= 100 and not t['status'] & _STATUS_STOPPED,
                                        needed_keys=('%downloaded', 'status'),
                                        aliases=('sdg',),
                                        description='Unstopped torrents with all wanted files downloaded'),
-        'verifying'   : BoolFilterSpec(lambda t: _STATUS_VERIFY in t['status'],
+        'verifying'   : BoolFilterSpec(lambda t: bool(t['status'] & _STATUS_VERIFY),
                                        needed_keys=('status',),
                                        aliases=('vfg',),
                                        description='Torrents being verified or queued for verification'),
-        'idle'        : BoolFilterSpec(lambda t: (_STATUS_IDLE in t['status'] and
-                                                  _STATUS_STOPPED not in t['status']),
+        'idle'        : BoolFilterSpec(lambda t: (t['status'] & (_STATUS_IDLE | _STATUS_STOPPED)
+                                                  == _STATUS_IDLE),
                                        needed_keys=('status',),
                                        description="Unstopped torrents that don't do anything"),
-        'isolated'    : BoolFilterSpec(lambda t: _STATUS_ISOLATED in t['status'],
+        'isolated'    : BoolFilterSpec(lambda t: bool(t['status'] & _STATUS_ISOLATED),
                                        needed_keys=('status',),
                                        aliases=('isl',),
                                        description='Torrents that cannot discover new peers in any way'),
@@ -93,32 +99,28 @@ class _SingleFilter(Filter):
         'id'              : CmpFilterSpec(value_getter=lambda t: t['id'],
                                           value_type=VALUETYPES['id'],
                                           needed_keys=('id',),
+                                          column='id',
                                           description=_desc('... torrent ID')),
 
-        'hash'            : CmpFilterSpec(value_getter=lambda t: t['hash'],
-                                          value_type=VALUETYPES['hash'],
+        'hash'            : CmpFilterSpec(value_type=VALUETYPES['hash'],
                                           needed_keys=('hash',),
                                           description=_desc('... torrent SHA1 hash')),
 
-        'name'            : CmpFilterSpec(value_getter=lambda t: t['name'],
-                                          value_type=VALUETYPES['name'],
+        'name'            : CmpFilterSpec(value_type=VALUETYPES['name'],
                                           needed_keys=('name',),
                                           aliases=('n',),
                                           description=_desc('... name')),
 
-        'comment'         : CmpFilterSpec(value_getter=lambda t: t['comment'],
-                                          value_type=VALUETYPES['comment'],
+        'comment'         : CmpFilterSpec(value_type=VALUETYPES['comment'],
                                           needed_keys=('comment',),
                                           aliases=('cmnt',),
                                           description=_desc('... comment')),
 
-        'path'            : CmpFilterSpec(value_getter=lambda t: t['path'],
-                                          value_type=VALUETYPES['path'],
+        'path'            : CmpFilterSpec(value_type=VALUETYPES['path'],
                                           needed_keys=('path',),
                                           description=_desc('... absolute path to download directory')),
 
-        'error'           : CmpFilterSpec(value_getter=lambda t: t['error'],
-                                          value_type=VALUETYPES['error'],
+        'error'           : CmpFilterSpec(value_type=VALUETYPES['error'],
                                           needed_keys=('error',),
                                           aliases=('err',),
                                           description=_desc('... error message')),
@@ -126,18 +128,21 @@ class _SingleFilter(Filter):
         'uploaded'        : CmpFilterSpec(value_getter=lambda t: t['size-uploaded'],
                                           value_type=VALUETYPES['size-uploaded'],
                                           needed_keys=('size-uploaded',),
+                                          column='size-uploaded',
                                           aliases=('up',),
                                           description=_desc('... number of uploaded bytes')),
 
         'downloaded'      : CmpFilterSpec(value_getter=lambda t: t['size-downloaded'],
                                           value_type=VALUETYPES['size-downloaded'],
                                           needed_keys=('size-downloaded',),
+                                          column='size-downloaded',
                                           aliases=('dn',),
                                           description=_desc('... number of downloaded bytes')),
 
         '%downloaded'     : CmpFilterSpec(value_getter=lambda t: t['%downloaded'],
                                           value_type=VALUETYPES['%downloaded'],
                                           needed_keys=('%downloaded',),
+                                          column='%downloaded',
                                           aliases=('%dn',),
                                           description=_desc('... percentage of downloaded bytes')),
 
@@ -145,24 +150,28 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['size-final'],
                                           value_convert=convert.size,
                                           needed_keys=('size-final',),
+                                          column='size-final',
                                           aliases=('sz',),
                                           description=_desc('... combined size of all wanted files')),
 
         'peers'           : CmpFilterSpec(value_getter=lambda t: t['peers-connected'],
                                           value_type=VALUETYPES['peers-connected'],
                                           needed_keys=('peers-connected',),
+                                          column='peers-connected',
                                           aliases=('prs',),
                                           description=_desc('... number of connected peers')),
 
         'seeds'           : CmpFilterSpec(value_getter=lambda t: t['peers-seeding'],
                                           value_type=VALUETYPES['peers-seeding'],
                                           needed_keys=('peers-seeding',),
+                                          column='peers-seeding',
                                           aliases=('sds',),
                                           description=_desc('... largest number of seeds reported by any tracker')),
 
         'ratio'           : CmpFilterSpec(value_getter=lambda t: t['ratio'],
                                           value_type=VALUETYPES['ratio'],
                                           needed_keys=('ratio',),
+                                          column='ratio',
                                           aliases=('rto',),
                                           description=_desc('... uploaded/downloaded ratio')),
 
@@ -170,6 +179,7 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['rate-up'],
                                           value_convert=Bandwidth,
                                           needed_keys=('rate-up',),
+                                          column='rate-up',
                                           aliases=('rup',),
                                           description=_desc('... upload rate')),
 
@@ -177,6 +187,7 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['rate-down'],
                                           value_convert=Bandwidth,
                                           needed_keys=('rate-down',),
+                                          column='rate-down',
                                           aliases=('rdn',),
                                           description=_desc('... download rate')),
 
@@ -201,6 +212,7 @@ class _SingleFilter(Filter):
                                                                              for tracker in t['trackers']),
                                           value_type=str,
                                           needed_keys=('trackers',),
+                                          cost=10,
                                           aliases=('trk',),
                                           description=_desc('... domain of the announce URL of trackers')),
 
@@ -209,6 +221,7 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['timespan-eta'],
                                           value_convert=timestamp_or_timedelta,
                                           needed_keys=('timespan-eta',),
+                                          volatile=True,
                                           description=_desc('... estimated time to finish downloading')),
 
         'created'         : CmpFilterSpec(value_getter=lambda t: t['time-created'],
@@ -216,6 +229,7 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['time-created'],
                                           value_convert=lambda v: timestamp_or_timedelta(v, default_sign=-1),
                                           needed_keys=('time-created',),
+                                          volatile=True,
                                           aliases=('tcrt',),
                                           description=_desc('... torrent creation time')),
 
@@ -224,6 +238,7 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['time-added'],
                                           value_convert=lambda v: timestamp_or_timedelta(v, default_sign=-1),
                                           needed_keys=('time-added',),
+                                          volatile=True,
                                           aliases=('tadd',),
                                           description=_desc('... time torrent was added')),
 
@@ -232,6 +247,7 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['time-started'],
                                           value_convert=lambda v: timestamp_or_timedelta(v, default_sign=-1),
                                           needed_keys=('time-started',),
+                                          volatile=True,
                                           aliases=('tsta',),
                                           description=_desc('... last time torrent was started')),
 
@@ -240,6 +256,7 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['time-activity'],
                                           value_convert=lambda v: timestamp_or_timedelta(v, default_sign=-1),
                                           needed_keys=('time-activity',),
+                                          volatile=True,
                                           aliases=('tact',),
                                           description=_desc('... time torrent was active')),
 
@@ -248,6 +265,7 @@ class _SingleFilter(Filter):
                                           value_type=VALUETYPES['time-completed'],
                                           value_convert=lambda v: timestamp_or_timedelta(v, default_sign=-1),
                                           needed_keys=('time-completed',),
+                                          volatile=True,
                                           aliases=('tcmp',),
                                           description=_desc('... time all wanted files where/will be downloaded')),
     })
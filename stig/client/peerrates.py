@@ -0,0 +1,187 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details
+# http://www.gnu.org/licenses/gpl-3.0.txt
+
+"""Estimate download rates of peers from their progress"""
+
+import math
+import sys
+import time
+from collections import OrderedDict
+
+from ..logging import make_logger  # isort:skip
+log = make_logger(__name__)
+
+
+# Indexes of values we store for each peer
+_SEEN, _TIME, _PROGRESS, _RATE = range(4)
+
+
+class PeerRateEstimator():
+    """
+    Exponential moving average of peers' download rates
+
+    Transmission only tells us how much of a torrent each peer has downloaded.
+    Every time a peer's progress changes, the rate since the previous change is
+    added to a moving average that is weighted by the time between changes.
+
+    max_peers:  Maximum number of peers to track; the least recently sampled
+                peers are forgotten first
+    max_age:    Forget peers that weren't sampled for this many seconds
+    time_constant: Number of seconds after which an old rate has lost ~63% of
+                its weight
+    """
+
+    def __init__(self, max_peers=10000, max_age=1800, time_constant=60):
+        self._peers = OrderedDict()
+        self.max_peers = max_peers
+        self.max_age = max_age
+        self.time_constant = time_constant
+        self._samples = 0
+        self._evicted = 0
+        self._expired = 0
+        self._error = None  # Moving average of relative estimation errors
+
+    @property
+    def max_peers(self):
+        """Maximum number of tracked peers"""
+        return self._max_peers
+
+    @max_peers.setter
+    def max_peers(self, max_peers):
+        self._max_peers = int(max_peers)
+        self._evict()
+
+    def sample(self, peer_id, progress, size, now=None):
+        """
+        Add sample and return estimated download rate of peer
+
+        peer_id:  Any hashable object that identifies the peer
+        progress: How much of the torrent the peer has (0 to 1)
+        size:     Size of the torrent in bytes
+
+        Return estimated rate in bytes per second or 0 if the rate is unknown.
+        """
+        if now is None:
+            now = time.monotonic()
+        peers = self._peers
+        self._samples += 1
+
+        data = peers.get(peer_id)
+        if data is None:
+            # The first sample's progress is not current but the latest we
+            # received, which happened likely tens of seconds ago, so we can't
+            # use its timestamp.  _TIME is set when progress changes.
+            peers[peer_id] = [now, None, progress, None]
+            self._evict()
+            self._expire(now)
+            return 0
+
+        data[_SEEN] = now
+        peers.move_to_end(peer_id)
+        self._expire(now)
+
+        if progress != data[_PROGRESS]:
+            t_prev = data[_TIME]
+            p_diff = progress - data[_PROGRESS]
+            data[_TIME] = now
+            data[_PROGRESS] = progress
+            # Progress can go down, e.g. if a peer deletes a file
+            if t_prev is not None and p_diff > 0 and now > t_prev:
+                self._add_rate(data, size * p_diff / (now - t_prev), now - t_prev)
+
+        rate = data[_RATE]
+        return 0 if rate is None else rate
+
+    def _add_rate(self, data, rate, t_diff):
+        old_rate = data[_RATE]
+        if old_rate is None:
+            data[_RATE] = rate
+        else:
+            # Track how far off our previous estimate was
+            error = abs(rate - old_rate) / rate
+            self._error = error if self._error is None else self._error + 0.1 * (error - self._error)
+
+            weight = 1 - math.exp(-t_diff / self.time_constant)
+            data[_RATE] = old_rate + weight * (rate - old_rate)
+
+    def touch(self, peer_id, now=None):
+        """
+        Mark peer as seen without a new sample so it doesn't expire
+
+        This is for peers that are still connected but didn't change since the
+        previous sample.  Peers that are not tracked are ignored.
+        """
+        data = self._peers.get(peer_id)
+        if data is not None:
+            data[_SEEN] = time.monotonic() if now is None else now
+            self._peers.move_to_end(peer_id)
+
+    def rate(self, peer_id):
+        """Return estimated download rate of peer or 0 if it is unknown"""
+        data = self._peers.get(peer_id)
+        return 0 if data is None or data[_RATE] is None else data[_RATE]
+
+    def remove(self, peer_id):
+        """Forget peer"""
+        self._peers.pop(peer_id, None)
+
+    def clear(self):
+        """Forget all peers"""
+        self._peers.clear()
+
+    def _evict(self):
+        peers = self._peers
+        while len(peers) > self._max_peers:
+            peers.popitem(last=False)
+            self._evicted += 1
+
+    def _expire(self, now):
+        # Peers are ordered by the time they were last sampled
+        peers = self._peers
+        max_seen = now - self.max_age
+        while peers:
+            peer_id, data = next(iter(peers.items()))
+            if data[_SEEN] >= max_seen:
+                break
+            del peers[peer_id]
+            self._expired += 1
+
+    @property
+    def stats(self):
+        """
+        Dictionary with the keys:
+
+        peers:   Number of tracked peers
+        rates:   Number of peers with a rate estimate
+        memory:  Approximate memory usage in bytes
+        samples: Number of samples
+        evicted: Number of peers that were forgotten because of `max_peers`
+        expired: Number of peers that were forgotten because of `max_age`
+        error:   Moving average of the relative difference between estimated
+                 rates and the following measured rates or None
+        """
+        peers = self._peers
+        memory = sys.getsizeof(peers)
+        for peer_id,data in peers.items():
+            memory += sys.getsizeof(peer_id) + sys.getsizeof(data)
+        return {'peers': len(peers),
+                'rates': sum(1 for data in peers.values() if data[_RATE] is not None),
+                'memory': memory,
+                'samples': self._samples,
+                'evicted': self._evicted,
+                'expired': self._expired,
+                'error': self._error}
+
+    def __len__(self):
+        return len(self._peers)
+
+    def __repr__(self):
+        return '<%s %d peers>' % (type(self).__name__, len(self))
@@ -20,6 +20,13 @@ from .utils import SleepUneasy
 from ..logging import make_logger  # isort:skip
 log = make_logger(__name__)
 
+# Multiply the delay between polls by this factor after each poll without
+# activity (see RequestPoller.max_interval)
+BACKOFF_FACTOR = 1.5
+
+# Increase the delay between polls if requests take a larger share of it
+MAX_REQUEST_SHARE = 0.25
+
 
 def _func_call_str(func, *posargs, **kwargs):
     if func is None:
@@ -46,14 +53,19 @@ class RequestPoller():
 
     request: Coroutine that is called at intervals
     interval: Delay between calls
+    max_interval: Maximum delay between calls or None (see `max_interval`)
 
     Any other positional or keyword arguments are passed to `request`.
     """
-    def __init__(self, request, *args, interval=1, **kwargs):
+    def __init__(self, request, *args, interval=1, max_interval=None, **kwargs):
         self._on_response = blinker.Signal()
         self._on_error = blinker.Signal()
         self._prev_error = None
         self._interval = interval
+        self._max_interval = max_interval
+        self._delay = interval
+        self._active = False
+        self._request_time = 0
         self._poll_task = None
         self._poll_loop_task = None
         self._sleep = SleepUneasy()
@@ -98,7 +110,30 @@ class RequestPoller():
                 self._poll_task = None
                 self._skip_ongoing_request = False
 
-            await self._sleep.sleep(self._interval)
+            await self._sleep.sleep(self._next_delay())
+
+    def _next_delay(self):
+        interval = self._interval
+        max_interval = self._max_interval
+        if max_interval is None or max_interval <= interval:
+            self._delay = interval
+            return interval
+
+        if self._active:
+            delay = interval
+        else:
+            delay = min(self._delay * BACKOFF_FACTOR, max_interval)
+
+        # Don't keep the daemon busy with slow requests
+        min_delay = min(self._request_time / MAX_REQUEST_SHARE, max_interval)
+        if delay < min_delay:
+            log.debug('Request took %.3fs, increasing delay to %.3fs: %s',
+                      self._request_time, min_delay, self._debug_info['request'])
+            delay = min_delay
+
+        self._active = False
+        self._delay = delay
+        return delay
 
     async def _do_poll(self):
         """Send request and send response or error
@@ -113,6 +148,8 @@ class RequestPoller():
             log.debug('No request: %s', self._debug_info)
         else:
             log.debug('Polling: %s', self._debug_info['request'])
+            loop = asyncio.get_event_loop()
+            start = loop.time()
             try:
                 response = await self._request()
             except asyncio.CancelledError:
@@ -122,6 +159,7 @@ class RequestPoller():
                 # Report error but keep trying to connect
                 self._run_callbacks(error=e)
             else:
+                self._request_time = loop.time() - start
                 self._run_callbacks(response=response)
 
     def _run_callbacks(self, response=None, error=None):
@@ -174,9 +212,22 @@ class RequestPoller():
 
         Do nothing if this poller is not started.
         """
+        self._active = True
         if self.running:
             self._sleep.interrupt()
 
+    def report_activity(self):
+        """
+        Poll every `interval` seconds again after the delay was increased
+
+        If the current delay is longer than `interval`, poll immediately.
+
+        See `max_interval`.
+        """
+        self._active = True
+        if self._delay > self._interval:
+            self.poll()
+
     @property
     def running(self):
         """Whether poller is polling"""
@@ -243,6 +294,22 @@ class RequestPoller():
         if self.running:
             self.poll()
 
+    @property
+    def max_interval(self):
+        """
+        Maximum seconds between polls or None
+
+        If this is greater than `interval`, the delay between polls grows
+        towards `max_interval` after each poll until `poll` or
+        `report_activity` is called.  The delay also grows if requests take a
+        large share of it.
+        """
+        return self._max_interval
+
+    @max_interval.setter
+    def max_interval(self, max_interval):
+        self._max_interval = float(max_interval) if max_interval is not None else None
+
     def __repr__(self):
         if hasattr(self, '_debug_info'):
             return '<%s %s, callbacks=%s, error_callbacks=%s>' % (
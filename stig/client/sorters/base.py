@@ -9,32 +9,81 @@
 # GNU General Public License for more details
 # http://www.gnu.org/licenses/gpl-3.0.txt
 
-from functools import partial
+import itertools
 
 from ...logging import make_logger  # isort:skip
 log = make_logger(__name__)
 
 
+def _sort(items, levels, item_getter, columns):
+    """
+    Return list of `items` sorted by multiple keys
+
+    levels: Sequence of (KEYFUNC, REVERSE, COLUMN) tuples with the lowest
+            priority first; COLUMN is a key in `columns` or None
+
+    The result is the same as sorting `items` with `sorted` by each KEYFUNC in
+    the given order, but each KEYFUNC is only called once per item.  Instead of
+    the items, we sort their indexes, which are mapped to the precomputed keys
+    without calling any Python code.  Consecutive levels with the same direction
+    that are available in `columns` are sorted by `columns` in one go.
+    """
+    items = list(items)
+    objs = list(map(item_getter, items))
+    order = range(len(items))
+
+    def run_key(level):
+        _,reverse,column = level
+        return (reverse, column is not None and columns is not None and column in columns.keys)
+
+    for (reverse,is_columnar),run in itertools.groupby(levels, key=run_key):
+        run = tuple(run)
+        if is_columnar:
+            sorted_order = columns.sort(order, tuple(column for _,_,column in run),
+                                        reverse=reverse, item_getter=objs.__getitem__)
+            if sorted_order is not None:
+                order = sorted_order
+                continue
+        for keyfunc,_,_ in run:
+            keys = list(map(keyfunc, objs))
+            order = sorted(order, key=keys.__getitem__, reverse=reverse)
+    return list(map(items.__getitem__, order))
+
+
 class SortSpec():
-    def __init__(self, *keyfuncs, description, aliases=()):
+    """
+    Sort order specification
+
+    keyfuncs: Callables that take an item and return a value to sort by; items
+              are sorted by each callable in the given order
+    columns:  Keys of numeric values that `keyfuncs` return unmodified (one per
+              callable); this allows sorting many items at once (see
+              `client.columns`)
+    """
+
+    def __init__(self, *keyfuncs, description, aliases=(), columns=()):
         self._keyfuncs = keyfuncs
         self.description = description
         self.aliases = aliases
-
-    def __call__(self, items, reverse=False, inplace=False, item_getter=lambda item: item):
+        if columns and len(columns) != len(keyfuncs):
+            raise TypeError('Expected %d columns, got %d: %r' % (len(keyfuncs), len(columns), columns))
+        self.columns = tuple(columns)
+
+    def levels(self, reverse=False):
+        """Return tuple of (KEYFUNC, REVERSE, COLUMN) tuples for `_sort`"""
+        columns = self.columns or (None,) * len(self._keyfuncs)
+        return tuple((keyfunc, reverse, column)
+                     for keyfunc,column in zip(self._keyfuncs, columns))
+
+    def __call__(self, items, reverse=False, inplace=False, item_getter=lambda item: item,
+                 columns=None):
         if not items:
             return items
-
-        for keyfunc in self._keyfuncs:
-            def key_getter(item):
-                return keyfunc(item_getter(item))
-
-            if inplace:
-                items[:] = sorted(items, key=key_getter, reverse=reverse)
-            else:
-                items = sorted(items, key=key_getter, reverse=reverse)
-
-        return items
+        sorted_items = _sort(items, self.levels(reverse), item_getter, columns)
+        if inplace:
+            items[:] = sorted_items
+            return items
+        return sorted_items
 
 
 class _SorterBaseMeta(type):
@@ -60,7 +109,7 @@ class SorterBase(metaclass=_SorterBaseMeta):
 
     def __init__(self, sortstrings=()):
         sortspecs = []
-        sortfuncs = []
+        reverses = []
         strings = []   # String representations of sortspecs
 
         # Go through items in reverse because we want to deduplicate sort orders
@@ -80,9 +129,8 @@ class SorterBase(metaclass=_SorterBaseMeta):
             else:
                 sortspec = self.SORTSPECS[sortspecname]
                 if sortspec not in sortspecs:
-                    sortfunc = partial(sortspec, reverse=reverse)
                     sortspecs.insert(0, sortspec)
-                    sortfuncs.insert(0, sortfunc)
+                    reverses.insert(0, reverse)
                     strings.insert(0, (self.INVERT_CHARS[0] if reverse else '') + sortspecname)
         self._strings = tuple(strings)
 
@@ -90,13 +138,15 @@ class SorterBase(metaclass=_SorterBaseMeta):
         if self.DEFAULT_SORT is not None:
             default_sortspec = self.SORTSPECS[self.DEFAULT_SORT]
             if default_sortspec not in sortspecs:
-                sortfuncs.insert(0, default_sortspec)
                 sortspecs.insert(0, default_sortspec)
+                reverses.insert(0, False)
 
         self._sortspecs = sortspecs
-        self._sortfuncs = sortfuncs
+        # Keys of all sortspecs with the lowest priority first
+        self._levels = tuple(itertools.chain.from_iterable(
+            sortspec.levels(reverse) for sortspec,reverse in zip(sortspecs, reverses)))
 
-    def apply(self, items, inplace=False, item_getter=lambda item: item):
+    def apply(self, items, inplace=False, item_getter=lambda item: item, columns=None):
         """
         Sort sequence `items`
 
@@ -106,12 +156,19 @@ class SorterBase(metaclass=_SorterBaseMeta):
                      sorting of widgets as long as they can provide a sortable
                      object.)
         inplace: Modify `items` if True, otherwise return a new, sorted list
+        columns: None or `client.columns.Columns` instance that contains the
+                 objects returned by `item_getter`; sort orders that support it
+                 sort all items at once
         """
         import time
         start_time = time.monotonic()
 
-        for sorter in self._sortfuncs:
-            items = sorter(items, inplace=inplace, item_getter=item_getter)
+        if items and self._levels:
+            sorted_items = _sort(items, self._levels, item_getter, columns)
+            if inplace:
+                items[:] = sorted_items
+            else:
+                items = sorted_items
 
         log.debug('-> Sorted %d items by %s in %.3fms',
                   len(items), self, (time.monotonic() - start_time) * 1e3)
@@ -119,6 +176,44 @@ class SorterBase(metaclass=_SorterBaseMeta):
         if not inplace:
             return items
 
+    def insert(self, items, new_items, item_getter=lambda item: item):
+        """
+        Insert each item in `new_items` into `items` at its sorted position
+
+        items: Mutable sequence that is sorted by this sorter
+        new_items: Iterable of items that are not in `items`
+        item_getter: See `apply`
+
+        Sort keys are computed for O(log n) items per new item, so this is much
+        cheaper than `apply` if only a few items are new or have changed.  New
+        items are inserted after any equal items.
+        """
+        # Highest priority first
+        levels = tuple((keyfunc, reverse) for keyfunc,reverse,_ in reversed(self._levels))
+
+        def is_before(keys, item):
+            # Whether an item with `keys` is sorted before `item`
+            obj = item_getter(item)
+            for (keyfunc,reverse),key in zip(levels, keys):
+                other_key = keyfunc(obj)
+                if key < other_key:
+                    return not reverse
+                elif other_key < key:
+                    return reverse
+            return False
+
+        for new_item in new_items:
+            obj = item_getter(new_item)
+            keys = tuple(keyfunc(obj) for keyfunc,_ in levels)
+            lo, hi = 0, len(items)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if is_before(keys, items[mid]):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            items.insert(lo, new_item)
+
     def __add__(self, other):
         cls = type(self)
         if not isinstance(other, cls):
@@ -24,6 +24,7 @@ class TorrentSorter(SorterBase):
     SORTSPECS = {
         'id':                _SortSpec(lambda t: t['id'],
                                        needed_keys=('id',),
+                                       columns=('id',),
                                        description='ID'),
         'name':              _SortSpec(lambda t: t['name'].casefold(),
                                        aliases=('n',),
@@ -33,7 +34,7 @@ class TorrentSorter(SorterBase):
                                        aliases=('dir',),
                                        needed_keys=('path',),
                                        description='download path'),
-        'status':            _SortSpec(lambda t: t['status'],
+        'status':            _SortSpec(lambda t: t['status'].rank,
                                        aliases=('st',),
                                        needed_keys=('status',),
                                        description='current status (idle, uploading, verifying, etc.)'),
@@ -44,40 +45,49 @@ class TorrentSorter(SorterBase):
         'uploaded':          _SortSpec(lambda t: t['size-uploaded'],
                                        aliases=('up',),
                                        needed_keys=('size-uploaded',),
+                                       columns=('size-uploaded',),
                                        description='number of uploaded bytes'),
         'downloaded':        _SortSpec(lambda t: t['size-downloaded'],
                                        aliases=('dn',),
                                        needed_keys=('size-downloaded',),
+                                       columns=('size-downloaded',),
                                        description='number of downloaded bytes'),
         '%downloaded':       _SortSpec(lambda t: t['%downloaded'],
                                        lambda t: t['%metadata'],
                                        lambda t: t['%verified'],
                                        aliases=('%dn',),
                                        needed_keys=('%downloaded', '%metadata', '%verified'),
+                                       columns=('%downloaded', '%metadata', '%verified'),
                                        description='downloading or verifying progress'),
         'size':              _SortSpec(lambda t: t['size-final'],
                                        aliases=('sz',),
                                        needed_keys=('size-final',),
+                                       columns=('size-final',),
                                        description='number of bytes of all wanted files'),
         'peers':             _SortSpec(lambda t: t['peers-connected'],
                                        aliases=('prs',),
                                        needed_keys=('peers-connected',),
+                                       columns=('peers-connected',),
                                        description='connected peers'),
         'seeds':             _SortSpec(lambda t: t['peers-seeding'],
                                        aliases=('sds',),
                                        needed_keys=('peers-seeding',),
+                                       columns=('peers-seeding',),
                                        description='highest number of seeds reported by any tracker'),
         'ratio':             _SortSpec(lambda t: t['ratio'],
                                        aliases=('rto',),
                                        needed_keys=('ratio',),
+                                       columns=('ratio',),
                                        description='upload/download ratio'),
         'rate-up':           _SortSpec(lambda t: t['rate-up'],
                                        aliases=('rup',),
                                        needed_keys=('rate-up',),
+                                       columns=('rate-up',),
                                        description='upload rate'),
         'rate-down':         _SortSpec(lambda t: t['rate-down'],
                                        aliases=('rdn',),
                                        needed_keys=('rate-down',),
+                                       columns=('rate-down',),
                                        description='download rate'),
         'rate':              _SortSpec(lambda t: t['rate-up'] + t['rate-down'],
                                        aliases=('r',),
@@ -101,26 +111,32 @@ class TorrentSorter(SorterBase):
                                        description='domain of first tracker'),
         'eta':               _SortSpec(lambda t: t['timespan-eta'],
                                        needed_keys=('timespan-eta',),
+                                       columns=('timespan-eta',),
                                        description='estimated time to finish downloading'),
         'created':           _SortSpec(lambda t: t['time-created'],
                                        aliases=('tcrt',),
                                        needed_keys=('time-created',),
+                                       columns=('time-created',),
                                        description='creation time'),
         'added':             _SortSpec(lambda t: t['time-added'],
                                        aliases=('tadd',),
                                        needed_keys=('time-added',),
+                                       columns=('time-added',),
                                        description='time of addition'),
         'started':           _SortSpec(lambda t: t['time-started'],
                                        aliases=('tsta',),
                                        needed_keys=('time-started',),
+                                       columns=('time-started',),
                                        description='start time'),
         'activity':          _SortSpec(lambda t: t['time-activity'],
                                        aliases=('tact',),
                                        needed_keys=('time-activity',),
+                                       columns=('time-activity',),
                                        description='time of latest upload/download activity'),
         'completed':         _SortSpec(lambda t: t['time-completed'],
                                        aliases=('tcmp',),
                                        needed_keys=('time-completed',),
+                                       columns=('time-completed',),
                                        description='time of completion'),
     }
 
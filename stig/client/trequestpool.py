@@ -9,12 +9,16 @@
 # GNU General Public License for more details
 # http://www.gnu.org/licenses/gpl-3.0.txt
 
+import asyncio
 import operator
 from functools import reduce
+from itertools import chain
 
 import blinker
 
+from .filters.torrent import TorrentFilter
 from .poll import RequestPoller
+from .utils import Response
 
 from ..logging import make_logger  # isort:skip
 log = make_logger(__name__)
@@ -27,28 +31,85 @@ class TorrentRequestPool(RequestPoller):
     needed keys for TorrentFilter from all subscribers.
 
     After the combined torrents have arrived, split it back up by using each
-    subscriber's filter and provide it to its callbacks as tuples.
+    subscriber's filter and provide it to its callbacks as tuples.  Callbacks
+    also get the keyword argument `changes`, which is a TorrentChanges
+    instance that describes changes to cached torrents since the previous
+    response.  (See `TorrentAPI.pop_changes`.)
+
+    If `full_interval` is greater than 0, all torrents are only requested every
+    `full_interval` seconds.  In between, only recently active torrents are
+    requested and the rest is taken from the cache.  (See `full_interval`.)
+
+    If `report_changes` is False, changes are left for other pools that use the
+    same TorrentAPI and callbacks get `changes` set to None.
+
+    Subscribers that want torrents by ID are combined into a request by ID
+    unless any other subscriber needs a TorrentFilter, which would mean
+    requesting the filter keys of all torrents.
+
+    Subscribers can be paused (e.g. while they are not displayed) to exclude
+    their keys and filters from the request until they are resumed.  Because
+    they miss any changes in the meantime, their callbacks get `changes` set to
+    None on the first response after they are resumed.
     """
-    def __init__(self, srvapi, interval=1):
+    def __init__(self, srvapi, interval=1, full_interval=0, max_interval=None,
+                 report_changes=True):
         self._api = srvapi.torrent
+        self._report_changes = bool(report_changes)
         self._tfilters = {}
+        # Subscriber IDs (e.g. id() of widgets) may be reused by other pools
+        self._signals = blinker.Namespace()
         self._keys = {}
-        super().__init__(request=None, interval=interval)
+        self._on_errors = {}
+        self._paused = set()
+        # Subscribers that must get changes=None on the next response
+        self._missed_changes = set()
+        self._full_interval = float(full_interval)
+        self._last_full_request = float('-inf')
+        super().__init__(request=None, interval=interval, max_interval=max_interval)
         self.on_response(self._handle_torrent_list)
+        self.on_error(self._handle_error)
+
+    @property
+    def full_interval(self):
+        """
+        Seconds between requests for all torrents or 0 to always request all torrents
+
+        Between full requests, only torrents that were active recently are
+        requested.  This requires subscriber filters to be applied locally,
+        which means all wanted keys are requested for all torrents.
+        """
+        return self._full_interval
 
-    def register(self, sid, callback, keys=(), tfilter=None):
+    @full_interval.setter
+    def full_interval(self, full_interval):
+        self._full_interval = float(full_interval)
+        self._combine_requests()
+
+    def register(self, sid, callback, keys=(), tfilter=None, on_error=None):
         """Add new request to request pool
 
         sid: Subscriber ID (any hashable)
-        callback: Callable that receives a tuple of Torrents on updates
+        callback: Callable that receives a tuple of Torrents and the keyword
+                  argument `changes` on updates
         keys: Wanted Torrent keys
-        tfilter: None for all torrents or TorrentFilter instance
+        tfilter: None for all torrents, TorrentFilter instance or sequence of
+                 torrent IDs
+        on_error: Callable that receives request exceptions or None
+
+        Callbacks are removed automatically when they are garbage-collected.
+        Request exceptions are raised if no subscriber handles them.
         """
         log.debug('Registering subscriber: %s', sid)
-        event = blinker.signal(sid)
+        event = self._signals.signal(sid)
         event.connect(callback)
         self._keys[event] = set(keys)
+        if tfilter is not None and not isinstance(tfilter, TorrentFilter):
+            tfilter = tuple(tfilter)
         self._tfilters[event] = tfilter
+        if on_error is not None:
+            on_error_event = self._on_errors[event] = blinker.Signal()
+            on_error_event.connect(on_error)
 
         # It's possible that a currently ongoing request doesn't collect the
         # keys this new callback needs.  In that case, the request is finished
@@ -63,76 +124,205 @@ class TorrentRequestPool(RequestPoller):
 
     def _combine_requests(self):
         """Create single request that combines keys and filters of all subscribers"""
-        if not self.has_subscribers:
+        active = self._active_subscribers
+        if not active:
             # Don't request anything
-            log.debug('No subscribers - setting request to None')
+            log.debug('No active subscribers - setting request to None')
             self.set_request(None)
         else:
             kwargs = {}
 
-            all_filters = tuple(self._tfilters.values())
-            if not all_filters or None in all_filters:
-                # No subscribers or at least one subscriber wants all torrents
+            all_filters = tuple(self._tfilters[event] for event in active)
+            if None in all_filters:
+                # At least one subscriber wants all torrents
                 kwargs['torrents'] = None
+            elif all(isinstance(f, tuple) for f in all_filters):
+                # All subscribers want torrents by ID
+                kwargs['torrents'] = tuple(sorted(set(chain.from_iterable(all_filters))))
             else:
-                kwargs['torrents'] = reduce(operator.__or__, all_filters)
+                ids = set(chain.from_iterable(f for f in all_filters if isinstance(f, tuple)))
+                tfilters = [f for f in all_filters if isinstance(f, TorrentFilter)]
+                if ids:
+                    tfilters.append(TorrentFilter('|'.join('id=%d' % tid for tid in sorted(ids))))
+                kwargs['torrents'] = reduce(operator.__or__, tfilters)
 
             # Combine keys of all requests
-            kwargs['keys'] = reduce(lambda a,b: {*a,*b}, self._keys.values())
+            kwargs['keys'] = reduce(lambda a,b: {*a,*b}, (self._keys[event] for event in active))
 
             # Filters also need certain keys
             for f in all_filters:
-                if f is not None:
+                if isinstance(f, TorrentFilter):
                     kwargs['keys'].update(f.needed_keys)
+                elif f is not None:
+                    kwargs['keys'].add('id')
 
             log.debug('Combined filters: %s', kwargs['torrents'])
             log.debug('Combined keys: %s', kwargs['keys'])
-            self.set_request(self._api.torrents, **kwargs)
+            if self._full_interval > 0:
+                self.set_request(self._request_recently_active,
+                                 tfilter=kwargs['torrents'], keys=kwargs['keys'])
+            else:
+                self.set_request(self._api.torrents, **kwargs)
+
+    async def _request_recently_active(self, tfilter, keys):
+        # Request all torrents occasionally and only recently active torrents
+        # in between.  Because we can't filter recently active torrents on the
+        # server side, we must request all torrents and filter them here.
+        now = asyncio.get_event_loop().time()
+        full = now - self._last_full_request >= self._full_interval
+        if full:
+            self._last_full_request = now
+        log.debug('Requesting %s torrents', 'all' if full else 'recently active')
+        response = await self._api.torrents(keys=keys, recently_active=not full)
+        if tfilter is None or not response.success:
+            return response
+        elif isinstance(tfilter, tuple):
+            ids = frozenset(tfilter)
+            torrents = tuple(t for t in response.torrents if t['id'] in ids)
+            return Response(success=True, torrents=torrents,
+                            msgs=response.msgs, errors=response.errors)
+        else:
+            torrents = tuple(tfilter.apply(response.torrents, columns=self._api.columns,
+                                           cache=self._api.filter_cache))
+            return Response(success=True, torrents=torrents,
+                            msgs=response.msgs, errors=response.errors)
 
     def _handle_torrent_list(self, response):
         # If the request failed, response is None and tlist is empty.
         tlist = response.torrents if response is not None else ()
+        changes = self._api.pop_changes() if self._report_changes else None
 
         dead_subscribers = []
+        missed_changes = self._missed_changes
 
         def send(event, tlist):
             if not bool(event.receivers):
                 dead_subscribers.append(event.name)
+            elif event in missed_changes:
+                log.debug('Running callback without changes: %r', event.name)
+                missed_changes.discard(event)
+                event.send(tlist, changes=None)
             else:
                 log.debug('Running callback: %r', event.name)
-                event.send(tlist)
+                event.send(tlist, changes=changes)
+
+        # Paused subscribers don't get any torrents, but they may be dead
+        for event in self._paused:
+            if not bool(event.receivers):
+                dead_subscribers.append(event.name)
 
+        active = self._active_subscribers
         log.debug('Processing %d torrents for %d subscribers',
-                  len(tlist), len(self._tfilters))
-        if len(self._tfilters) == 1:
+                  len(tlist), len(active))
+        if len(active) == 1:
             # If there's only one subscriber, there's no need to filter the
             # torrents again.
-            event = next(iter(self._tfilters))
-            send(event, tlist)
+            send(active[0], tlist)
         else:
             # More than 1 subscriber means we have to filter the torrents
             # again for each one.
-            for event,filter in self._tfilters.items():
+            for event in active:
+                filter = self._tfilters[event]
                 if filter is None:
                     # Subscriber wants all torrents
                     this_tlist = tlist
+                elif isinstance(filter, tuple):
+                    # Subscriber wants torrents by ID
+                    this_tlist = tuple(t for t in tlist if t['id'] in filter)
                 else:
                     # Subscriber wants filtered torrents
-                    this_tlist = filter.apply(tlist)
+                    this_tlist = tuple(filter.apply(tlist, columns=self._api.columns,
+                                                    cache=self._api.filter_cache))
                 send(event, this_tlist)
 
         # Remove dead subscribers
         for eventname in dead_subscribers:
             self.remove(eventname)
 
+    def _handle_error(self, error):
+        # Report request exceptions only to active subscribers that want them
+        on_errors = tuple(self._on_errors[event] for event in self._active_subscribers
+                          if event in self._on_errors and self._on_errors[event].receivers)
+        if not on_errors:
+            raise error
+        for on_error in on_errors:
+            on_error.send(error)
+
+    def send_cached(self):
+        """
+        Provide cached torrents to subscribers without making a request
+
+        This is useful to display torrents from a snapshot (see
+        `TorrentAPI.load_snapshot`) before the first response arrives.
+        Subscribers that need keys that are not cached for all torrents, paused
+        subscribers and subscribers that want torrents by ID (cached IDs may be
+        outdated) are skipped.  Callbacks get `changes` set to None, also on the
+        first response after this call because changes are relative to the
+        previous response.
+        """
+        for event in self._active_subscribers:
+            tfilter = self._tfilters[event]
+            if isinstance(tfilter, tuple):
+                continue
+            keys = set(self._keys[event])
+            if tfilter is not None:
+                keys.update(tfilter.needed_keys)
+            tlist = self._api.cached_torrents(keys, tfilter)
+            if tlist is not None and event.receivers:
+                log.debug('Running callback with cached torrents: %r', event.name)
+                self._missed_changes.add(event)
+                event.send(tlist, changes=None)
+
     def remove(self, sid):
         """Unsubscribe previously registered subscriber"""
         log.debug('Removing subscriber: %s', sid)
-        event = blinker.signal(sid)
+        event = self._signals.signal(sid)
         del self._keys[event]
         del self._tfilters[event]
+        self._on_errors.pop(event, None)
+        self._paused.discard(event)
+        self._missed_changes.discard(event)
         self._combine_requests()
 
+    def pause(self, sid):
+        """
+        Stop requesting torrents for subscriber until `resume` is called
+
+        Do nothing if `sid` is not registered.
+        """
+        event = self._signals.signal(sid)
+        if event in self._tfilters and event not in self._paused:
+            log.debug('Pausing subscriber: %s', sid)
+            self._paused.add(event)
+            self._missed_changes.add(event)
+            self._combine_requests()
+
+    def resume(self, sid):
+        """
+        Request torrents for previously paused subscriber again
+
+        The subscriber is updated immediately with `changes` set to None.  Do
+        nothing if `sid` is not paused.
+        """
+        event = self._signals.signal(sid)
+        if event in self._paused:
+            log.debug('Resuming subscriber: %s', sid)
+            self._paused.discard(event)
+            # See register()
+            if self.running:
+                self.skip_ongoing_request()
+            self._combine_requests()
+            self.poll()
+
+    def is_paused(self, sid):
+        """Whether subscriber is paused"""
+        return self._signals.signal(sid) in self._paused
+
+    @property
+    def _active_subscribers(self):
+        paused = self._paused
+        return tuple(event for event in self._tfilters if event not in paused)
+
     @property
     def has_subscribers(self):
         """Whether any subscribers are registered"""
@@ -140,7 +330,7 @@ class TorrentRequestPool(RequestPoller):
 
     def requested_keys(self, sid):
         """Return keys requested by subscriber"""
-        event = blinker.signal(sid)
+        event = self._signals.signal(sid)
         try:
             return self._keys[event]
         except KeyError:
@@ -23,8 +23,9 @@ import operator
 import os
 import re
 import time
-from collections import abc, defaultdict, deque
+from collections import abc
 
+from .peerrates import PeerRateEstimator
 from .utils import URL, Float, Int, Percent, String, cached_property, const, convert
 
 from ..logging import make_logger  # isort:skip
@@ -69,8 +70,14 @@ class Count(Int):
     def __str__(self):
         return '?' if self == self.UNKNOWN else super().without_unit
 
-class Status(tuple):
-    """A Torrent's status as a tuple of strings"""
+class Status(int):
+    """
+    A Torrent's status as a bitmask that behaves like a tuple of strings
+
+    Create instances from a bitmask (see `BITS`) or from an iterable of status
+    strings.  Bits can be tested directly (e.g. `status & Status.BITS[Status.IDLE]`)
+    and `in` tests work with status strings.
+    """
 
     IDLE      = 'idle'
     DOWNLOAD  = 'downloading'
@@ -85,17 +92,77 @@ class Status(tuple):
     ORDER = (VERIFY, DOWNLOAD, UPLOAD, INIT, CONNECTED,
              ISOLATED, QUEUED, IDLE, STOPPED, SEED)
 
+    # Statuses in the order in which they are listed (i.e. the first one is the
+    # most important one)
+    LISTED = (STOPPED, VERIFY, QUEUED, ISOLATED, INIT,
+              DOWNLOAD, UPLOAD, CONNECTED, SEED, IDLE)
+
+    # Map status strings to bits; listing order is the order of the bits
+    BITS = {status:1 << i for i,status in enumerate(LISTED)}
+
+    # Index in ORDER by index of the lowest set bit
+    _RANKS = tuple(map(ORDER.index, LISTED))
+
+    __slots__ = ()
+
+    def __new__(cls, statuses=0):
+        if not isinstance(statuses, int):
+            bits = cls.BITS
+            statuses = sum(bits[status] for status in frozenset(statuses))
+        return super().__new__(cls, statuses)
+
+    @property
+    def rank(self):
+        """Index of the first listed status in ORDER or -1 if there is no status"""
+        if not self:
+            return -1
+        return self._RANKS[(self & -self).bit_length() - 1]
+
+    def __contains__(self, status):
+        bit = self.BITS.get(status)
+        return bit is not None and bool(self & bit)
+
+    def __iter__(self):
+        for status in self.LISTED:
+            if self & self.BITS[status]:
+                yield status
+
+    def __len__(self):
+        return bin(self).count('1')
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, list)):
+            return tuple(self) == tuple(other)
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        if isinstance(other, (tuple, list)):
+            return tuple(self) != tuple(other)
+        return super().__ne__(other)
+
+    def __hash__(self):
+        return super().__hash__()
+
     def __lt__(self, other):
-        return self.ORDER.index(self[0]) < self.ORDER.index(other[0])
+        return self.rank < other.rank
 
     def __le__(self, other):
-        return self.ORDER.index(self[0]) <= self.ORDER.index(other[0])
+        return self.rank <= other.rank
 
     def __gt__(self, other):
-        return self.ORDER.index(self[0]) > self.ORDER.index(other[0])
+        return self.rank > other.rank
 
     def __ge__(self, other):
-        return self.ORDER.index(self[0]) >= self.ORDER.index(other[0])
+        return self.rank >= other.rank
+
+    def __str__(self):
+        return str(tuple(self))
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, tuple(self))
 
 class SmartCmpStr(str):
     """
@@ -103,6 +170,8 @@ class SmartCmpStr(str):
     of lower case characters.
     """
 
+    __slots__ = ()
+
     def __cmp(self, op, other):
         if not isinstance(other, str):
             return NotImplemented
@@ -126,6 +195,8 @@ class SmartCmpStr(str):
         return super().__hash__()
 
 class Path(SmartCmpStr):
+    __slots__ = ()
+
     def __new__(cls, path):
         return super().__new__(cls, os.path.normpath(path))
 
@@ -613,6 +684,13 @@ class TorrentFile(abc.Mapping):
             except KeyError:
                 pass
 
+        # priority is "off" if is-wanted is False
+        if 'is-wanted' in raw:
+            try:
+                del cache['priority']
+            except KeyError:
+                pass
+
     def __repr__(self): return '<{} {!r}>'.format(type(self).__name__, self['name'])
     def __iter__(self): return iter(self.TYPES)
     def __len__(self): return len(self.TYPES)
@@ -640,65 +718,24 @@ class TorrentPeer(abc.Mapping):
         'id'      : lambda p: (p['tid'], p['ip'], p['port']),
     }
 
-    _MAX_PEER_PROGRESS_SAMPLE_AGE = 1800  # 30 minutes
-    _PEER_PROGRESS_DATA = defaultdict(lambda: deque(maxlen=10))
+    # Estimates download rates of all peers from their progress
+    rate_estimator = PeerRateEstimator()
 
-    @classmethod
-    def gc_peer_progress_data(cls):
-        log.debug('Pruning peer progress data:')
-        for peer_id,samples in tuple(cls._PEER_PROGRESS_DATA.items()):
-            # Remove samples that are too old
-            while samples and (samples[0][0] + cls._MAX_PEER_PROGRESS_SAMPLE_AGE) < time.monotonic():
-                log.debug('Sample from %s is too old: %r', peer_id, samples[0])
-                samples.popleft()
-
-            # Remove samples where progress is 0.0.  A lot of the cache entries just have
-            # a single sample from peers connecting for some reason but not downloading.
-            if samples and samples[0][1] in (0.0, 1.0):
-                samples.popleft()
-
-            # Remove deque if there are no samples left
-            if not samples:
-                del cls._PEER_PROGRESS_DATA[peer_id]
-
-        log.debug('Pruned peer progress data:')
-        for peer_id,samples in tuple(cls._PEER_PROGRESS_DATA.items()):
-            log.debug('%s: %s', peer_id, samples)
-
-    @classmethod
-    def _guess_peer_rate_and_eta(cls, peer_id, peer_progress, torrent_size):
-        rate = 0
+    def _estimate_rate_and_eta(self):
+        dct = self._dct
+        peer_progress = dct['%downloaded'] / 100
         if peer_progress >= 1:
             # Peer has already downloaded everything
-            eta = Timedelta.NOT_APPLICABLE
+            self.rate_estimator.remove(self['id'])
+            return 0, Timedelta.NOT_APPLICABLE
+
+        torrent_size = int(dct['tsize'])  # Don't copy unit + unit prefix from torrent_size
+        rate = self.rate_estimator.sample(self['id'], peer_progress, torrent_size)
+        if rate > 0:
+            size_remaining = torrent_size - (torrent_size * peer_progress)
+            return rate, size_remaining / rate
         else:
-            eta = Timedelta.UNKNOWN
-            samples = cls._PEER_PROGRESS_DATA[peer_id]
-
-            # Don't add the same progress twice
-            if not samples or peer_progress != samples[-1][1]:
-                samples.append((time.monotonic(), peer_progress))
-
-            # We need at least 3 samples
-            if len(samples) >= 3:
-                # Use second and last sample to calculate rate.  The first sample is
-                # ignored because its timestamp may be inaccurate: When we add the
-                # first sample, the peer's progress is not current but the latest we
-                # received, which happened likely tens of seconds ago.
-                t_first, p_first = samples[1]
-                t_last, p_last = samples[-1]
-                p_diff = p_last - p_first
-                t_diff = t_last - t_first
-
-                # It's possible progress goes down, e.g. if a peer deletes a file
-                if p_diff > 0:
-                    torrent_size = int(torrent_size)  # Don't copy unit + unit prefix from torrent_size
-                    size_diff = torrent_size * p_diff
-                    rate = size_diff / t_diff
-                    size_remaining = torrent_size - (torrent_size * peer_progress)
-                    eta = size_remaining / rate
-
-        return rate, eta
+            return rate, Timedelta.UNKNOWN
 
     def __init__(self, tid, tname, tsize, ip, port, client, downloaded, pdownloaded, rate_up, rate_down):
         self._cache = {}
@@ -706,8 +743,15 @@ class TorrentPeer(abc.Mapping):
                      'ip': ip, 'port': port, 'client': client,
                      'downloaded': downloaded, '%downloaded': pdownloaded,
                      'rate-up': rate_up, 'rate-down': rate_down}
-        self._dct['rate-est'], self._dct['eta'] = \
-            self._guess_peer_rate_and_eta(self['id'], pdownloaded / 100, tsize)
+        self._dct['rate-est'], self._dct['eta'] = self._estimate_rate_and_eta()
+
+    def update(self, client, downloaded, pdownloaded, rate_up, rate_down):
+        """Set new values of a peer with the same ID"""
+        dct = self._dct
+        dct.update({'client': client, 'downloaded': downloaded, '%downloaded': pdownloaded,
+                    'rate-up': rate_up, 'rate-down': rate_down})
+        self._cache.clear()
+        dct['rate-est'], dct['eta'] = self._estimate_rate_and_eta()
 
     def __getitem__(self, key):
         cache = self._cache
@@ -735,6 +779,8 @@ class TorrentPeer(abc.Mapping):
 
 
 class TrackerStatus(SmartCmpStr):
+    __slots__ = ()
+
     def __new__(cls, status):
         if status not in ('stopped', 'idle', 'queued', 'announcing', 'scraping'):
             raise ValueError('Invalid tracker status: %r' % status)
@@ -785,6 +831,11 @@ class TorrentTracker(abc.Mapping):
         self._dct = trkdict
         self._cache = {}
 
+    def update(self, trkdict):
+        """Set new values of a tracker with the same ID"""
+        self._dct = trkdict
+        self._cache.clear()
+
     def __getitem__(self, key):
         cache = self._cache
         value = cache.get(key)
@@ -854,7 +905,7 @@ TYPES = {
     'size-piece'                   : SizeInBytes,
 
     'error'                        : str,
-    'trackers'                     : tuple,
-    'peers'                        : tuple,
+    'trackers'                     : None,
+    'peers'                        : None,
     'files'                        : None,
 }
@@ -69,18 +69,25 @@ class PerfectInterval():
 
     def __init__(self):
         self._last_timestamp = 0
+        self._last_seconds = 0
 
     def __call__(self, seconds):
         now = asyncio.get_event_loop().time()
         if self._last_timestamp <= 0:
             self._last_timestamp = int(now)
-            return seconds
+            interval = seconds
         else:
-            expected = self._last_timestamp + seconds
+            # The previous interval may have been different
+            expected = self._last_timestamp + self._last_seconds
             diff = now - expected
             interval = max(seconds - diff, 0)
             self._last_timestamp = expected
-            return interval
+        self._last_seconds = seconds
+        return interval
+
+    def reset(self):
+        """Start over, e.g. after an interval was cut short"""
+        self._last_timestamp = 0
 
 
 class SleepUneasy():
@@ -100,6 +107,9 @@ class SleepUneasy():
                 await self._interrupt.wait()
         except asyncio.TimeoutError:
             pass  # Interval passed without interrupt
+        else:
+            # Next interval starts now
+            self._perfint.reset()
         finally:
             self._interrupt.clear()
 
@@ -11,6 +11,7 @@
 
 import os
 
+from xdg.BaseDirectory import xdg_cache_home as XDG_CACHE_HOME
 from xdg.BaseDirectory import xdg_config_home as XDG_CONFIG_HOME
 from xdg.BaseDirectory import xdg_data_home as XDG_DATA_HOME
 
@@ -23,9 +24,10 @@ from ..logging import make_logger  # isort:skip
 log = make_logger(__name__)
 
 
-DEFAULT_RCFILE      = os.path.join(XDG_CONFIG_HOME, __appname__, 'rc')
-DEFAULT_HISTORY_DIR = os.path.join(XDG_DATA_HOME, __appname__, 'histories')
-DEFAULT_THEME_FILE  = os.path.join(os.path.dirname(__file__), 'default.theme')
+DEFAULT_RCFILE        = os.path.join(XDG_CONFIG_HOME, __appname__, 'rc')
+DEFAULT_HISTORY_DIR   = os.path.join(XDG_DATA_HOME, __appname__, 'histories')
+DEFAULT_SNAPSHOT_FILE = os.path.join(XDG_CACHE_HOME, __appname__, 'torrents.snapshot')
+DEFAULT_THEME_FILE    = os.path.join(os.path.dirname(__file__), 'default.theme')
 
 DEFAULT_TAB_COMMANDS = (
     'tab ls active|!complete',
@@ -115,6 +117,12 @@ def init_defaults(localcfg):
                  setter=lambda v: setattr(objects.srvapi.rpc, 'timeout', v),
                  default=10,
                  description='Number of seconds before connecting to Transmission RPC interface fails')
+    localcfg.add('connect.max-requests',
+                 Int.partial(min=1, prefix='none'),
+                 getter=lambda: objects.srvapi.rpc.max_requests,
+                 setter=lambda v: setattr(objects.srvapi.rpc, 'max_requests', v),
+                 default=4,
+                 description='Maximum number of requests sent to the Transmission RPC interface in parallel')
     localcfg.add('connect.tls',
                  Bool.partial(),
                  getter=lambda: objects.srvapi.rpc.tls,
@@ -206,6 +214,39 @@ def init_defaults(localcfg):
                  Float.partial(min=0.1),
                  default=5,
                  description='Interval in seconds between TUI updates')
+    localcfg.add('tui.columnar',
+                 Bool.partial(),
+                 default=False,
+                 description=('Whether to keep numeric values of all torrents in arrays to filter '
+                              'and sort large numbers of torrents faster (uses NumPy if installed)'))
+    localcfg.add('tui.compact',
+                 Bool.partial(),
+                 default=False,
+                 description=('Whether to store torrents in a format that needs less memory '
+                              'but more CPU time, which helps with very large numbers of torrents'))
+    localcfg.add('tui.poll-full',
+                 Float.partial(min=0),
+                 default=0,
+                 description=('Interval in seconds between requests for all torrents; '
+                              'in between, only recently active torrents are requested '
+                              '(0 means always request all torrents)'))
+    localcfg.add('tui.poll-max',
+                 Float.partial(min=0),
+                 default=0,
+                 description=('Maximum interval in seconds between TUI updates; if this is '
+                              'greater than tui.poll, the interval grows towards it while '
+                              'nothing changes and there is no user input '
+                              '(0 means always use tui.poll)'))
+    localcfg.add('tui.max-fps',
+                 Int.partial(min=1),
+                 default=25,
+                 description=('Maximum number of screen updates per second that are not '
+                              'caused by user input'))
+    localcfg.add('tui.snapshot',
+                 Bool.partial(),
+                 default=True,
+                 description=('Whether to store torrents on exit and display them on startup '
+                              'until they are requested from the daemon'))
 
     localcfg.add('unit.bandwidth',
                  Option.partial(options=('bit', 'byte'), aliases={'b': 'bit', 'B': 'byte'}),
@@ -60,6 +60,27 @@ def _set_poll_interval(settings, name, value):
     srvapi.interval = value
 localcfg.on_change(_set_poll_interval, name='tui.poll')
 
+def _set_full_poll_interval(settings, name, value):
+    srvapi.treqpool.full_interval = value
+localcfg.on_change(_set_full_poll_interval, name='tui.poll-full')
+
+def _set_max_poll_interval(settings, name, value):
+    srvapi.max_interval = value if value > 0 else None
+localcfg.on_change(_set_max_poll_interval, name='tui.poll-max')
+
+def _set_columnar_torrents(settings, name, value):
+    srvapi.torrent.columnar = value
+localcfg.on_change(_set_columnar_torrents, name='tui.columnar')
+
+def _set_compact_torrents(settings, name, value):
+    srvapi.torrent.compact = value
+localcfg.on_change(_set_compact_torrents, name='tui.compact')
+
+
+def _set_max_fps(settings, name, value):
+    tuiobjects.urwidloop.max_fps = value
+localcfg.on_change(_set_max_fps, name='tui.max-fps')
+
 
 def _set_cli_history_dir(settings, name, value):
     tuiobjects.cli.original_widget.history_file = os.path.join(value.full_path, 'commands')
@@ -85,6 +106,9 @@ def _set_theme(settings, name, value):
         tuiobjects.theme.load(value.full_path, tuiobjects.urwidscreen)
     except tuiobjects.theme.ThemeError as e:
         raise ValueError(e)
+    else:
+        # The screen was cleared without invalidating any widgets
+        tuiobjects.urwidloop.request_frame(urgent=True)
 localcfg.on_change(_set_theme, name='tui.theme')
 
 
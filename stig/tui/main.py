@@ -13,7 +13,7 @@ import asyncio
 
 import urwid
 
-from ..settings.defaults import DEFAULT_TAB_COMMANDS
+from ..settings.defaults import DEFAULT_SNAPSHOT_FILE, DEFAULT_TAB_COMMANDS
 
 from ..logging import make_logger  # isort:skip
 log = make_logger(__name__)
@@ -52,6 +52,11 @@ def run(command_runner):
         for cmd in DEFAULT_TAB_COMMANDS:
             objects.cmdmgr.run_sync(cmd, on_error=log.error)
 
+    # Display torrents from previous session until they are requested
+    if objects.localcfg['tui.snapshot']:
+        if objects.srvapi.torrent.load_snapshot(DEFAULT_SNAPSHOT_FILE):
+            objects.srvapi.treqpool.send_cached()
+
     try:
         # Start polling torrent lists, counters, bandwidth usage, etc.
         asyncio.get_event_loop().run_until_complete(objects.srvapi.start_polling())
@@ -62,5 +67,8 @@ def run(command_runner):
         tuiobjects.urwidscreen.tty_signal_keys(*old)
         tuiobjects.logwidget.disable()
         asyncio.get_event_loop().run_until_complete(objects.srvapi.stop_polling())
+        if objects.localcfg['tui.snapshot']:
+            asyncio.get_event_loop().run_until_complete(
+                objects.srvapi.torrent.save_snapshot(DEFAULT_SNAPSHOT_FILE))
 
     return True
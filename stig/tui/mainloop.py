@@ -0,0 +1,137 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details
+# http://www.gnu.org/licenses/gpl-3.0.txt
+
+"""
+urwid main loop that only draws the screen when something has changed
+"""
+
+import time
+
+import urwid
+
+from ..logging import make_logger  # isort:skip
+log = make_logger(__name__)
+
+
+class MainLoop(urwid.MainLoop):
+    """
+    urwid.MainLoop that draws the screen in frames
+
+    urwid's asyncio event loop emulates idle time by drawing the screen
+    periodically, whether anything has changed or not.  Instead, any widget
+    invalidation requests a frame, and all invalidations until the frame is
+    drawn are rendered together.  There are at most `max_fps` frames per second
+    to keep frequent background updates (e.g. polled torrent lists) from
+    hogging the CPU.
+
+    User input is drawn immediately without waiting for the next frame.
+    """
+
+    def __init__(self, *args, max_fps=25, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_fps = max_fps
+        self._frame_handle = None
+        self._frame_urgent = False
+        self._last_frame = 0
+        self._drawing = False
+        self._requested_while_drawing = False
+        self._orig_invalidate = None
+
+    @property
+    def max_fps(self):
+        """Maximum number of frames per second that aren't caused by user input"""
+        return self._max_fps
+
+    @max_fps.setter
+    def max_fps(self, max_fps):
+        if max_fps <= 0:
+            raise ValueError('Invalid max_fps: %r' % (max_fps,))
+        self._max_fps = max_fps
+        self._frame_interval = 1 / max_fps
+
+    def request_frame(self, urgent=False):
+        """
+        Draw the screen in the next frame
+
+        urgent: Whether to draw the screen as soon as possible instead of
+                waiting until `max_fps` allows it
+        """
+        if not self.screen.started:
+            # start() draws the first frame
+            return
+        elif self._drawing:
+            # Widgets that change while they are rendered are drawn again in
+            # the next frame
+            self._requested_while_drawing = True
+            return
+
+        if self._frame_handle is not None:
+            if not urgent or self._frame_urgent:
+                return
+            self.event_loop.remove_alarm(self._frame_handle)
+
+        if urgent:
+            delay = 0
+        else:
+            delay = max(0, self._last_frame + self._frame_interval - time.monotonic())
+        self._frame_urgent = urgent
+        self._frame_handle = self.event_loop.alarm(delay, self._draw_frame)
+
+    def _draw_frame(self):
+        self._frame_handle = None
+        self._drawing = True
+        try:
+            self.entering_idle()
+        finally:
+            self._drawing = False
+            self._last_frame = time.monotonic()
+        if self._requested_while_drawing:
+            self._requested_while_drawing = False
+            self.request_frame()
+
+    def process_input(self, keys):
+        something_handled = super().process_input(keys)
+        self.request_frame(urgent=True)
+        return something_handled
+
+    def start(self):
+        context = super().start()
+        # Replace periodic drawing with frames
+        self.event_loop.remove_enter_idle(self.idle_handle)
+        self._hook_invalidation()
+        self.request_frame(urgent=True)
+        return context
+
+    def stop(self):
+        self._unhook_invalidation()
+        if self._frame_handle is not None:
+            self.event_loop.remove_alarm(self._frame_handle)
+            self._frame_handle = None
+        super().stop()
+
+    def _hook_invalidation(self):
+        # Every urwid widget reports changes via Widget._invalidate(), which
+        # removes its cached canvases
+        cache = urwid.CanvasCache
+        self._orig_invalidate = cache.__dict__['invalidate']
+        invalidate = cache.invalidate
+        request_frame = self.request_frame
+
+        def invalidate_and_request_frame(cls, widget):
+            invalidate(widget)
+            request_frame()
+
+        cache.invalidate = classmethod(invalidate_and_request_frame)
+
+    def _unhook_invalidation(self):
+        if self._orig_invalidate is not None:
+            urwid.CanvasCache.invalidate = self._orig_invalidate
+            self._orig_invalidate = None
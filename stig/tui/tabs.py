@@ -250,6 +250,7 @@ class Tabs(urwid.Widget):
         self._contents.insert(newpos, widget)
         if focus:
             self.focus_position = newpos
+        self._update_visibility()
         return this_id
 
     def move(self, position=None, destination='right', wrap=False):
@@ -298,6 +299,7 @@ class Tabs(urwid.Widget):
         # Restore focus
         self.focus_id = focused_tab_id
         self._contents.set_focus_changed_callback(self._focus_changed_callback)
+        self._update_visibility()
 
     def remove(self, position=None):
         """
@@ -311,6 +313,7 @@ class Tabs(urwid.Widget):
         tabid = self.get_id(position)
         if tabid is None:
             raise RuntimeError('Tabs is empty')
+        self._set_visible(self._contents[index], False)
         del self._ids[index]
         del self._contents[index]
         if tabid in self._info:
@@ -319,6 +322,7 @@ class Tabs(urwid.Widget):
         fh = self._focus_history
         while tabid in fh:
             fh.remove(tabid)
+        self._update_visibility()
 
     def clear(self):
         """Remove all tabs"""
@@ -375,7 +379,9 @@ class Tabs(urwid.Widget):
         """
         i = self.get_index(position)
         if i is not None:
+            self._set_visible(self._contents[i], False)
             self._contents[i] = widget
+            self._update_visibility()
         else:
             raise RuntimeError('Tabs is empty')
 
@@ -413,6 +419,22 @@ class Tabs(urwid.Widget):
         self._focus_history.append(tab_id)
         while len(self._focus_history) > self._max_focus_history_size:
             self._focus_history.pop(0)
+        # This is called before the new focus is set
+        self._update_visibility(pos)
+
+    def _update_visibility(self, focus_position=None):
+        # Tell contents whether they are displayed so background tabs can stop
+        # requesting data from the server
+        if focus_position is None:
+            focus_position = self._contents.focus
+        for i,widget in enumerate(self._contents):
+            self._set_visible(widget, i == focus_position)
+
+    @staticmethod
+    def _set_visible(widget, visible):
+        # Contents that care about being displayed have a `visible` attribute
+        if widget is not None and hasattr(widget, 'visible') and widget.visible != visible:
+            widget.visible = visible
 
     @property
     def focus(self):
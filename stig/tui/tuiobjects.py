@@ -23,6 +23,7 @@ from ..settings.defaults import DEFAULT_KEYMAP
 from .group import Group
 from .keymap import KeyMap
 from .logger import LogWidget
+from .mainloop import MainLoop
 from .miscwidgets import (BandwidthStatusWidget, ConnectionStatusWidget, KeyChainsWidget,
                           MarkedItemsWidget, QuickHelpWidget, TorrentCountersWidget)
 from .tabs import TabBar, Tabs
@@ -118,9 +119,16 @@ def unhandled_input(key):
     if key is not None:
         log.debug('Unhandled key: %s', key)
 
+def input_filter(keys, raw):
+    # Poll more often while the user is active (see 'tui.poll-max')
+    objects.srvapi.report_activity(user=True)
+    return keys
+
 urwidscreen = urwid.raw_display.Screen()
-urwidloop = urwid.MainLoop(widgets,
-                           screen=urwidscreen,
-                           event_loop=urwid.AsyncioEventLoop(loop=asyncio.get_event_loop()),
-                           unhandled_input=unhandled_input,
-                           handle_mouse=False)
+urwidloop = MainLoop(widgets,
+                     screen=urwidscreen,
+                     event_loop=urwid.AsyncioEventLoop(loop=asyncio.get_event_loop()),
+                     unhandled_input=unhandled_input,
+                     input_filter=input_filter,
+                     handle_mouse=False,
+                     max_fps=objects.localcfg['tui.max-fps'])
@@ -145,12 +145,6 @@ class Text_patched(urwid.Text):
 urwid.Text = Text_patched
 
 
-# Limit the impact of the high CPU load bug
-# https://github.com/urwid/urwid/pull/86
-# https://github.com/urwid/urwid/issues/90
-urwid.AsyncioEventLoop._idle_emulation_delay = 1 / 25
-
-
 # urwid uses sys.exc_info() to get `(type, value, traceback)`, which is needed
 # in python2 to re-raise exceptions.  However, sys.exc_info() can return `(None,
 # None, None)` which leaves us with nothing to re-raise. It's possible this
@@ -10,6 +10,8 @@
 # http://www.gnu.org/licenses/gpl-3.0.txt
 
 import collections
+import functools
+import time
 
 import urwid
 
@@ -17,6 +19,17 @@ from ..scroll import ScrollBar
 from ..table import ColumnHeaderWidget, Table
 from ..tuiobjects import bottombar
 
+# Seconds between updates of all item widgets if only changed items are updated
+FULL_UPDATE_INTERVAL = 10
+
+# Keep cell widgets of items that are this many screen heights above or below the
+# focused item; cell widgets of other items are created when they are displayed
+KEEP_ROWS_SCREENS = 2
+
+# Sort all items again instead of moving items with changed sort keys if more
+# than this fraction of all listed items must be moved
+MAX_RESORT_RATIO = 0.05
+
 
 class Style():
     """Map standard attributes to those defined in a urwid palette
@@ -109,7 +122,17 @@ class CellWidgetBase(urwid.WidgetWrap):
 
 
 class ItemWidgetBase(urwid.WidgetWrap):
-    """Base class for items in Torrent/File/Peer/... lists"""
+    """
+    Base class for items in Torrent/File/Peer/... lists
+
+    data: Info of torrent/tracker/file/peer/... as mapping
+    cells: Group instance that combines widgets horizontally or callable that
+           returns one
+
+    If `cells` is a callable, it is called when the item is displayed for the
+    first time.  Until then, the item only stores `data` and its mark.  Cell
+    widgets can be dropped with `release` and are created again when needed.
+    """
 
     # Derived classes must set these class attributes; lists with unfocusable
     # items (e.g. peer lists) don't have to set palette_focused and
@@ -118,9 +141,23 @@ class ItemWidgetBase(urwid.WidgetWrap):
     palette_unfocused = NotImplemented
     palette_focused   = NotImplemented
 
+    # Height of every item or None if it depends on the content of the cells;
+    # if set, the height is known without creating cell widgets
+    rows_per_item = None
+
     def __init__(self, data, cells):
-        self._data = data    # Info of torrent/tracker/file/peer/... as mapping
-        self._cells = cells  # Group instance that combines widgets horizontally
+        self._data = data
+        self._is_marked = False
+        self._item_widget = None
+        self._cells_group = None
+        if callable(cells) and not isinstance(cells, urwid.Widget):
+            self._make_cells = cells
+        else:
+            self._make_cells = lambda: cells
+            self._build()
+
+    def _build(self):
+        cells = self._make_cells()
 
         # Create focusable or unfocusable item widget
         if self.columns_focus_map is not NotImplemented:
@@ -130,15 +167,52 @@ class ItemWidgetBase(urwid.WidgetWrap):
             )
         else:
             item_widget = urwid.AttrMap(cells, self.palette_unfocused)
+        self._cells_group = cells
         urwid.WidgetWrap.__init__(self, item_widget)
 
         # Initialize cell widgets
-        self.update(data)
+        self.update(self._data)
+        self.is_marked = self._is_marked
+
+    @property
+    def _wrapped_widget(self):
+        # urwid.WidgetWrap delegates everything to this attribute
+        if self._item_widget is None:
+            self._build()
+        return self._item_widget
+
+    @_wrapped_widget.setter
+    def _wrapped_widget(self, widget):
+        self._item_widget = widget
+
+    @property
+    def _cells(self):
+        if self._item_widget is None:
+            self._build()
+        return self._cells_group
+
+    def rows(self, size, focus=False):
+        if self._item_widget is None and self.rows_per_item is not None:
+            return self.rows_per_item
+        return self._wrapped_widget.rows(size, focus)
+
+    @property
+    def is_built(self):
+        """Whether cell widgets exist"""
+        return self._item_widget is not None
+
+    def release(self):
+        """Drop cell widgets until this item is displayed again"""
+        if self._item_widget is not None:
+            self._item_widget = None
+            self._cells_group = None
+            self._invalidate()
 
     def update(self, data):
-        for widget in self._cells.widgets:
-            if hasattr(widget, 'update'):
-                widget.update(data)
+        if self._item_widget is not None:
+            for widget in self._cells_group.widgets:
+                if hasattr(widget, 'update'):
+                    widget.update(data)
         self._data = data
 
     @property
@@ -154,15 +228,13 @@ class ItemWidgetBase(urwid.WidgetWrap):
     @property
     def is_marked(self):
         """Whether this item has been marked by the user"""
-        if self._cells.exists('marked'):
-            return self._cells.marked.is_marked
-        else:
-            return False
+        return self._is_marked
 
     @is_marked.setter
     def is_marked(self, is_marked):
-        if self._cells.exists('marked'):
-            self._cells.marked.is_marked = bool(is_marked)
+        self._is_marked = bool(is_marked)
+        if self._item_widget is not None and self._cells_group.exists('marked'):
+            self._cells_group.marked.is_marked = self._is_marked
 
 
 class ListWidgetBase(urwid.WidgetWrap):
@@ -185,10 +257,25 @@ class ListWidgetBase(urwid.WidgetWrap):
             self._ListItemClass = self.ListItemClass
 
         self._data_dict = None
+        self._changed_ids = None
+        self._last_full_update = float('-inf')
         self._marked = set()
+        self._visible = True
 
-        self._existing_widgets = set()
+        # Map item IDs to all *ItemWidget instances
+        self._existing_widgets = {}
+        # *ItemWidget instances that are in the list walker, that are hidden by
+        # _limit_items() and that are neither because they are new
+        self._visible_widgets = set()
         self._hidden_widgets = set()
+        self._pending_widgets = set()
+        self._built_widgets = set()
+
+        # IDs of items that may have changed sort keys since the previous
+        # render and widgets that must be moved to their sorted position; None
+        # means all widgets must be sorted
+        self._resort_ids = None
+        self._unsorted_widgets = None
 
         self._sort = sort
         self._sort_orig = sort
@@ -231,65 +318,175 @@ class ListWidgetBase(urwid.WidgetWrap):
         if self._data_dict is not None:
             self._update_existing_widgets(self._data_dict)
             self._data_dict = None
+            self._changed_ids = None
+            self._resort_ids = set()
 
         self._hide_or_unhide_widgets()
         self._sort_widgets()
 
         # Ensure focus doesn't change when items get added or removed
         if focusedw is not None and self.focused_widget is not None and \
-           focusedw.id != self.focused_widget.id:
-            focused_id = focusedw.id
-            for i,w in enumerate(self._listbox.body):
-                if w.id == focused_id:
-                    self._listbox.focus_position = i
-                    break
+           focusedw is not self.focused_widget and focusedw in self._visible_widgets:
+            self._listbox.focus_position = self._listbox.body.index(focusedw)
 
         # Update number of marked items in this list
         bottombar.marked.update(len(self._marked))
 
         # focus=True because we always want to highlight the focused item, for
         # example when the CLI is open
-        return super().render(size, focus=True)
+        canvas = super().render(size, focus=True)
+        self._release_offscreen_widgets(size[-1])
+        return canvas
+
+    def _release_offscreen_widgets(self, rows):
+        # Only item widgets near the focused item keep their cell widgets so
+        # memory usage doesn't grow with the number of items
+        walker = self._listbox.body
+        if not isinstance(walker, list) or not walker:
+            return
+        focus = self._listbox.focus_position
+        distance = rows * KEEP_ROWS_SCREENS
+        keep_widgets = set(walker[max(0, focus - distance):focus + distance + 1])
+
+        built_widgets = self._built_widgets
+        built_widgets.update(w for w in keep_widgets if w.is_built)
+        table = self._table
+        for w in tuple(built_widgets):
+            if w not in keep_widgets:
+                w.release()
+                table.unregister(w.id)
+                built_widgets.discard(w)
+
+    def _set_data(self, data_dict, changed_ids=None, changed_keys=None):
+        """
+        Display items from `data_dict` on the next render
+
+        data_dict: Map item IDs to item data
+        changed_ids: Iterable of IDs of items with changed data or None if any
+                     item may have changed
+        changed_keys: Map IDs in `changed_ids` to the keys of their data that
+                      changed or None; items that are not in `changed_keys` are
+                      moved to their sorted position regardless
+
+        All item widgets are still updated every FULL_UPDATE_INTERVAL seconds
+        because some values are displayed relative to the current time.  Items
+        are only sorted again if their sort keys changed.
+        """
+        if changed_ids is not None:
+            changed_ids = tuple(changed_ids)
+        self._add_resort_ids(changed_ids, changed_keys)
+
+        now = time.monotonic()
+        if changed_ids is None or now - self._last_full_update >= FULL_UPDATE_INTERVAL:
+            self._last_full_update = now
+            self._changed_ids = None
+        elif self._data_dict is None:
+            self._changed_ids = set(changed_ids)
+        elif self._changed_ids is not None:
+            # Previous data wasn't rendered yet
+            self._changed_ids.update(changed_ids)
+        self._data_dict = data_dict
+
+    def _add_resort_ids(self, changed_ids, changed_keys=None):
+        resort_ids = self._resort_ids
+        if resort_ids is None:
+            # All items are sorted on the next render anyway
+            return
+        elif changed_ids is None:
+            self._resort_ids = None
+            return
+
+        sort_keys = getattr(self._sort, 'needed_keys', None)
+        if changed_keys is None or sort_keys is None:
+            resort_ids.update(changed_ids)
+        else:
+            sort_keys = frozenset(sort_keys)
+            for id in changed_ids:
+                keys = changed_keys.get(id)
+                if keys is None or not sort_keys.isdisjoint(keys):
+                    resort_ids.add(id)
 
     def _update_existing_widgets(self, data_dict):
         existing_widgets = self._existing_widgets
-        dead_widgets = []
+        changed_ids = self._changed_ids
+        if self._resort_ids is None:
+            self._unsorted_widgets = None
+        unsorted_widgets = self._unsorted_widgets
+
+        # Update existing *ItemWidget instances with new data
+        if changed_ids is None:
+            update_ids = existing_widgets.keys() & data_dict.keys()
+        else:
+            update_ids = existing_widgets.keys() & data_dict.keys() & changed_ids
+        for id in update_ids:
+            existing_widgets[id].update(data_dict[id])
+
+        if unsorted_widgets is not None:
+            for id in existing_widgets.keys() & self._resort_ids:
+                unsorted_widgets.add(existing_widgets[id])
+
+        # Remove *ItemWidget instances of items that don't exist anymore
+        dead_ids = existing_widgets.keys() - data_dict.keys()
+        if dead_ids:
+            dead_widgets = [existing_widgets.pop(id) for id in dead_ids]
+            self._remove_from_walker(self._visible_widgets.intersection(dead_widgets))
+            for id in dead_ids:
+                self._table.unregister(id)
+            self._hidden_widgets.difference_update(dead_widgets)
+            self._pending_widgets.difference_update(dead_widgets)
+            self._built_widgets.difference_update(dead_widgets)
+            self._marked.difference_update(dead_widgets)  # self._marked may have a reference too
+            if unsorted_widgets is not None:
+                unsorted_widgets.difference_update(dead_widgets)
+
+        # Any items that don't have an *ItemWidget instance yet are new; their
+        # cell widgets are created when they are displayed
+        new_ids = data_dict.keys() - existing_widgets.keys()
+        if new_ids:
+            table = self._table
+            ListItemClass = self._ListItemClass
+            pending_widgets = self._pending_widgets
 
-        for w in existing_widgets:  # w = *ItemWidget instance
-            id = w.id
-            try:
-                # Update existing *ItemWidget instances with new data
-                w.update(data_dict[id])
-                del data_dict[id]
-            except KeyError:
-                # Item no longer exists in data_dict anymore
-                dead_widgets.append(w)
+            def make_row(data_id):
+                table.register(data_id)
+                return table.get_row(data_id)
+
+            for data_id in new_ids:
+                w = ListItemClass(data_dict[data_id], functools.partial(make_row, data_id))
+                existing_widgets[data_id] = w
+                pending_widgets.add(w)
 
-        # Remove dead *ItemWidget instances
+    def _remove_from_walker(self, widgets):
         walker = self._listbox.body
-        marked = self._marked
-        for w in dead_widgets:
-            if w in walker:
+        if len(widgets) <= 10:
+            # list.remove() is fast enough for a few widgets
+            for w in widgets:
                 walker.remove(w)
-            existing_widgets.remove(w)
-            marked.discard(w)  # self._marked may have a reference too
-
-        # Any items that haven't been used to update an existing *ItemWidget instance are new
-        if data_dict:
-            table = self._table
-            ListItemClass = self._ListItemClass
-            for data_id,data in data_dict.items():
-                table.register(data_id)
-                row = table.get_row(data_id)
-                existing_widgets.add(ListItemClass(data, row))
+        elif widgets:
+            walker[:] = [w for w in walker if w not in widgets]
+        self._visible_widgets.difference_update(widgets)
 
     def _sort_widgets(self):
         walker = self._listbox.body
-        if self._sort is not None:
+        unsorted_widgets = self._unsorted_widgets
+        if self._sort is None:
+            # Unsorted lists are sorted from scratch when a sort order is set
+            self._unsorted_widgets = set()
+            return
+        elif unsorted_widgets is not None and not unsorted_widgets:
+            return
+
+        def item_getter(w):
+            return w.data
+
+        # Sort all items if we don't know which ones changed or if moving the
+        # changed items one by one is more expensive
+        if unsorted_widgets is None or len(unsorted_widgets) > len(walker) * MAX_RESORT_RATIO:
             try:
                 self._sort.apply(walker,
-                                 item_getter=lambda w: w.data,
-                                 inplace=True)
+                                 item_getter=item_getter,
+                                 inplace=True,
+                                 columns=self._sort_columns)
             except KeyError:
                 # This happens when adding a new sort order that needs
                 # previously unneeded keys (e.g. "started" needs "time-started",
@@ -301,19 +498,58 @@ class ListWidgetBase(urwid.WidgetWrap):
                 # KeyError fixes this because as soon as the RPC response gets
                 # through, a new redraw is issued and the new sort exists.
                 pass
+            else:
+                self._unsorted_widgets = set()
+        else:
+            # Move only widgets with changed sort keys; hidden widgets are not
+            # in the walker
+            moved_widgets = unsorted_widgets.intersection(self._visible_widgets)
+            for w in moved_widgets:
+                walker.remove(w)
+            try:
+                self._sort.insert(walker, moved_widgets, item_getter=item_getter)
+            except KeyError:
+                # See above; put back any widgets that weren't inserted and
+                # sort everything on the next render
+                walker.extend(w for w in moved_widgets if w not in walker)
+                self._unsorted_widgets = None
+            else:
+                self._unsorted_widgets = set()
+
+    @property
+    def _sort_columns(self):
+        # `client.columns.Columns` instance with the data of all items or None
+        return None
 
     def _hide_or_unhide_widgets(self):
-        walker = self._listbox.body
-        existing_widgets = self._existing_widgets
-        hidden_ids = tuple(w.id for w in self._limit_items(existing_widgets))
-        for w in existing_widgets:
-            widget_is_visible = w in walker
-            hide_widget = w.id in hidden_ids
-            if hide_widget and widget_is_visible:
-                walker.remove(w)
-                self._hidden_widgets.add(w)
-            elif not hide_widget and not widget_is_visible:
-                walker.append(w)
+        visible_widgets = self._visible_widgets
+        hidden_widgets = self._hidden_widgets
+        pending_widgets = self._pending_widgets
+        limited_widgets = set(self._limit_items(self._existing_widgets.values()))
+
+        # Widgets that were visible and are now filtered
+        hide_widgets = visible_widgets.intersection(limited_widgets)
+        # Widgets that were filtered or are new and are not filtered
+        unhide_widgets = hidden_widgets.difference(limited_widgets)
+        unhide_widgets.update(pending_widgets.difference(limited_widgets))
+        hidden_widgets.update(pending_widgets.intersection(limited_widgets))
+        pending_widgets.clear()
+
+        if hide_widgets:
+            self._remove_from_walker(hide_widgets)
+            hidden_widgets.update(hide_widgets)
+
+        if unhide_widgets:
+            hidden_widgets.difference_update(unhide_widgets)
+            visible_widgets.update(unhide_widgets)
+            walker = self._listbox.body
+            was_empty = not walker
+            walker.extend(unhide_widgets)
+            if was_empty:
+                # Extending an empty walker focuses the last item
+                walker.set_focus(0)
+            if self._unsorted_widgets is not None:
+                self._unsorted_widgets.update(unhide_widgets)
 
         if self.title_updater is not None:
             self.title_updater(self.title, ' [%d]' % self.count)
@@ -324,15 +560,52 @@ class ListWidgetBase(urwid.WidgetWrap):
 
     def clear(self):
         """Remove all list items"""
+        self._last_full_update = float('-inf')
         self._table.clear()
         self._listbox.body[:] = ()
         self._listbox._invalidate()
         self._marked.clear()
+        self._built_widgets.clear()
+        # Remaining widgets are listed again on the next render
+        self._visible_widgets.clear()
+        self._hidden_widgets.clear()
+        self._pending_widgets.update(self._existing_widgets.values())
+        self._resort_ids = None
+        self._unsorted_widgets = None
 
     def refresh(self):
         """Update list items"""
         raise NotImplementedError
 
+    @property
+    def _request_pool(self):
+        # TorrentRequestPool that this list is registered with as `id(self)`
+        return None
+
+    @property
+    def visible(self):
+        """
+        Whether this list is displayed
+
+        Lists that are not displayed don't get any updates until they are
+        displayed again.
+        """
+        return self._visible
+
+    @visible.setter
+    def visible(self, visible):
+        if visible and not self._visible:
+            # Changes were not reported while we weren't displayed, so all
+            # items must be updated and sorted
+            self._resort_ids = None
+            self._last_full_update = float('-inf')
+        self._visible = bool(visible)
+        pool = self._request_pool
+        if pool is not None:
+            if self._visible:
+                pool.resume(id(self))
+            else:
+                pool.pause(id(self))
 
     @property
     def columns(self):
@@ -341,6 +614,7 @@ class ListWidgetBase(urwid.WidgetWrap):
     @columns.setter
     def columns(self, columns):
         self._table.columns = columns
+        self._last_full_update = float('-inf')
 
     @property
     def sort(self):
@@ -353,6 +627,8 @@ class ListWidgetBase(urwid.WidgetWrap):
             self._sort = self._sort_orig
         else:
             self._sort = sort
+        self._resort_ids = None
+        self._unsorted_widgets = None
 
     @property
     def count(self):
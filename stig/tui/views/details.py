@@ -89,14 +89,16 @@ class TorrentDetailsWidget(urwid.WidgetWrap):
         ))
 
         # Register new request in request pool
+        self._tid = tid
         keys = set(('name',)).union(key for w in sections for key in w.needed_keys)
-        self._poller = objects.srvapi.create_poller(objects.srvapi.torrent.torrents, (tid,), keys=keys)
-        self._poller.on_response(self._handle_response)
-        self._poller.on_error(self._handle_error)
-
-    def _handle_response(self, response):
-        if response is not None and response.success:
-            self._torrent = response.torrents[0]
+        pool = objects.srvapi.detailspool
+        pool.register(id(self), self._handle_torrents, keys=keys, tfilter=(tid,),
+                      on_error=self._handle_error)
+        pool.poll()
+
+    def _handle_torrents(self, torrents, changes=None):
+        if torrents:
+            self._torrent = torrents[0]
             self._content.original_widget = self._grid
             for w in self._sections.values():
                 w.update(self._torrent)
@@ -104,8 +106,8 @@ class TorrentDetailsWidget(urwid.WidgetWrap):
             # Set new tab title if necessary
             if self.title_updater is not None:
                 self.title_updater(self.title)
-        elif response is not None:
-            self._handle_error(*response.msgs)
+        else:
+            self._handle_error('No torrent with ID: %d' % self._tid)
 
     def _handle_error(self, *errors):
         self._torrent = {'name': None, 'id': None}
@@ -125,3 +127,15 @@ class TorrentDetailsWidget(urwid.WidgetWrap):
     @property
     def focused_torrent_id(self):
         return self._torrent['id'] if 'id' in self._torrent else None
+
+    @property
+    def visible(self):
+        """Whether this widget is displayed (no updates are requested otherwise)"""
+        return not objects.srvapi.detailspool.is_paused(id(self))
+
+    @visible.setter
+    def visible(self, visible):
+        if visible:
+            objects.srvapi.detailspool.resume(id(self))
+        else:
+            objects.srvapi.detailspool.pause(id(self))
@@ -191,19 +191,19 @@ class FileListWidget(ListWidgetBase):
         self._initialized = False
         self._torrents = None
 
-        self._poller = self._srvapi.create_poller(
-            self._srvapi.torrent.torrents, tfilter, keys=('files', 'name')
-        )
-        self._poller.on_response(self._handle_files)
+        # Register new request in request pool
+        self._request_pool.register(id(self), self._handle_files,
+                                    keys=('files', 'name'), tfilter=tfilter)
+        self._request_pool.poll()
 
-    def _handle_files(self, response):
-        if response is None or not response.torrents:
+    def _handle_files(self, torrents, changes=None):
+        if not torrents:
             self.clear()
         else:
             if self._initialized:
-                self._update_listitems(response.torrents)
+                self._update_listitems(torrents)
             else:
-                self._init_listitems(response.torrents)
+                self._init_listitems(torrents)
                 self._initialized = True
         self._invalidate()
 
@@ -268,8 +268,12 @@ class FileListWidget(ListWidgetBase):
         self._table.clear()
         self._marked.clear()
 
+    @property
+    def _request_pool(self):
+        return self._srvapi.detailspool
+
     def refresh(self):
-        self._poller.poll()
+        self._request_pool.poll()
 
     @property
     def count(self):
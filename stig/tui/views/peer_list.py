@@ -17,6 +17,7 @@ from .utils import stringify_torrent_filter
 
 class PeerItemWidget(ItemWidgetBase):
     palette_unfocused = 'peerlist'
+    rows_per_item     = 1
 
     @property
     def id(self):
@@ -49,18 +50,18 @@ class PeerListWidget(ListWidgetBase):
                 yield from peers
         self._maybe_filter_peers = filter_peers
 
-        self._poller = self._srvapi.create_poller(
-            self._srvapi.torrent.torrents, tfilter, keys=('peers', 'name', 'id')
-        )
-        self._poller.on_response(self._handle_peers)
+        # Register new request in request pool
+        self._request_pool.register(id(self), self._handle_peers,
+                                    keys=('peers', 'name', 'id'), tfilter=tfilter)
+        self._request_pool.poll()
 
-    def _handle_peers(self, response):
-        if response is None or not response.torrents:
+    def _handle_peers(self, torrents, changes=None):
+        if not torrents:
             self.clear()
         else:
             # Auto-generate title from our filters if not set
             if self._title_name is None:
-                self._title_name = stringify_torrent_filter(self._tfilter, response.torrents)
+                self._title_name = stringify_torrent_filter(self._tfilter, torrents)
                 if self._pfilter:
                     self._title_name += ' %s' % self._pfilter
 
@@ -68,7 +69,7 @@ class PeerListWidget(ListWidgetBase):
             def peers_combined(torrents):
                 for t in torrents:
                     yield from self._maybe_filter_peers(t['peers'])
-            self._data_dict = {p['id']:p for p in peers_combined(response.torrents)}
+            self._set_data({p['id']:p for p in peers_combined(torrents)})
         self._invalidate()
 
     def clear(self):
@@ -76,8 +77,12 @@ class PeerListWidget(ListWidgetBase):
             w.data.clearcache()
         super().clear()
 
+    @property
+    def _request_pool(self):
+        return self._srvapi.detailspool
+
     def refresh(self):
-        self._poller.poll()
+        self._request_pool.poll()
 
     @property
     def sort(self):
@@ -86,7 +91,7 @@ class PeerListWidget(ListWidgetBase):
     @sort.setter
     def sort(self, sort):
         ListWidgetBase.sort.fset(self, sort)
-        self._poller.poll()
+        self._request_pool.poll()
 
     @property
     def secondary_filter(self):
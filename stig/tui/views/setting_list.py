@@ -176,7 +176,7 @@ class SettingListWidget(ListWidgetBase):
         self.refresh()
 
     def _handle_update(self, *_, **__):
-        self._data_dict = objects.cfg.as_dict
+        self._set_data(objects.cfg.as_dict)
         self._invalidate()
 
     def refresh(self):
@@ -21,6 +21,7 @@ log = make_logger(__name__)
 class TorrentItemWidget(ItemWidgetBase):
     palette_unfocused = 'torrentlist'
     palette_focused   = 'torrentlist.focused'
+    rows_per_item     = 1
     columns_focus_map = {}
     for col in TUICOLUMNS.values():
         columns_focus_map.update(col.style.focus_map)
@@ -45,6 +46,7 @@ class TorrentListWidget(ListWidgetBase):
         super().__init__(srvapi, keymap, columns=columns, sort=sort, title=title)
         self._tfilter = tfilter
         self._secondary_filter = None
+        self._stale = False
         self._register_request()
 
     @property
@@ -65,13 +67,15 @@ class TorrentListWidget(ListWidgetBase):
             keys.update(self.tuicolumns[colname].needed_keys)
 
         # Register new request in request pool
-        existing_keys = self._srvapi.treqpool.requested_keys(self.id)
+        existing_keys = self._request_pool.requested_keys(self.id)
         if keys != existing_keys:
             log.debug('Registering keys for %r: %s', self, keys)
-            self._srvapi.treqpool.register(self.id,
-                                           self._handle_torrents,
-                                           keys=keys, tfilter=self._tfilter)
-            self._srvapi.treqpool.poll()
+            self._request_pool.register(self.id,
+                                        self._handle_torrents,
+                                        keys=keys, tfilter=self._tfilter)
+            if not self.visible:
+                self._request_pool.pause(self.id)
+            self._request_pool.poll()
         else:
             log.debug('No need to register a new request')
             self._invalidate()
@@ -84,20 +88,41 @@ class TorrentListWidget(ListWidgetBase):
     #     log.debug('Rendered torrent list in %.3fms', (time.time()-start)*1000)
     #     return canvas
 
-    def _handle_torrents(self, torrents):
+    def _handle_torrents(self, torrents, changes=None):
         # Auto-generate title from our filters if not set
         if self._title_name is None:
             self._title_name = stringify_torrent_filter(self._tfilter, torrents)
-        self._data_dict = {t['id']:t for t in torrents}
+        # Torrents from a snapshot may be outdated
+        self._stale = self._srvapi.torrent.stale
+        # Only update rows of new torrents and torrents with changed values and
+        # only move torrents with changed sort keys
+        if changes is None:
+            self._set_data({t['id']:t for t in torrents})
+        else:
+            self._set_data({t['id']:t for t in torrents},
+                           changed_ids=(*changes.added, *changes.changed),
+                           changed_keys=changes.changed)
         self._invalidate()
 
     def clear(self):
         for w in self._listbox.body:
             w.data.clearcache()
+        columns = self._srvapi.torrent.columns
+        if columns is not None:
+            columns.invalidate_all()
+        self._srvapi.torrent.filter_cache.invalidate_all()
         super().clear()
 
+    @property
+    def _request_pool(self):
+        return self._srvapi.treqpool
+
+    @property
+    def _sort_columns(self):
+        return self._srvapi.torrent.columns
+
     def refresh(self):
-        self._srvapi.treqpool.poll()
+        self._request_pool.poll()
 
     @property
     def sort(self):
@@ -105,10 +130,17 @@ class TorrentListWidget(ListWidgetBase):
 
     @sort.setter
     def sort(self, sort):
-        self._srvapi.treqpool.remove(self.id)
+        self._request_pool.remove(self.id)
         ListWidgetBase.sort.fset(self, sort)
         self._register_request()
 
+    @property
+    def title(self):
+        title = super().title
+        if self._stale:
+            title += ' (cached)'
+        return title
+
     @property
     def focused_torrent_id(self):
         """Torrent ID of the currently focused torrent or `None`"""
@@ -132,6 +164,9 @@ class TorrentListWidget(ListWidgetBase):
     def _limit_items(self, torrent_widgets):
         f = self._secondary_filter
         if f is not None:
-            for tw in torrent_widgets:
-                if not f.match(tw.data):
+            torrent_widgets = tuple(torrent_widgets)
+            matches = f.matches(tuple(tw.data for tw in torrent_widgets),
+                                cache=self._srvapi.torrent.filter_cache)
+            for tw,match in zip(torrent_widgets, matches):
+                if not match:
                     yield tw
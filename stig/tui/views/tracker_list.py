@@ -21,6 +21,7 @@ log = make_logger(__name__)
 class TrackerItemWidget(ItemWidgetBase):
     palette_unfocused = 'trackerlist'
     palette_focused   = 'trackerlist.focused'
+    rows_per_item     = 1
     columns_focus_map = {}
     for col in TUICOLUMNS.values():
         columns_focus_map.update(col.style.focus_map)
@@ -56,18 +57,18 @@ class TrackerListWidget(ListWidgetBase):
                 yield from trackers
         self._maybe_filter_trackers = filter_trackers
 
-        self._poller = self._srvapi.create_poller(
-            self._srvapi.torrent.torrents, torfilter, keys=('trackers', 'name', 'id')
-        )
-        self._poller.on_response(self._handle_trackers)
+        # Register new request in request pool
+        self._request_pool.register(id(self), self._handle_trackers,
+                                    keys=('trackers', 'name', 'id'), tfilter=torfilter)
+        self._request_pool.poll()
 
-    def _handle_trackers(self, response):
-        if response is None or not response.torrents:
+    def _handle_trackers(self, torrents, changes=None):
+        if not torrents:
             self.clear()
         else:
             # Auto-generate title from our filters if not set
             if self._title_name is None:
-                self._title_name = stringify_torrent_filter(self._torfilter, response.torrents)
+                self._title_name = stringify_torrent_filter(self._torfilter, torrents)
                 if self._trkfilter:
                     self._title_name += ' %s' % self._trkfilter
 
@@ -75,11 +76,15 @@ class TrackerListWidget(ListWidgetBase):
             def trackers_combined(torrents):
                 for t in torrents:
                     yield from self._maybe_filter_trackers(t['trackers'])
-            self._data_dict = {trk['id']:trk for trk in trackers_combined(response.torrents)}
+            self._set_data({trk['id']:trk for trk in trackers_combined(torrents)})
         self._invalidate()
 
+    @property
+    def _request_pool(self):
+        return self._srvapi.detailspool
+
     def refresh(self):
-        self._poller.poll()
+        self._request_pool.poll()
 
     @property
     def sort(self):
@@ -88,7 +93,7 @@ class TrackerListWidget(ListWidgetBase):
     @sort.setter
     def sort(self, sort):
         ListWidgetBase.sort.fset(self, sort)
-        self._poller.poll()
+        self._request_pool.poll()
 
     @property
     def focused_torrent_id(self):
@@ -47,6 +47,24 @@ def _pretty_float(n):
         return '%.0f' % n
 
 
+_shared_dicts = {}
+
+def _shared(dct):
+    """
+    Return dictionary that is equal to `dct`, reusing a previously returned one
+
+    Many instances are created with identical arguments (e.g. all torrent
+    sizes) and sharing their argument dictionaries saves a lot of memory.
+    Returned dictionaries must not be modified.
+    """
+    # Include types so that e.g. 1, 1.0 and True are not mixed up
+    try:
+        return _shared_dicts.setdefault(tuple((k, type(v), v) for k,v in dct.items()), dct)
+    except TypeError:
+        # Unhashable values can't be shared
+        return dct
+
+
 class _PartialConstructor(partial):
     def __init__(self, cls, **kwargs):
         repr = cls.__name__ + '('
@@ -73,7 +91,7 @@ class UsertypeMixin():
         return _PartialConstructor(cls, **kwargs)
 
     def __init__(self, *value, **kwargs):
-        self._config = {**self.defaults, **kwargs}
+        self._config = _shared({**self.defaults, **kwargs})
 
     def copy(self, *value, **kwargs):
         new_kwargs = {**self._config, **kwargs}
@@ -483,6 +501,7 @@ class Option(str, UsertypeMixin):
 class _NumberBase(UsertypeMixin):
     _prefixes_binary = (('Ti', 1024**4), ('Gi', 1024**3), ('Mi', 1024**2), ('Ki', 1024))
     _prefixes_metric = (('T', 1000**4), ('G', 1000**3), ('M', 1000**2), ('k', 1000))
+    _prefixes_by_name = {'binary': _prefixes_binary, 'metric': _prefixes_metric, 'none': ()}
     _prefixes_dct = {prefix.lower():size
                      for prefix,size in chain.from_iterable(zip(_prefixes_binary,
                                                                 _prefixes_metric))}
@@ -576,23 +595,12 @@ class _NumberBase(UsertypeMixin):
         except TypeError:
             raise ValueError('Not a %s' % cls.typename)
 
-        if hide_unit:
-            self._str = lambda: self.without_unit
-        else:
-            self._str = lambda: self.with_unit
-
-        if prefix == 'binary':
-            self._prefixes = self._prefixes_binary
-        elif prefix == 'metric':
-            self._prefixes = self._prefixes_metric
-        elif prefix == 'none':
-            self._prefixes = ()
-        else:
+        if prefix not in cls._prefixes_by_name:
             raise ValueError("prefix must be 'binary' or 'metric'")
 
         # Remember arguments so we can copy them if this instance is passed to the same class
-        self._args = {'unit': unit, 'prefix': prefix, 'hide_unit': hide_unit,
-                      'min': min, 'max': max, 'autolimit': autolimit}
+        self._args = _shared({'unit': unit, 'prefix': prefix, 'hide_unit': hide_unit,
+                              'min': min, 'max': max, 'autolimit': autolimit})
         return self
 
     @classmethod
@@ -601,7 +609,14 @@ class _NumberBase(UsertypeMixin):
         return '<NUMBER>[%s]' % '|'.join(prefixes)
 
     def __str__(self):
-        return self._str()
+        if self._args['hide_unit']:
+            return self.without_unit
+        else:
+            return self.with_unit
+
+    @property
+    def _prefixes(self):
+        return self._prefixes_by_name[self._args['prefix']]
 
     @property
     def with_unit(self):
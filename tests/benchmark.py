@@ -0,0 +1,340 @@
+"""
+Measure code that must be fast with many torrents or files
+
+Timings depend on the machine, so these are not part of the test suite.  Run
+all benchmarks or only the given ones from the project directory:
+
+    $ python3 tests/benchmark.py [NAME ...]
+"""
+
+import logging
+import os
+import sys
+import time
+
+# Measure the code in this project directory, not any installed version
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def measure(func, *args, **kwargs):
+    """Return seconds it took to call `func` and its return value"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def report(msg, *args):
+    print('  ' + msg % args)
+
+
+def make_raw(tid, rate=0):
+    return {'id': tid, 'hashString': '%040x' % tid, 'name': 'Torrent %d' % tid,
+            'activityDate': 1500000000, 'addedDate': 1500000000, 'comment': '',
+            'corruptEver': 0, 'creator': '', 'dateCreated': 1500000000,
+            'desiredAvailable': 0, 'doneDate': 0, 'downloadDir': '/tmp',
+            'downloadLimit': 100, 'downloadLimited': False, 'downloadedEver': 0,
+            'error': 0, 'errorString': '', 'eta': -1, 'haveUnchecked': 0, 'haveValid': 0,
+            'isPrivate': False, 'leftUntilDone': 0, 'magnetLink': 'magnet:',
+            'manualAnnounceTime': 0, 'metadataPercentComplete': 1, 'peersConnected': 0,
+            'peersGettingFromUs': 0, 'peersSendingToUs': 0, 'percentDone': 1,
+            'pieceCount': 10, 'pieceSize': 1024, 'rateDownload': rate, 'rateUpload': rate,
+            'recheckProgress': 0, 'secondsDownloading': 0, 'secondsSeeding': 0,
+            'sizeWhenDone': 10240, 'startDate': 0, 'status': 6, 'totalSize': 10240,
+            'trackerStats': [], 'uploadLimit': 100, 'uploadLimited': False,
+            'uploadRatio': 0, 'uploadedEver': 0}
+
+
+def make_random_raw(tid, rnd):
+    return {'id': tid, 'hashString': '%040x' % tid, 'name': 'Torrent %d' % (tid % 50),
+            'rateDownload': rnd.choice((0, 0, 0, 100, 2000, 50000)),
+            'rateUpload': rnd.choice((0, 0, 100, 3000, 80000)),
+            'totalSize': rnd.choice((1e3, 1e6, 5e6, 1e9)),
+            'sizeWhenDone': rnd.choice((1e3, 1e6, 5e6, 1e9)),
+            'downloadedEver': rnd.randint(0, 10) * 1e5,
+            'uploadedEver': rnd.randint(0, 10) * 1e5,
+            'percentDone': rnd.choice((0, 0.25, 0.5, 1, 1)),
+            'metadataPercentComplete': rnd.choice((0.5, 1, 1)),
+            'recheckProgress': rnd.choice((0, 0, 0.5)),
+            'uploadRatio': rnd.choice((-1, 0, 0.5, 1, 2.5)),
+            'peersConnected': rnd.randint(0, 5),
+            'trackerStats': [{'seederCount': rnd.randint(-1, 3)}],
+            'eta': rnd.choice((-1, -2, 60, 3600)),
+            'addedDate': rnd.choice((0, 1500000000, 1500000001, 1600000000)),
+            'activityDate': rnd.choice((0, 1500000000, 1600000000)),
+            'isPrivate': rnd.choice((True, False))}
+
+
+@benchmark
+def rpc_poll_cycle(delay=0.05):
+    """Time until every poller got its response with serial or parallel requests"""
+    import asyncio
+    from aiohttp import web
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    'client_test', 'aiotransmission_test'))
+    import resources_aiotransmission as rsrc
+    from stig.client.aiotransmission.rpc import TransmissionRPC
+
+    async def delayed_response(request):
+        rqdata = await request.json()
+        if rqdata['method'] != 'session-get':
+            await asyncio.sleep(delay)
+        return web.json_response(rsrc.SESSION_GET_RESPONSE)
+
+    async def measure_poll_cycle(daemon, pollers, max_requests):
+        client = TransmissionRPC(daemon.host, daemon.port, max_requests=max_requests)
+        try:
+            await client.connect()
+            start = time.perf_counter()
+            await asyncio.gather(*(client.session_stats() for _ in range(pollers)))
+            return time.perf_counter() - start
+        finally:
+            await client.disconnect()
+
+    async def run():
+        daemon = rsrc.FakeTransmissionDaemon()
+        daemon.response = delayed_response
+        await daemon.start()
+        try:
+            for pollers in (1, 2, 4, 8):
+                serial = await measure_poll_cycle(daemon, pollers, max_requests=1)
+                parallel = await measure_poll_cycle(daemon, pollers, max_requests=pollers)
+                report('%d pollers with %.0fms response delay: serial=%.1fms, parallel=%.1fms',
+                       pollers, delay * 1e3, serial * 1e3, parallel * 1e3)
+        finally:
+            await daemon.stop()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+@benchmark
+def torrent_update(n=20000):
+    """Update torrents with all keys cached when only their rates change"""
+    from stig.client.aiotransmission import torrent
+    keys = tuple(k for k in torrent.DEPENDENCIES if k not in ('files', 'peers'))
+    tlist = tuple(torrent.Torrent(make_raw(tid)) for tid in range(1, n + 1))
+    for t in tlist:
+        for key in keys:
+            t[key]
+    updates = tuple(make_raw(tid, rate=tid) for tid in range(1, n + 1))
+
+    def update():
+        for t,raw in zip(tlist, updates):
+            t.update(raw)
+
+    seconds, _ = measure(update)
+    report('Updated %d torrents with %d cached keys in %.3fms', n, len(keys), seconds * 1e3)
+
+
+@benchmark
+def torrent_memory(n=1000):
+    """Memory per torrent with raw values stored as dicts or CompactRaw"""
+    import gc
+    import tracemalloc
+    from stig.client.aiotransmission import torrent
+
+    def measure_memory(make_torrent, keys):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            tlist = [make_torrent(make_raw(tid, rate=tid)) for tid in range(1, n + 1)]
+            for t in tlist:
+                for key in keys:
+                    t[key]
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0] / n
+        finally:
+            tracemalloc.stop()
+
+    all_keys = tuple(k for k in torrent.DEPENDENCIES if k not in ('files', 'peers'))
+    for keys in ((), all_keys):
+        dict_size = measure_memory(lambda raw: torrent.Torrent(raw), keys)
+        compact_size = measure_memory(lambda raw: torrent.Torrent(torrent.CompactRaw(raw)), keys)
+        report('%d torrents with %d cached keys: dict=%d bytes, compact=%d bytes per torrent',
+               n, len(keys), dict_size, compact_size)
+
+
+@benchmark
+def file_tree_update(n=100000):
+    """Update a torrent's file tree when only a few files changed"""
+    from stig.client.aiotransmission import torrent
+    files = [{'bytesCompleted': 0, 'length': 1000,
+              'name': 'Torrent/dir%d/sub%d/file%d' % (i % 100, i % 3, i)}
+             for i in range(n)]
+    fileStats = [{'bytesCompleted': 0, 'priority': 0, 'wanted': True}
+                 for i in range(n)]
+    raw = {'id': 1, 'name': 'Torrent', 'downloadDir': '/a/path',
+           'files': files, 'fileStats': fileStats}
+    ft = torrent.TorrentFileTree.create(raw)
+    tuple(ft.files)
+
+    raw['fileStats'] = [dict(fS) for fS in fileStats]
+    for i in range(0, n, 1000):
+        raw['fileStats'][i]['bytesCompleted'] = 100
+    seconds, _ = measure(ft.update, raw)
+    report('Updated tree with %d files in %.3fms', n, seconds * 1e3)
+
+
+@benchmark
+def filter_cache(n=50000):
+    """Filter torrents with and without cached results when a few torrents changed"""
+    import random
+    from stig.client.aiotransmission.api_torrent import _TorrentCache
+    from stig.client.filters import TorrentFilter
+    rnd = random.Random(0)
+    tcache = _TorrentCache()
+    tcache.update([make_random_raw(tid, rnd) for tid in range(1, n + 1)])
+    tfilter = TorrentFilter('name=~^Torrent 1&rate-up>1k|!private&peers>2&size>1M')
+    tids = [t['id'] for t in tcache.get()]
+
+    def change_and_filter(cache):
+        # Change rates of some torrents
+        tcache.update([{'id': tid, 'rateUpload': rnd.choice((0, 5000))}
+                       for tid in rnd.sample(tids, 100)])
+        torrents = tcache.get()
+        seconds, _ = measure(lambda: tuple(tfilter.apply(torrents, cache=cache)))
+        return seconds
+
+    change_and_filter(tcache.filter_cache)
+    cached_time = min(change_and_filter(tcache.filter_cache) for _ in range(3))
+    uncached_time = min(change_and_filter(None) for _ in range(3))
+    report('Filtered %d torrents with 100 changes: uncached=%.3fms, cached=%.3fms',
+           n, uncached_time * 1e3, cached_time * 1e3)
+
+
+@benchmark
+def compiled_filter(n=50000):
+    """Filter torrents with a compiled filter chain or filter by filter"""
+    import random
+    from stig.client.aiotransmission.torrent import Torrent
+    from stig.client.filters import TorrentFilter
+    rnd = random.Random(0)
+    torrents = [Torrent(make_random_raw(tid, rnd)) for tid in range(1, n + 1)]
+    fstr = 'name=~^Torrent 1&rate-up>1k|!private&peers>2&size>1M|uploading&!complete'
+    tfilter = TorrentFilter(fstr)
+
+    def interpreted_match(torrent):
+        return any(all(f.match(torrent) for f in AND_chain)
+                   for AND_chain in tfilter._filterchains)
+
+    interpreted_time = min(measure(lambda: [t for t in torrents if interpreted_match(t)])[0]
+                           for _ in range(3))
+    compiled_time = min(measure(lambda: list(tfilter.apply(torrents)))[0]
+                        for _ in range(3))
+    report('Filtered %d torrents with %r: interpreted=%.3fms, compiled=%.3fms',
+           n, fstr, interpreted_time * 1e3, compiled_time * 1e3)
+
+
+@benchmark
+def single_pass_sort(n=20000):
+    """Sort torrents by multiple sort orders in one pass or one pass per sort order"""
+    import random
+    from stig.client.aiotransmission.torrent import Torrent
+    from stig.client.sorters import TorrentSorter
+    rnd = random.Random(0)
+    torrents = [Torrent(make_random_raw(tid, rnd)) for tid in range(1, n + 1)]
+    sorter = TorrentSorter(('rate-down', '!size', 'name'))
+
+    def multipass_sort():
+        # Sort the way sorters did before they were combined into a single
+        # pass: One full sort for each key function of each sort order
+        items = torrents
+        for keyfunc,reverse,_ in sorter._levels:
+            items = sorted(items, key=keyfunc, reverse=reverse)
+        return items
+
+    multipass_time = min(measure(multipass_sort)[0] for _ in range(3))
+    singlepass_time = min(measure(sorter.apply, torrents)[0] for _ in range(3))
+    report('Sorted %d torrents by %s: multi-pass=%.3fms, single-pass=%.3fms',
+           n, sorter, multipass_time * 1e3, singlepass_time * 1e3)
+
+
+@benchmark
+def sorted_insert(n=20000):
+    """Move a few changed torrents to their sorted position or sort all torrents again"""
+    import random
+    from stig.client.aiotransmission.torrent import Torrent
+    from stig.client.sorters import TorrentSorter
+    rnd = random.Random(0)
+    torrents = [Torrent(make_random_raw(tid, rnd)) for tid in range(1, n + 1)]
+    sorter = TorrentSorter(('!rate-down', 'name'))
+    sorted_torrents = sorter.apply(torrents)
+
+    # Five torrents change their rates
+    changed = rnd.sample(sorted_torrents, 5)
+    for t in changed:
+        t.update({'id': t['id'], 'rateDownload': rnd.choice((0, 50, 5000))})
+
+    def insert():
+        changed_ids = {id(t) for t in changed}
+        unchanged = [t for t in sorted_torrents if id(t) not in changed_ids]
+        sorter.insert(unchanged, changed)
+
+    resort_time, _ = measure(sorter.apply, sorted_torrents)
+    insert_time, _ = measure(insert)
+    report('Moved %d of %d torrents: resort=%.3fms, insert=%.3fms',
+           len(changed), n, resort_time * 1e3, insert_time * 1e3)
+
+
+@benchmark
+def torrent_cache_get():
+    """Get cached torrents by ID and by hash"""
+    from stig.client.aiotransmission.api_torrent import _TorrentCache
+    for n, m in ((2000, 200), (20000, 2000), (20000, 20000)):
+        tcache = _TorrentCache()
+        tcache.update({'id': tid, 'name': 'Torrent %d' % tid, 'hashString': '%040x' % tid}
+                      for tid in range(1, n + 1))
+        ids = tuple(range(n, n - m, -1))
+        hashes = tuple('%040x' % tid for tid in ids)
+        id_time = min(measure(tcache.get, *ids)[0] for _ in range(5))
+        hash_time = min(measure(tcache.get, *hashes)[0] for _ in range(5))
+        report('Getting %d of %d cached torrents: by ID: %.3fms, by hash: %.3fms',
+               m, n, id_time * 1e3, hash_time * 1e3)
+
+
+@benchmark
+def list_hide_items(n=20000):
+    """Hide and unhide a few list items with sets or by looking them up in the list"""
+    from tui_test.list_widget_test import hide_or_unhide_by_lookup, make_list_widget
+    lw = make_list_widget()
+    lw.hidden_ids = frozenset(range(0, n, 3))
+    lw._set_data({id: {'id': id, 'name': 'Item %d' % id} for id in range(n)})
+    lw.render((80, 30))
+
+    # Secondary filter hides or unhides 10 items
+    lw.hidden_ids = frozenset(range(0, n, 3)) ^ frozenset(range(100, 110))
+    widgets = tuple(lw._existing_widgets.values())
+    walker = list(lw._listbox.body)
+    limited_widgets = tuple(lw._limit_items(widgets))
+    lookup_time, _ = measure(hide_or_unhide_by_lookup, walker, widgets, limited_widgets)
+    sets_time, _ = measure(lw._hide_or_unhide_widgets)
+    report('Hid or unhid 10 of %d items: lookup=%.3fms, sets=%.3fms',
+           n, lookup_time * 1e3, sets_time * 1e3)
+
+
+def main(names):
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print('Unknown benchmark: %s' % ', '.join(unknown), file=sys.stderr)
+        print('Available benchmarks: %s' % ', '.join(BENCHMARKS), file=sys.stderr)
+        return 1
+    # TUI widgets log to the root logger's handler
+    logging.basicConfig(level=logging.WARNING)
+    for name in names or BENCHMARKS:
+        print('%s: %s' % (name, BENCHMARKS[name].__doc__))
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -41,6 +41,7 @@ api_status.RequestPoller = FakeRequestPoller
 
 class FakeTorrentAPI():
     fake_tlist = ()
+    filter_cache = None
 
     async def torrents(self, *args, **kwargs):
         return self.fake_tlist
@@ -1,9 +1,13 @@
+import marshal
 import os.path
+import tempfile
+import unittest
 
 import asynctest
 import resources_aiotransmission as rsrc
+from aiohttp import web
 from stig.client import MAX_TORRENT_FILE_SIZE
-from stig.client.aiotransmission.api_torrent import TorrentAPI
+from stig.client.aiotransmission.api_torrent import TorrentAPI, _TorrentCache
 from stig.client.aiotransmission.rpc import TransmissionRPC
 from stig.client.aiotransmission.torrent import Torrent
 from stig.client.filters.torrent import TorrentFilter
@@ -132,6 +136,44 @@ class TestGettingTorrents(TorrentAPITestCase):
         self.assertEqual(response.msgs, ())
         self.assertEqual(response.errors, ('No torrent with ID: 4', 'No torrent with ID: 5'))
 
+    async def test_get_recently_active_torrents(self):
+        def response(request_data):
+            if request_data['arguments'].get('ids') == 'recently-active':
+                return {'result': 'success',
+                        'arguments': {'torrents': [{'id': 1, 'name': 'Torrent1 renamed'},
+                                                   {'id': 4, 'name': 'Torrent4'}],
+                                      'removed': [2]}}
+            else:
+                return rsrc.response_torrents(
+                    {'id': 1, 'name': 'Torrent1'},
+                    {'id': 2, 'name': 'Torrent2'},
+                    {'id': 3, 'name': 'Torrent3'},
+                )
+
+        async def handler(request):
+            return web.json_response(response(await request.json()))
+        self.daemon.response = handler
+
+        # First request can't be limited to recently active torrents
+        response1 = await self.api.torrents(keys=('name',), recently_active=True)
+        self.assertEqual(self.daemon.requests[-1]['arguments'].get('ids'), None)
+        self.assertEqual(tuple(t['name'] for t in response1.torrents),
+                         ('Torrent1', 'Torrent2', 'Torrent3'))
+
+        response2 = await self.api.torrents(keys=('name',), recently_active=True)
+        self.assertEqual(self.daemon.requests[-1]['arguments'].get('ids'), 'recently-active')
+        self.assertEqual(response2.success, True)
+        self.assertEqual(sorted((t['id'], t['name']) for t in response2.torrents),
+                         [(1, 'Torrent1 renamed'), (3, 'Torrent3'), (4, 'Torrent4')])
+
+        # Requesting more keys than before requires a full request
+        await self.api.torrents(keys=('name', 'rate-down'), recently_active=True)
+        self.assertEqual(self.daemon.requests[-1]['arguments'].get('ids'), None)
+
+    async def test_get_recently_active_torrents_with_filter(self):
+        with self.assertRaises(ValueError):
+            await self.api.torrents('all', recently_active=True)
+
     async def test_get_torrents_by_filter(self):
         self.daemon.response = rsrc.response_torrents(
             {'id': 1, 'name': 'Foo'},
@@ -159,6 +201,71 @@ class TestGettingTorrents(TorrentAPITestCase):
         self.assertEqual(response.msgs, ())
         self.assertEqual(response.errors, ('No matching torrents: =Nope',))
 
+    async def test_get_torrents_by_filter_requests_other_fields_for_matches(self):
+        self.daemon.response = rsrc.response_torrents(
+            {'id': 1, 'name': 'Foo', 'rateDownload': 10},
+            {'id': 2, 'name': 'Bar', 'rateDownload': 20},
+        )
+        self.daemon.requests.clear()
+        await self.api.torrents(torrents=TorrentFilter('name=Foo'), keys=('name', 'rate-down', 'peers'))
+        filter_request, other_request = (r['arguments'] for r in self.daemon.requests)
+        self.assertNotIn('ids', filter_request)
+        self.assertEqual(set(filter_request['fields']), {'id', 'name'})
+        self.assertEqual(other_request['ids'], [1])
+        self.assertEqual(set(other_request['fields']), {'id', 'rateDownload', 'peers', 'totalSize'})
+
+        # No second request if the filter needs all wanted fields
+        self.daemon.requests.clear()
+        await self.api.torrents(torrents=TorrentFilter('name=Foo'), keys=('name',))
+        self.assertEqual(len(self.daemon.requests), 1)
+
+    async def test_get_torrents_by_filter_requests_expensive_filter_fields_for_matches(self):
+        status = {'status': 4, 'percentDone': 0.5, 'metadataPercentComplete': 1,
+                  'rateDownload': 0, 'rateUpload': 0, 'peersConnected': 0, 'trackerStats': []}
+        self.daemon.response = rsrc.response_torrents(
+            dict(status, id=1, name='Foo', isPrivate=True),
+            dict(status, id=2, name='Bar', isPrivate=True),
+            dict(status, id=3, name='Foo', isPrivate=False),
+        )
+        self.daemon.requests.clear()
+        response = await self.api.torrents(torrents=TorrentFilter('name=Foo&isolated'), keys=('name',))
+        self.assertEqual(tuple(t['id'] for t in response.torrents), (1,))
+        filter_request, other_request = (r['arguments'] for r in self.daemon.requests)
+        self.assertEqual(set(filter_request['fields']), {'id', 'name'})
+        self.assertEqual(other_request['ids'], [1, 3])
+        self.assertIn('trackerStats', other_request['fields'])
+
+        # Expensive fields are requested for all torrents if they are needed
+        # to find any matches
+        self.daemon.requests.clear()
+        response = await self.api.torrents(torrents=TorrentFilter('name=Foo|isolated'), keys=('name',))
+        self.assertEqual(tuple(t['id'] for t in response.torrents), (1, 2, 3))
+        self.assertEqual(len(self.daemon.requests), 1)
+        self.assertNotIn('ids', self.daemon.requests[0]['arguments'])
+        self.assertIn('trackerStats', self.daemon.requests[0]['arguments']['fields'])
+
+
+    async def test_on_change(self):
+        changes = []
+        self.api.on_change(changes.append, autoremove=False)
+        self.daemon.response = rsrc.response_torrents(
+            {'id': 1, 'name': 'Torrent1', 'rateDownload': 10},
+        )
+        await self.api.torrents(keys=('name', 'rate-down'))
+        self.assertEqual(changes, [self.api])
+        await self.api.torrents(keys=('name', 'rate-down'))
+        self.assertEqual(changes, [self.api])
+
+        self.daemon.response = rsrc.response_torrents(
+            {'id': 1, 'name': 'Torrent1', 'rateDownload': 20},
+        )
+        await self.api.torrents(keys=('name', 'rate-down'))
+        self.assertEqual(changes, [self.api, self.api])
+
+        self.daemon.response = rsrc.response_torrents()
+        await self.api.torrents(keys=('name', 'rate-down'))
+        self.assertEqual(changes, [self.api, self.api, self.api])
+
 
 class TestManipulatingTorrents(TorrentAPITestCase):
     async def setUp(self):
@@ -347,3 +454,176 @@ class TestTorrentBandwidthLimit(TorrentAPITestCase):
         )
         await self.api.adjust_limit_rate_up(TorrentFilter('id=1|id=2'), -50e3)
         self.daemon.requests == ()  # Assert no requests were sent
+
+
+class TestSnapshots(TorrentAPITestCase):
+    async def setUp(self):
+        await super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'subdir', 'snapshot')
+        self.daemon.response = rsrc.response_torrents(
+            {'id': 1, 'name': 'Torrent1', 'hashString': 'abc', 'rateDownload': 10},
+            {'id': 2, 'name': 'Torrent2', 'hashString': 'def', 'rateDownload': 20},
+        )
+
+    async def tearDown(self):
+        self.tmpdir.cleanup()
+        await super().tearDown()
+
+    async def test_save_and_load_snapshot(self):
+        for keys in (('name', 'rate-down'), ('name', 'rate-down', 'hash')):
+            await self.api.torrents(keys=keys)
+            self.assertEqual(await self.api.save_snapshot(self.path), True)
+
+            api = TorrentAPI(self.rpc)
+            self.assertEqual(api.load_snapshot(self.path), True)
+            self.assertEqual(api.stale, True)
+            tlist = api.cached_torrents(('name', 'rate-down', 'hash'))
+            self.assertEqual(tuple((t['id'], t['name'], t['hash'], t['rate-down']) for t in tlist),
+                             ((1, 'Torrent1', 'abc', 10), (2, 'Torrent2', 'def', 20)))
+            self.assertEqual(api.cached_torrents(('name', 'size-total')), None)
+
+            # Requesting all torrents replaces torrents from snapshot
+            snapshot_torrent = tlist[0]
+            response = await api.torrents(keys=('name',))
+            self.assertEqual(api.stale, False)
+            self.assertIsNot(response.torrents[0], snapshot_torrent)
+
+    async def test_fields_of_single_torrents_are_saved(self):
+        self.daemon.response = rsrc.response_torrents(
+            {'id': 1, 'name': 'Torrent1', 'hashString': 'abc'},
+            {'id': 2, 'name': 'Torrent2', 'hashString': 'def'},
+        )
+        await self.api.torrents(keys=('name',))
+        self.daemon.response = rsrc.response_torrents(
+            {'id': 1, 'name': 'Torrent1', 'hashString': 'abc', 'rateDownload': 10},
+        )
+        await self.api.torrents((1,), keys=('rate-down',))
+        self.assertEqual(await self.api.save_snapshot(self.path), True)
+
+        api = TorrentAPI(self.rpc)
+        self.assertEqual(api.load_snapshot(self.path), True)
+        tlist = api.cached_torrents(('name', 'rate-down'), TorrentFilter('name=Torrent1'))
+        self.assertEqual(tuple((t['name'], t['rate-down']) for t in tlist), (('Torrent1', 10),))
+        self.assertEqual(api.cached_torrents(('name', 'rate-down')), None)
+        self.assertEqual(api.cached_torrents(('name',), TorrentFilter('rate-down>0')), None)
+
+    async def test_torrents_are_not_requested_by_id_while_stale(self):
+        await self.api.torrents(keys=('name',))
+        self.assertEqual(await self.api.save_snapshot(self.path), True)
+
+        api = TorrentAPI(self.rpc)
+        api.load_snapshot(self.path)
+        requests = len(self.daemon.requests)
+        for from_cache in (False, True):
+            response = await api.torrents((1,), keys=('name',), from_cache=from_cache)
+            self.assertEqual(response.success, False)
+            self.assertEqual(response.errors, ('Torrent list is not up to date yet',))
+        self.assertEqual(len(self.daemon.requests), requests)
+
+        # Filters are applied to requested torrents, not to the snapshot
+        response = await api.torrents('name=Torrent1', keys=('name',), from_cache=True)
+        self.assertEqual(len(self.daemon.requests), requests + 1)
+        self.assertEqual(api.stale, False)
+        response = await api.torrents((1,), keys=('name',))
+        self.assertEqual(tuple(t['name'] for t in response.torrents), ('Torrent1',))
+
+    async def test_snapshot_of_other_daemon_version_is_removed_when_connected(self):
+        await self.api.torrents(keys=('name',))
+        self.assertEqual(await self.api.save_snapshot(self.path), True)
+        with open(self.path, 'rb') as f:
+            snapshot = marshal.load(f)
+        await self.rpc.disconnect()
+        self.daemon.response = None  # Respond to 'session-get'
+
+        for version, exp_stale in ((snapshot['version'], True), ('1.00 (1)', False)):
+            snapshot['version'] = version
+            with open(self.path, 'wb') as f:
+                marshal.dump(snapshot, f)
+            api = TorrentAPI(self.rpc)
+            self.assertEqual(api.load_snapshot(self.path), True)
+            await self.rpc.connect()
+            self.assertEqual(api.stale, exp_stale)
+            self.assertEqual(len(api.cached_torrents(('name',))), 2 if exp_stale else 0)
+            await self.rpc.disconnect()
+
+        await self.api.torrents(keys=('name',))
+        self.assertEqual(await self.api.save_snapshot(self.path), True)
+        self.rpc.port = self.daemon.port + 1
+        self.assertEqual(self.api.load_snapshot(self.path), False)
+        self.assertFalse(os.path.exists(self.path))
+
+        with open(self.path, 'wb') as f:
+            f.write(b'this is not a snapshot')
+        self.assertEqual(self.api.load_snapshot(self.path), False)
+        self.assertFalse(os.path.exists(self.path))
+
+    async def test_nothing_to_save(self):
+        self.assertEqual(await self.api.save_snapshot(self.path), False)
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestTorrentCache(unittest.TestCase):
+    def test_changes(self):
+        tcache = _TorrentCache()
+        changes = tcache.update(({'id': 1, 'name': 'foo'}, {'id': 2, 'name': 'bar'}))
+        self.assertEqual((changes.added, changes.removed, changes.changed), ({1, 2}, set(), {}))
+
+        changes = tcache.update(({'id': 1, 'name': 'foo'}, {'id': 2, 'name': 'baz'}))
+        self.assertEqual((changes.added, changes.removed), (set(), set()))
+        self.assertEqual(tuple(changes.changed), (2,))
+        self.assertIn('name', changes.changed[2])
+
+        tcache.remove(1)
+        tcache.update(({'id': 3, 'name': 'foo'},))
+        tcache.purge(existing_tids=(1, 3))
+        changes = tcache.pop_changes()
+        self.assertEqual(changes.added, {3})
+        self.assertEqual(changes.removed, {1, 2})
+        self.assertEqual(changes.changed, {})
+        self.assertFalse(tcache.pop_changes())
+
+    def test_replaced_torrent_is_added_and_removed(self):
+        tcache = _TorrentCache()
+        tcache.update(({'id': 1, 'name': 'foo'},))
+        tcache.pop_changes()
+        tcache.remove(1)
+        tcache.update(({'id': 1, 'name': 'bar'},))
+        changes = tcache.pop_changes()
+        self.assertEqual((changes.added, changes.removed, changes.changed), ({1}, {1}, {}))
+
+    def test_compact(self):
+        tcache = _TorrentCache(compact=True)
+        tcache.update(({'id': 1, 'name': 'foo', 'hashString': 'abc'},))
+        changes = tcache.update(({'id': 1, 'name': 'bar'},))
+        self.assertIn('name', changes.changed[1])
+        self.assertEqual(tcache.get(1)[0]['name'], 'bar')
+        self.assertEqual(tcache.get_raw(), {'abc': {'id': 1, 'name': 'bar', 'hashString': 'abc'}})
+        self.assertEqual(tcache.get_raw(exclude_fields=('hashString',)),
+                         {'abc': {'id': 1, 'name': 'bar'}})
+
+    def test_switching_compact_keeps_torrents(self):
+        tcache = _TorrentCache()
+        tcache.update(({'id': 1, 'name': 'foo', 'hashString': 'abc'},))
+        t = tcache.get(1)[0]
+        tcache.compact = True
+        self.assertIs(tcache.get(1)[0], t)
+        self.assertEqual(t['name'], 'foo')
+        tcache.update(({'id': 1, 'name': 'bar'},))
+        tcache.compact = False
+        self.assertEqual(t['name'], 'bar')
+
+    def test_get_by_ids_and_hashes(self):
+        tcache = _TorrentCache()
+        tcache.update(({'id': 1, 'name': 'foo', 'hashString': 'abc'},
+                       {'id': 2, 'name': 'bar', 'hashString': 'def'},
+                       {'id': 3, 'name': 'baz'}))
+        self.assertEqual(tuple(t['id'] for t in tcache.get()), (1, 2, 3))
+        self.assertEqual(tuple(t['id'] for t in tcache.get(3, 1)), (3, 1))
+        self.assertEqual(tuple(t['id'] for t in tcache.get('def', 3, 'abc')), (2, 3, 1))
+        self.assertEqual(tuple(t['id'] for t in tcache.get(2, 'def', 4, 'xyz')), (2,))
+
+        tcache.remove(2)
+        self.assertEqual(tcache.get('def'), ())
+        tcache.purge(existing_tids=(3,))
+        self.assertEqual(tcache.get('abc', 1, 3), tcache.get(3))
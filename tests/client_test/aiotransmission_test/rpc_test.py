@@ -1,11 +1,16 @@
 import asyncio
+import json
+import unittest
+from unittest.mock import patch
 
 from aiohttp import web
 
 import asynctest
 import resources_aiotransmission as rsrc
 from stig.client import AuthError, ConnectionError, RPCError, TimeoutError
+from stig.client.aiotransmission import codec
 from stig.client.aiotransmission.rpc import TransmissionRPC
+from stig.client.aiotransmission.torrent import TorrentFields
 
 
 class TestTransmissionRPC(asynctest.ClockedTestCase):
@@ -401,3 +406,156 @@ class TestTransmissionRPC(asynctest.ClockedTestCase):
         self.assert_cb_error_called(calls=1,
                                     args=[(self.client,)],
                                     kwargs=[{'error': cm.exception}])
+
+    async def test_parallel_requests_connect_only_once(self):
+        self.assert_not_connected_to(self.daemon.host, self.daemon.port)
+        self.client.max_requests = 5
+        await asyncio.gather(*(self.client.session_get() for _ in range(5)))
+        self.assert_connected_to(self.daemon.host, self.daemon.port)
+        self.assert_cb_connected_called(calls=1, args=[(self.client,)])
+        self.assert_cb_disconnected_called(calls=0)
+        self.assert_cb_error_called(calls=0)
+
+    async def test_parallel_requests_fail_to_connect(self):
+        self.client.port = rsrc.unused_port()
+        self.client.max_requests = 3
+        results = await asyncio.gather(*(self.client.session_get() for _ in range(3)),
+                                       return_exceptions=True)
+        for result in results:
+            self.assertIsInstance(result, ConnectionError)
+        self.assertEqual(self.client.connected, False)
+        self.assert_cb_connected_called(calls=0)
+
+    def test_invalid_max_requests(self):
+        with self.assertRaises(ValueError):
+            self.client.max_requests = 0
+
+    async def test_json_codec(self):
+        decoded = []
+
+        def loads(body):
+            decoded.append(len(body))
+            return json.loads(body)
+
+        codec.register('test', loads=loads)
+        self.addCleanup(codec._preferred.remove, 'test')
+        self.addCleanup(codec._codecs.pop, 'test')
+        self.client.json_codec = 'test'
+        await self.client.session_get()
+        self.assertTrue(decoded)
+
+        with self.assertRaises(ValueError):
+            self.client.json_codec = 'nope'
+        self.assertEqual(self.client.json_codec, 'test')
+
+    async def test_request_is_sent_with_each_codec(self):
+        class Seconds(float):
+            pass
+
+        fields = TorrentFields('name', 'rate-up')
+        for name in codec.names():
+            self.client.json_codec = name
+            await self.client.torrent_get(fields=fields, ids=(1, 2))
+            await self.client.session_set(**{'idle-seeding-limit': Seconds(1.5)})
+            self.assertEqual(self.daemon.requests[-2],
+                             {'method': 'torrent-get',
+                              'arguments': {'fields': list(fields), 'ids': [1, 2]}}, name)
+            self.assertEqual(self.daemon.requests[-1],
+                             {'method': 'session-set',
+                              'arguments': {'idle-seeding-limit': 1.5}}, name)
+
+    async def test_decoding_large_response_in_executor(self):
+        loop = asyncio.get_event_loop()
+        with patch('stig.client.aiotransmission.rpc.EXECUTOR_DECODE_SIZE', 0), \
+             patch.object(loop, 'run_in_executor', wraps=loop.run_in_executor) as run_in_executor:
+            info = await self.client.session_get()
+        self.assertEqual(info, rsrc.SESSION_GET_RESPONSE['arguments'])
+        self.assertTrue(run_in_executor.called)
+
+
+class TestCodec(unittest.TestCase):
+    def test_stdlib_is_always_available(self):
+        self.assertIn('json', codec.names())
+        self.assertEqual(codec.get('json').loads(b'{"a": [1, 2]}'), {'a': [1, 2]})
+
+    def test_stdlib_decodes_bytes(self):
+        with patch('json.loads', wraps=json.loads) as loads:
+            codec.get('json').loads('{"a": "\u00e4"}'.encode('utf-8'))
+        self.assertEqual(loads.call_args[0], ('{"a": "\u00e4"}',))
+        # Invalid UTF-8 is reported like malformed JSON
+        with self.assertRaises(ValueError):
+            codec.get('json').loads(b'{"a": "\xff"}')
+
+    def test_preferred_codec(self):
+        codec.register('test', loads=json.loads)
+        self.addCleanup(codec._preferred.remove, 'test')
+        self.addCleanup(codec._codecs.pop, 'test')
+        self.assertEqual(codec.get().name, 'test')
+        self.assertEqual(codec.names()[0], 'test')
+
+
+class TestTransmissionRPCRequestsInFlight(asynctest.TestCase):
+    async def setUp(self):
+        self.daemon = rsrc.FakeTransmissionDaemon()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        async def delayed_response(request):
+            rqdata = await request.json()
+            if rqdata['method'] != 'session-get':
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                await asyncio.sleep(0.05)
+                self.in_flight -= 1
+            return web.json_response(rsrc.SESSION_GET_RESPONSE)
+        self.daemon.response = delayed_response
+        await self.daemon.start()
+
+    async def tearDown(self):
+        await self.daemon.stop()
+
+    async def poll(self, pollers, max_requests):
+        self.max_in_flight = 0
+        client = TransmissionRPC(self.daemon.host, self.daemon.port, max_requests=max_requests)
+        try:
+            await client.connect()
+            results = await asyncio.gather(*(client.session_stats() for _ in range(pollers)))
+            self.assertEqual(len(results), pollers)
+        finally:
+            await client.disconnect()
+
+    async def test_requests_are_sent_in_parallel(self):
+        await self.poll(4, max_requests=4)
+        self.assertEqual(self.max_in_flight, 4)
+
+    async def test_number_of_requests_in_flight_is_bounded(self):
+        await self.poll(8, max_requests=1)
+        self.assertEqual(self.max_in_flight, 1)
+        await self.poll(8, max_requests=3)
+        self.assertEqual(self.max_in_flight, 3)
+
+    async def test_failing_request_does_not_disconnect_other_requests(self):
+        async def response(request):
+            rqdata = await request.json()
+            if rqdata['method'] == 'session-stats':
+                # Connection is lost while another request is in flight
+                request.transport.close()
+            elif rqdata['method'] == 'torrent-get':
+                await asyncio.sleep(0.1)
+            return web.json_response(rsrc.SESSION_GET_RESPONSE)
+        self.daemon.response = response
+
+        client = TransmissionRPC(self.daemon.host, self.daemon.port, max_requests=2)
+        disconnected = rsrc.FakeCallback('disconnected')
+        client.on('disconnected', disconnected)
+        try:
+            await client.connect()
+            results = await asyncio.gather(client.torrent_get(), client.session_stats(),
+                                           return_exceptions=True)
+            self.assertEqual(results[0], rsrc.SESSION_GET_RESPONSE['arguments'])
+            self.assertIsInstance(results[1], ConnectionError)
+            # Connection is closed after all requests are finished
+            self.assertEqual(client.connected, False)
+            self.assertEqual(disconnected.calls, 1)
+        finally:
+            await client.disconnect()
@@ -1,7 +1,28 @@
+import logging
+import os
 import unittest
 
 from stig.client.aiotransmission import torrent
 
+log = logging.getLogger(__name__)
+
+
+def make_raw(tid, rate=0):
+    return {'id': tid, 'hashString': '%040x' % tid, 'name': 'Torrent %d' % tid,
+            'activityDate': 1500000000, 'addedDate': 1500000000, 'comment': '',
+            'corruptEver': 0, 'creator': '', 'dateCreated': 1500000000,
+            'desiredAvailable': 0, 'doneDate': 0, 'downloadDir': '/tmp',
+            'downloadLimit': 100, 'downloadLimited': False, 'downloadedEver': 0,
+            'error': 0, 'errorString': '', 'eta': -1, 'haveUnchecked': 0, 'haveValid': 0,
+            'isPrivate': False, 'leftUntilDone': 0, 'magnetLink': 'magnet:',
+            'manualAnnounceTime': 0, 'metadataPercentComplete': 1, 'peersConnected': 0,
+            'peersGettingFromUs': 0, 'peersSendingToUs': 0, 'percentDone': 1,
+            'pieceCount': 10, 'pieceSize': 1024, 'rateDownload': rate, 'rateUpload': rate,
+            'recheckProgress': 0, 'secondsDownloading': 0, 'secondsSeeding': 0,
+            'sizeWhenDone': 10240, 'startDate': 0, 'status': 6, 'totalSize': 10240,
+            'trackerStats': [], 'uploadLimit': 100, 'uploadLimited': False,
+            'uploadRatio': 0, 'uploadedEver': 0}
+
 
 def test_all_dependencies_are_standard_keys():
     from stig.client.ttypes import TYPES
@@ -32,6 +53,51 @@ class Test_is_isolated(unittest.TestCase):
         self.assertEqual(tc, False)
 
 
+class Test_status(unittest.TestCase):
+    @staticmethod
+    def status_as_list(t):
+        # How statuses were listed before they were stored as bits
+        from stig.client.ttypes import Status
+        statuses = []
+        if t['status'] == 0:
+            statuses.append(Status.STOPPED)
+        elif t['status'] in (1, 2):
+            statuses.append(Status.VERIFY)
+        if t['status'] in (1, 3, 5):
+            statuses.append(Status.QUEUED)
+        if Status.STOPPED not in statuses:
+            if torrent._is_isolated(t):
+                statuses.append(Status.ISOLATED)
+            if t['metadataPercentComplete'] < 1:
+                statuses.append(Status.INIT)
+            if Status.QUEUED not in statuses:
+                if t['peersConnected'] > 0:
+                    if t['rateDownload'] > 0:
+                        statuses.append(Status.DOWNLOAD)
+                    if t['rateUpload'] > 0:
+                        statuses.append(Status.UPLOAD)
+                    statuses.append(Status.CONNECTED)
+                if t['percentDone'] >= 1:
+                    statuses.append(Status.SEED)
+        if all(x not in statuses for x in (Status.UPLOAD, Status.DOWNLOAD, Status.VERIFY)):
+            statuses.append(Status.IDLE)
+        return statuses
+
+    def test_same_statuses_as_list(self):
+        import itertools
+        trackerStats = ([], [{'lastAnnounceSucceeded': False, 'hasAnnounced': True}])
+        combinations = itertools.product(range(7), (False, True), trackerStats,
+                                         (0.5, 1), (0, 3), (0, 100), (0, 100), (0.5, 1))
+        for (status, private, trackers, metadata, peers,
+             rate_down, rate_up, done) in combinations:
+            raw = make_raw(1)
+            raw.update(status=status, isPrivate=private, trackerStats=trackers,
+                       metadataPercentComplete=metadata, peersConnected=peers,
+                       rateDownload=rate_down, rateUpload=rate_up, percentDone=done)
+            exp = self.status_as_list(raw)
+            self.assertEqual(list(torrent.Torrent(raw)['status']), exp, raw)
+
+
 class TestTorrentFields(unittest.TestCase):
     def test_handpicked_fields(self):
         testcase = ('id', 'hash', 'name', 'status', 'id', 'id', 'id')
@@ -63,6 +129,17 @@ class TestTorrentFields(unittest.TestCase):
         self.assertEqual(f2 + f3, torrent.TorrentFields('name', 'ratio', 'hash', 'status'))
         self.assertEqual(f1 + f2 + f3, torrent.TorrentFields('name', 'path', 'ratio', 'hash', 'status'))
 
+    def test_subtracting(self):
+        f1 = torrent.TorrentFields('name', 'path', 'peers')
+        f2 = torrent.TorrentFields('name', 'ratio')
+        self.assertEqual(set(f1 - f2), {'downloadDir', 'peers', 'totalSize'})
+        self.assertEqual(f2 - f1, ('uploadRatio',))
+
+    def test_cost(self):
+        self.assertEqual(torrent.fields_cost(('id', 'name')), 2)
+        self.assertEqual(torrent.fields_cost(('id', 'peers')), 1 + torrent.FIELD_COSTS['peers'])
+        self.assertEqual(torrent.expensive_fields(('id', 'peers', 'name')), ('peers',))
+
 
 class TestTorrent(unittest.TestCase):
     def test_contains(self):
@@ -73,6 +150,76 @@ class TestTorrent(unittest.TestCase):
         self.assertEqual(set(t), {'id', 'name', 'rate-down', 'hash',
                                   'time-created', '%verified'})
 
+    def test_update_returns_changed_keys(self):
+        raw = {'id': 123, 'name': 'Fake torrent', 'rateDownload': 10000, 'rateUpload': 0}
+        t = torrent.Torrent(raw)
+        self.assertEqual(t['rate-down'], 10000)
+        self.assertEqual(t.update({'id': 123, 'name': 'Fake torrent', 'rateDownload': 20000}),
+                         torrent.DEPENDENT_KEYS['rateDownload'])
+        self.assertEqual(t['rate-down'], 20000)
+        self.assertEqual(t.update({'id': 123, 'name': 'Fake torrent', 'rateDownload': 20000}), set())
+        self.assertIn('name', t.update({'id': 123, 'name': 'Real torrent', 'rateUpload': 0}))
+        self.assertEqual(t['name'], 'Real torrent')
+
+    def test_update_invalidates_only_keys_of_changed_fields(self):
+        keys = tuple(k for k in torrent.DEPENDENCIES if k not in ('files', 'peers'))
+        tlist = tuple(torrent.Torrent(make_raw(tid, rate=0)) for tid in range(1, 4))
+        for t in tlist:
+            for key in keys:
+                t[key]
+            self.assertEqual(set(t._cache), set(keys))
+
+        # Only rates change
+        for t in tlist:
+            t.update(make_raw(t['id'], rate=t['id']))
+
+        expected_invalidated = (torrent.DEPENDENT_KEYS['rateDownload'] |
+                                torrent.DEPENDENT_KEYS['rateUpload'])
+        for t in tlist:
+            self.assertEqual(set(t._cache), set(keys) - expected_invalidated)
+            self.assertEqual(t['rate-down'], t['id'])
+            self.assertEqual(t['rate-up'], t['id'])
+
+        # Nothing changes
+        for t in tlist:
+            for key in keys:
+                t[key]
+            self.assertEqual(t.update(make_raw(t['id'], rate=t['id'])), set())
+            self.assertEqual(set(t._cache), set(keys))
+
+    def test_compact_raw(self):
+        t = torrent.Torrent(torrent.CompactRaw(make_raw(123, rate=10)))
+        self.assertEqual(t['rate-down'], 10)
+        self.assertEqual(t.update({'id': 123, 'rateDownload': 20}), torrent.DEPENDENT_KEYS['rateDownload'])
+        self.assertEqual(t['rate-down'], 20)
+        self.assertIn('name', t)
+        self.assertNotIn('files', t)
+
+    def test_memory_per_torrent(self):
+        import gc
+        import tracemalloc
+
+        def measure(make_torrent, keys, n=100):
+            gc.collect()
+            tracemalloc.start()
+            try:
+                tlist = [make_torrent(make_raw(tid, rate=tid)) for tid in range(1, n + 1)]
+                for t in tlist:
+                    for key in keys:
+                        t[key]
+                gc.collect()
+                return tracemalloc.get_traced_memory()[0] / n
+            finally:
+                tracemalloc.stop()
+
+        all_keys = tuple(k for k in torrent.DEPENDENCIES if k not in ('files', 'peers'))
+        for keys in ((), all_keys):
+            dict_size = measure(lambda raw: torrent.Torrent(raw), keys)
+            compact_size = measure(lambda raw: torrent.Torrent(torrent.CompactRaw(raw)), keys)
+            log.debug('Memory per torrent with %d cached keys: dict=%d bytes, compact=%d bytes',
+                      len(keys), dict_size, compact_size)
+            self.assertLess(compact_size, dict_size)
+
 class TestTorrentFileTree(unittest.TestCase):
     def test_update(self):
         raw = {'id': 1, 'name': 'Fake torrent', 'downloadDir': '/a/path',
@@ -100,3 +247,216 @@ class TestTorrentFileTree(unittest.TestCase):
         self.assertEqual(ft['Fake torrent']['file1']['size-downloaded'], 500)
         self.assertEqual(ft['Fake torrent']['subdir']['file2']['%downloaded'], 10)
         self.assertEqual(ft['Fake torrent']['subdir']['file2']['size-downloaded'], 200)
+
+    @staticmethod
+    def make_raw_files(n, dirs=10):
+        files = [{'bytesCompleted': 0, 'length': 1000,
+                  'name': 'Torrent/dir%d/sub%d/file%d' % (i % dirs, i % 3, i)}
+                 for i in range(n)]
+        fileStats = [{'bytesCompleted': 0, 'priority': 0, 'wanted': True}
+                     for i in range(n)]
+        return {'id': 1, 'name': 'Torrent', 'downloadDir': '/a/path',
+                'files': files, 'fileStats': fileStats}
+
+    def test_tree_is_created_lazily(self):
+        raw = self.make_raw_files(100)
+        ft = torrent.TorrentFileTree.create(raw)
+        self.assertEqual(ft._flatfiles.entries, [None] * 100)
+        f = ft['Torrent']['dir3']['sub0']['file3']
+        self.assertEqual(f['path-relative'], os.path.join('Torrent', 'dir3', 'sub0', 'file3'))
+        self.assertEqual(f['id'], (1, 3))
+        self.assertEqual(sum(1 for e in ft._flatfiles.entries if e is not None),
+                         len(ft['Torrent']['dir3']['sub0']))
+        self.assertEqual(sorted(f['id'] for f in ft.files),
+                         [(1, i) for i in range(100)])
+
+    def test_only_changed_files_are_updated(self):
+        raw = self.make_raw_files(100)
+        ft = torrent.TorrentFileTree.create(raw)
+        files = {f['id'].file_id: f for f in ft.files}
+        for f in files.values():
+            f['%downloaded']
+        raw['fileStats'] = [dict(fS) for fS in raw['fileStats']]
+        raw['fileStats'][5]['bytesCompleted'] = 500
+        raw['fileStats'][7]['wanted'] = False
+        self.assertEqual(ft._flatfiles.update(raw), [5, 7])
+        self.assertEqual(files[5]['%downloaded'], 50)
+        self.assertEqual(files[7]['priority'], 'off')
+        self.assertIn('%downloaded', files[6]._cache)
+        self.assertEqual({f['id'].file_id: f for f in ft.files}, files)
+
+    def test_location_changes(self):
+        raw = self.make_raw_files(10)
+        ft = torrent.TorrentFileTree.create(raw)
+        f = ft['Torrent']['dir1']['sub1']['file1']
+        raw['downloadDir'] = '/other/path'
+        self.assertTrue(ft.update(raw))
+        self.assertEqual(ft.location, '/other/path')
+        self.assertEqual(f['location'], '/other/path')
+        self.assertEqual(ft['Torrent']['dir2']['sub2']['file2']['location'], '/other/path')
+
+    def test_changed_file_list_is_not_updated(self):
+        raw = self.make_raw_files(10)
+        ft = torrent.TorrentFileTree.create(raw)
+        raw['files'] = [dict(f) for f in raw['files']]
+        raw['files'][3]['name'] = 'Torrent/renamed'
+        self.assertFalse(ft.update(raw))
+
+        raw_nometa = dict(raw, files=[], fileStats=[])
+        ft = torrent.TorrentFileTree.create(raw_nometa)
+        self.assertEqual(ft['Torrent']['id'], (-1, -1))
+        self.assertTrue(ft.update(raw_nometa))
+        self.assertFalse(ft.update(raw))
+
+    def test_torrent_keeps_updated_file_tree(self):
+        raw = dict(make_raw(1), **self.make_raw_files(10))
+        t = torrent.Torrent(raw)
+        ft = t['files']
+        fileStats = [{'bytesCompleted': 100, 'priority': 0, 'wanted': True}] * 10
+        self.assertEqual(t.update({'id': 1, 'files': raw['files'], 'fileStats': fileStats,
+                                   'downloadDir': raw['downloadDir']}),
+                         torrent.DEPENDENT_KEYS['fileStats'])
+        self.assertIs(t['files'], ft)
+        self.assertEqual(ft['Torrent']['dir0']['sub0']['file0']['size-downloaded'], 100)
+
+        # File tree is created again if the file list changes
+        files = [dict(f) for f in raw['files']]
+        files[0]['name'] = 'Torrent/renamed'
+        t.update({'id': 1, 'files': files, 'fileStats': fileStats,
+                  'downloadDir': raw['downloadDir']})
+        self.assertIsNot(t['files'], ft)
+        self.assertIn('renamed', t['files']['Torrent'])
+
+    def test_update_many_files_with_few_changes(self):
+        n = 1000
+        raw = self.make_raw_files(n, dirs=10)
+        ft = torrent.TorrentFileTree.create(raw)
+        self.assertEqual(len(tuple(ft.files)), n)
+        raw['fileStats'] = [dict(fS) for fS in raw['fileStats']]
+        for i in range(0, n, 100):
+            raw['fileStats'][i]['bytesCompleted'] = 100
+        self.assertTrue(ft.update(raw))
+        self.assertEqual(sum(f['size-downloaded'] for f in ft.files), 100 * n / 100)
+        self.assert_totals(ft['Torrent'])
+
+    def assert_totals(self, tree):
+        # Compare running totals with totals calculated from TorrentFiles
+        from stig.client.base import TorrentFileTreeBase
+        for prop in ('tid', 'size_total', 'size_downloaded', 'percent_downloaded', 'priority'):
+            self.assertEqual(getattr(tree, prop), getattr(TorrentFileTreeBase, prop).fget(tree),
+                             '%s: %s' % (tree.path, prop))
+        self.assertEqual(sorted(tree.id), sorted(TorrentFileTreeBase.id.fget(tree)))
+
+    def test_directory_totals(self):
+        raw = self.make_raw_files(60, dirs=4)
+        ft = torrent.TorrentFileTree.create(raw)
+        trees = [ft['Torrent'], ft['Torrent']['dir1'], ft['Torrent']['dir1']['sub2']]
+        for tree in trees:
+            self.assert_totals(tree)
+        self.assertEqual(trees[0].size_total, 60000)
+        self.assertEqual(trees[0].priority, 'normal')
+
+        raw['fileStats'] = [dict(fS) for fS in raw['fileStats']]
+        raw['fileStats'][5]['bytesCompleted'] = 500
+        raw['fileStats'][17]['bytesCompleted'] = 1000
+        raw['fileStats'][17]['priority'] = 1
+        self.assertTrue(ft.update(raw))
+        for tree in trees:
+            self.assert_totals(tree)
+        self.assertEqual(trees[1].size_downloaded, 1500)
+        self.assertEqual(trees[1].priority, '')
+        self.assertEqual(trees[2].priority, '')
+
+        # All files in dir1/sub2 are unwanted
+        raw['fileStats'] = [dict(fS) for fS in raw['fileStats']]
+        raw['fileStats'][17]['priority'] = 0
+        for i in (5, 17, 29, 41, 53):
+            raw['fileStats'][i]['wanted'] = False
+        self.assertTrue(ft.update(raw))
+        for tree in trees + [ft['Torrent']['dir2'], ft['Torrent']['dir1']['sub0']]:
+            self.assert_totals(tree)
+        self.assertEqual(trees[2].priority, 'off')
+        self.assertEqual(trees[1].priority, '')
+
+    def test_directory_file_ids_are_cached(self):
+        raw = self.make_raw_files(10)
+        ft = torrent.TorrentFileTree.create(raw)
+        tree = ft['Torrent']
+        self.assertIs(tree.id, tree.id)
+        self.assertEqual(tree.id, tuple((1, i) for i in range(10)))
+        self.assertEqual(hash(tree.id), hash(tuple(tree.id)))
+        self.assertEqual({tree.id: 'foo'}[tuple(tree.id)], 'foo')
+
+
+def make_raw_peer(i, progress=0.5, rate=0):
+    return {'address': '10.0.0.%d' % i, 'port': 5000 + i, 'clientName': 'Client %d' % i,
+            'progress': progress, 'rateToPeer': rate, 'rateToClient': rate}
+
+def make_raw_tracker(i, seeds=1):
+    return {'id': i, 'tier': 0, 'announce': 'http://tracker%d.example.org/announce' % i,
+            'scrape': 'http://tracker%d.example.org/scrape' % i,
+            'announceState': 1, 'scrapeState': 1, 'hasAnnounced': True, 'hasScraped': True,
+            'lastAnnounceResult': 'Success', 'lastScrapeResult': 'Success',
+            'lastAnnounceSucceeded': True, 'lastAnnounceTime': 1500000000,
+            'lastScrapeTime': 1500000000, 'nextAnnounceTime': 1500000100,
+            'nextScrapeTime': 1500000100, 'downloadCount': 1, 'leecherCount': 2,
+            'seederCount': seeds}
+
+
+class TestPeerList(unittest.TestCase):
+    def make_torrent(self, peers):
+        return torrent.Torrent(dict(make_raw(1), peers=peers))
+
+    def test_peers_are_created_on_access(self):
+        t = self.make_torrent([make_raw_peer(i) for i in range(1000)])
+        peers = t['peers']
+        self.assertEqual(len(peers), 1000)
+        self.assertEqual(peers._items.count(None), 1000)
+        self.assertEqual(peers[3]['ip'], '10.0.0.3')
+        self.assertEqual(peers[-1]['port'], 5999)
+        self.assertEqual(peers._items.count(None), 998)
+        self.assertEqual([p['ip'] for p in peers[1:3]], ['10.0.0.1', '10.0.0.2'])
+        self.assertEqual(len(tuple(peers)), 1000)
+        self.assertEqual(peers._items.count(None), 0)
+
+    def test_peers_are_reused(self):
+        raw_peers = [make_raw_peer(i) for i in range(5)]
+        t = self.make_torrent(raw_peers)
+        peers = t['peers']
+        old = tuple(peers)
+        new_raw_peers = [make_raw_peer(i, progress=0.75, rate=10) if i == 2 else dict(raw_peers[i])
+                         for i in (4, 2, 0, 1)] + [make_raw_peer(9)]
+        t.update({'id': 1, 'peers': new_raw_peers, 'name': t['name'], 'totalSize': 10240})
+        self.assertIs(t['peers'], peers)
+        self.assertIs(peers[0], old[4])
+        self.assertIs(peers[1], old[2])
+        self.assertEqual(peers[1]['%downloaded'], 75)
+        self.assertEqual(peers[1]['rate-up'], 10)
+        self.assertIs(peers[2], old[0])
+        self.assertIs(peers[3], old[1])
+        self.assertEqual(peers[4]['ip'], '10.0.0.9')
+
+    def test_peers_are_not_reused_if_torrent_changes(self):
+        t = self.make_torrent([make_raw_peer(i) for i in range(3)])
+        old = tuple(t['peers'])
+        t.update({'id': 1, 'peers': [make_raw_peer(i) for i in range(3)],
+                  'name': 'New name', 'totalSize': 10240})
+        self.assertEqual([p['tname'] for p in t['peers']], ['New name'] * 3)
+        self.assertTrue(all(new is not o for new,o in zip(t['peers'], old)))
+
+
+class TestTrackerList(unittest.TestCase):
+    def test_trackers_are_created_on_access_and_reused(self):
+        t = torrent.Torrent(dict(make_raw(1), trackerStats=[make_raw_tracker(i) for i in range(3)]))
+        trackers = t['trackers']
+        self.assertEqual(trackers._items, [None] * 3)
+        self.assertEqual(trackers[1]['url-announce'].host, 'tracker1.example.org')
+        self.assertEqual(trackers[1]['tid'], 1)
+        old = tuple(trackers)
+        t.update({'id': 1, 'name': t['name'],
+                  'trackerStats': [make_raw_tracker(0), make_raw_tracker(1, seeds=5)]})
+        self.assertIs(t['trackers'], trackers)
+        self.assertEqual(len(trackers), 2)
+        self.assertIs(trackers[0], old[0])
+        self.assertIs(trackers[1], old[1])
+        self.assertEqual(trackers[1]['count-seeds'], 5)
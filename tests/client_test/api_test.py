@@ -0,0 +1,46 @@
+import asynctest
+
+from stig.client.api import API, USER_IDLE_TIME
+
+
+class FakePoller():
+    has_callbacks = True
+
+    def __init__(self):
+        self.running = True
+        self.activities = 0
+
+    def report_activity(self):
+        self.activities += 1
+
+    async def stop(self):
+        self.running = False
+
+
+class TestReportingActivity(asynctest.ClockedTestCase):
+    async def setUp(self):
+        self.api = API()
+        self.poller = FakePoller()
+        self.api._pollers.append(self.poller)
+        await self.api.start_polling()
+
+    async def tearDown(self):
+        await self.api.stop_polling()
+
+    async def test_activity_without_any_user_input(self):
+        self.api.report_activity()
+        self.assertEqual(self.poller.activities, 1)
+        await self.advance(USER_IDLE_TIME + 1)
+        self.api.report_activity()
+        self.assertEqual(self.poller.activities, 1)
+
+    async def test_activity_after_user_input(self):
+        await self.advance(USER_IDLE_TIME + 1)
+        self.api.report_activity(user=True)
+        self.assertEqual(self.poller.activities, 1)
+        await self.advance(USER_IDLE_TIME - 1)
+        self.api.report_activity()
+        self.assertEqual(self.poller.activities, 2)
+        await self.advance(2)
+        self.api.report_activity()
+        self.assertEqual(self.poller.activities, 2)
@@ -0,0 +1,209 @@
+import random
+import unittest
+
+from stig.client.aiotransmission.api_torrent import COLUMN_KEYS, _TorrentCache
+from stig.client.columns import Columns, numpy
+from stig.client.filters import TorrentFilter
+from stig.client.sorters import TorrentSorter
+
+
+class TestColumns(unittest.TestCase):
+    use_numpy = False
+
+    def setUp(self):
+        self.columns = Columns(('a', 'b'), use_numpy=self.use_numpy)
+        self.items = {i: {'a': i, 'b': i * 10, 'name': str(i)} for i in range(1, 6)}
+        for id,item in self.items.items():
+            self.columns.add(id, item)
+
+    def values(self, key, items):
+        values = self.columns.values(key, self.columns.rows(items))
+        return None if values is None else [float(v) for v in values]
+
+    def test_values(self):
+        items = [self.items[3], self.items[1]]
+        self.assertEqual(self.values('a', items), [3, 1])
+        self.assertEqual(self.values('b', items), [30, 10])
+
+    def test_unknown_key(self):
+        self.assertIs(self.columns.column('name'), None)
+        self.assertIs(self.columns.column('foo'), None)
+
+    def test_missing_key(self):
+        self.columns.add(6, {'a': 6})
+        self.assertEqual(self.values('a', [self.items[1]]), [1])
+        self.assertIs(self.columns.column('b'), None)
+
+    def test_unknown_item(self):
+        self.assertIs(self.columns.rows([self.items[1], {'a': 1, 'b': 10}]), None)
+
+    def test_invalidate(self):
+        self.assertEqual(self.values('a', [self.items[2]]), [2])
+        self.items[2]['a'] = 200
+        self.assertEqual(self.values('a', [self.items[2]]), [2])
+        self.columns.invalidate(2, ('a',))
+        self.assertEqual(self.values('a', [self.items[2]]), [200])
+
+    def test_invalidate_all(self):
+        self.assertEqual(self.values('a', [self.items[2]]), [2])
+        self.items[2]['a'] = 200
+        self.columns.invalidate_all()
+        self.assertEqual(self.values('a', [self.items[2]]), [200])
+
+    def test_add_and_remove(self):
+        self.assertEqual(self.values('a', self.items.values()), [1, 2, 3, 4, 5])
+        self.columns.remove(2)
+        del self.items[2]
+        self.assertEqual(len(self.columns), 4)
+        self.assertEqual(self.values('a', self.items.values()), [1, 3, 4, 5])
+        self.items[6] = {'a': 6, 'b': 60}
+        self.columns.add(6, self.items[6])
+        self.assertEqual(self.values('a', self.items.values()), [1, 3, 4, 5, 6])
+        self.assertEqual(self.values('b', self.items.values()), [10, 30, 40, 50, 60])
+
+    def test_compare(self):
+        import operator
+        rows = self.columns.rows(self.items.values())
+        mask = self.columns.compare('a', rows, operator.gt, 3)
+        self.assertEqual(self.columns.mask_list(mask), [False, False, False, True, True])
+        mask = self.columns.compare('a', rows, operator.gt, 3, invert=True)
+        self.assertEqual(self.columns.mask_list(mask), [True, True, True, False, False])
+
+    def test_sort(self):
+        items = list(self.items.values())
+        random.shuffle(items)
+        if not self.use_numpy:
+            self.assertIs(self.columns.sort(items, ('a',)), None)
+            return
+        self.assertEqual(self.columns.sort(items, ('a',)), sorted(items, key=lambda i: i['a']))
+        self.assertEqual(self.columns.sort(items, ('b',), reverse=True),
+                         sorted(items, key=lambda i: i['b'], reverse=True))
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestColumnsWithNumPy(TestColumns):
+    use_numpy = True
+
+
+def make_raw(tid, rnd):
+    return {'id': tid, 'hashString': '%040x' % tid, 'name': 'Torrent %d' % (tid % 50),
+            'rateDownload': rnd.choice((0, 0, 0, 100, 2000, 50000)),
+            'rateUpload': rnd.choice((0, 0, 100, 3000, 80000)),
+            'totalSize': rnd.choice((1e3, 1e6, 5e6, 1e9)),
+            'sizeWhenDone': rnd.choice((1e3, 1e6, 5e6, 1e9)),
+            'downloadedEver': rnd.randint(0, 10) * 1e5,
+            'uploadedEver': rnd.randint(0, 10) * 1e5,
+            'percentDone': rnd.choice((0, 0.25, 0.5, 1, 1)),
+            'metadataPercentComplete': rnd.choice((0.5, 1, 1)),
+            'recheckProgress': rnd.choice((0, 0, 0.5)),
+            'uploadRatio': rnd.choice((-1, 0, 0.5, 1, 2.5)),
+            'peersConnected': rnd.randint(0, 5),
+            'trackerStats': [{'seederCount': rnd.randint(-1, 3)}],
+            'eta': rnd.choice((-1, -2, 60, 3600)),
+            'addedDate': rnd.choice((0, 1500000000, 1500000001, 1600000000)),
+            'activityDate': rnd.choice((0, 1500000000, 1600000000)),
+            'isPrivate': rnd.choice((True, False))}
+
+
+class TestColumnarFilterAndSort(unittest.TestCase):
+    """Compare results of columnar and per-object evaluation"""
+
+    FILTERS = ('uploading', 'downloading', '!downloading', 'complete', '!complete',
+               'rate-up>1k', 'rate-down<=100', 'rate-down=2000', 'rate-down!=2000',
+               'size>1M', 'size<5M', 'size>=5MB', 'downloaded<300k', 'uploaded>=1M',
+               '%downloaded>=50', '%downloaded<50', 'ratio>1', 'ratio=-1', 'ratio',
+               '!ratio', 'peers>2', 'peers', '!peers', 'seeds<1', 'id>500', 'id<=10',
+               # Filters that are combined with filters that can't be evaluated
+               # on columns
+               'uploading&private', 'private|downloading', 'private&!private|size>1M',
+               'rate-up>1k&name~1|!complete&rate-down', 'name~2&size<1M|peers=0&private',
+               'uploading|downloading|complete', 'rate-up>1k&rate-down>1k&size<1G',
+               'name=~^Torrent 1', 'name~3', 'private|complete', 'seeds>0&!private')
+
+    SORTS = (('size',), ('!size',), ('rate-up',), ('name', 'rate-down'),
+             ('%downloaded',), ('!%downloaded',), ('ratio', '!peers'),
+             ('seeds', 'uploaded', '!downloaded'), ('added',), ('!activity',),
+             ('eta',), ('id',), ('!id',), ('rate',), ('seeds', 'size'),
+             ('name', '!rate-up'))
+
+    def make_tcache(self, n=1000, use_numpy=True):
+        rnd = random.Random(n)
+        raws = [make_raw(tid, rnd) for tid in range(1, n + 1)]
+        rnd.shuffle(raws)
+        tcache = _TorrentCache(columnar=True)
+        if not use_numpy:
+            tcache._columns = Columns(COLUMN_KEYS, use_numpy=False)
+        tcache.update(raws)
+        return tcache, rnd
+
+    def assert_same_results(self, tcache):
+        torrents = tcache.get()
+        columns = tcache.columns
+        for fstr in self.FILTERS:
+            tfilter = TorrentFilter(fstr)
+            exp = [t['id'] for t in tfilter.apply(torrents)]
+            got = [t['id'] for t in tfilter.apply(torrents, columns=columns)]
+            self.assertEqual(got, exp, fstr)
+        for sortstrs in self.SORTS:
+            sorter = TorrentSorter(sortstrs)
+            exp = [t['id'] for t in sorter.apply(torrents)]
+            got = [t['id'] for t in sorter.apply(torrents, columns=columns)]
+            self.assertEqual(got, exp, sortstrs)
+
+    def test_filters_are_evaluated_on_columns(self):
+        for fstr in ('uploading', 'size>1M', 'ratio', '!peers'):
+            tfilter = TorrentFilter(fstr)
+            self.assertIsNotNone(tfilter._filterchains[0][0]._column_test, fstr)
+        for fstr in ('private', 'name~foo', 'activity<1d ago', 'hash=~1'):
+            tfilter = TorrentFilter(fstr)
+            self.assertIsNone(tfilter._filterchains[0][0]._column_test, fstr)
+
+    def check_same_results(self, use_numpy):
+        tcache, rnd = self.make_tcache(use_numpy=use_numpy)
+        self.assert_same_results(tcache)
+
+        # Change some torrents, remove some and add new ones
+        tids = [t['id'] for t in tcache.get()]
+        tcache.update([make_raw(tid, rnd) for tid in rnd.sample(tids, 100)])
+        tcache.remove(*rnd.sample(tids, 50))
+        tcache.update([make_raw(tid, rnd) for tid in range(2000, 2100)])
+        self.assert_same_results(tcache)
+
+        # Filter and sort subsets of torrents
+        torrents = list(tcache.get())
+        rnd.shuffle(torrents)
+        torrents = torrents[:300]
+        for fstr in self.FILTERS:
+            tfilter = TorrentFilter(fstr)
+            self.assertEqual(list(tfilter.apply(torrents, columns=tcache.columns)),
+                             list(tfilter.apply(torrents)), fstr)
+        for sortstrs in self.SORTS:
+            sorter = TorrentSorter(sortstrs)
+            self.assertEqual(sorter.apply(torrents, columns=tcache.columns),
+                             sorter.apply(torrents), sortstrs)
+
+    def test_same_results_without_numpy(self):
+        self.check_same_results(use_numpy=False)
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_same_results_with_numpy(self):
+        self.check_same_results(use_numpy=True)
+
+    def test_unknown_torrents_are_matched_individually(self):
+        tcache, rnd = self.make_tcache(n=100)
+        other, _ = self.make_tcache(n=10)
+        torrents = tcache.get() + other.get()
+        tfilter = TorrentFilter('size>1M')
+        self.assertEqual(list(tfilter.apply(torrents, columns=tcache.columns)),
+                         list(tfilter.apply(torrents)))
+        sorter = TorrentSorter(('size',))
+        self.assertEqual(sorter.apply(torrents, columns=tcache.columns),
+                         sorter.apply(torrents))
+
+    def test_switching_columnar_on_and_off(self):
+        tcache, rnd = self.make_tcache(n=100)
+        tcache.columnar = False
+        self.assertIs(tcache.columns, None)
+        tcache.columnar = True
+        self.assertEqual(len(tcache.columns), 100)
+        self.assert_same_results(tcache)
@@ -0,0 +1,118 @@
+import random
+import unittest
+
+from columns_test import make_raw
+from stig.client.aiotransmission.api_torrent import _TorrentCache
+from stig.client.filtercache import FilterCache
+from stig.client.filters import TorrentFilter
+
+
+class FakeFilter():
+    def __init__(self, key):
+        self.key = key
+        self.needed_keys = (key,)
+        self.matched = []
+
+    def match(self, items):
+        self.matched.extend(items)
+        return [item[self.key] > 0 for item in items]
+
+
+class TestFilterCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = FilterCache()
+        self.items = {i: {'a': i % 2, 'b': i % 3} for i in range(1, 7)}
+        for id,item in self.items.items():
+            self.cache.add(id, item)
+
+    def matches(self, f, items=None):
+        items = tuple(self.items.values()) if items is None else items
+        return self.cache.matches(f, items, f.match)
+
+    def test_results_are_reused(self):
+        f = FakeFilter('a')
+        self.assertEqual(self.matches(f), [True, False, True, False, True, False])
+        self.assertEqual(len(f.matched), 6)
+        self.assertEqual(self.matches(f), [True, False, True, False, True, False])
+        self.assertEqual(len(f.matched), 6)
+
+    def test_only_requested_items_are_matched(self):
+        f = FakeFilter('a')
+        self.assertEqual(self.matches(f, (self.items[2], self.items[3])), [False, True])
+        self.assertEqual(f.matched, [self.items[2], self.items[3]])
+
+    def test_invalidate(self):
+        fa, fb = FakeFilter('a'), FakeFilter('b')
+        self.matches(fa)
+        self.matches(fb)
+        self.items[2]['a'] = 1
+        self.cache.invalidate(2, ('a', 'c'))
+        fa.matched.clear()
+        fb.matched.clear()
+        self.assertEqual(self.matches(fa), [True, True, True, False, True, False])
+        self.assertEqual(self.matches(fb), [True, True, False, True, True, False])
+        self.assertEqual(fa.matched, [self.items[2]])
+        self.assertEqual(fb.matched, [])
+
+    def test_invalidate_all(self):
+        f = FakeFilter('a')
+        self.matches(f)
+        self.cache.invalidate_all()
+        self.matches(f)
+        self.assertEqual(len(f.matched), 12)
+
+    def test_add_and_remove(self):
+        f = FakeFilter('a')
+        self.matches(f)
+        self.cache.remove(2)
+        del self.items[2]
+        self.items[7] = {'a': 1, 'b': 1}
+        self.cache.add(7, self.items[7])
+        f.matched.clear()
+        self.assertEqual(self.matches(f), [True, True, False, True, False, True])
+        self.assertEqual(f.matched, [self.items[7]])
+        self.assertEqual(len(self.cache), 6)
+
+    def test_unknown_item(self):
+        f = FakeFilter('a')
+        self.assertIs(self.matches(f, (self.items[1], {'a': 1})), None)
+
+    def test_max_filters(self):
+        self.cache.max_filters = 2
+        filters = [FakeFilter('a'), FakeFilter('b'), FakeFilter('a')]
+        for f in filters:
+            self.matches(f)
+        self.assertEqual(list(self.cache._results), filters[1:])
+
+
+class TestFilteringWithCache(unittest.TestCase):
+    FILTERS = ('uploading', 'downloading&!complete', 'size>1M|name~3', 'private&ratio>1',
+               'name=~^Torrent 1&rate-up>1k', 'added<1d ago')
+
+    def make_tcache(self, n, rnd):
+        tcache = _TorrentCache()
+        raws = [make_raw(tid, rnd) for tid in range(1, n + 1)]
+        tcache.update(raws)
+        return tcache
+
+    def test_same_results_as_without_cache(self):
+        rnd = random.Random(0)
+        tcache = self.make_tcache(1000, rnd)
+        for _ in range(3):
+            torrents = tcache.get()
+            for fstr in self.FILTERS:
+                tfilter = TorrentFilter(fstr)
+                self.assertEqual(list(tfilter.apply(torrents, cache=tcache.filter_cache)),
+                                 list(tfilter.apply(torrents)), fstr)
+            tids = [t['id'] for t in torrents]
+            tcache.update([make_raw(tid, rnd) for tid in rnd.sample(tids, 100)])
+            tcache.remove(*rnd.sample(tids, 20))
+            tcache.update([make_raw(tid, rnd) for tid in range(len(tids) + 1, len(tids) + 21)])
+
+    def test_volatile_filters_are_not_cached(self):
+        rnd = random.Random(0)
+        tcache = self.make_tcache(10, rnd)
+        list(TorrentFilter('added<1d ago').apply(tcache.get(), cache=tcache.filter_cache))
+        self.assertEqual(len(tcache.filter_cache._results), 0)
+        list(TorrentFilter('private').apply(tcache.get(), cache=tcache.filter_cache))
+        self.assertEqual(len(tcache.filter_cache._results), 1)
@@ -474,6 +474,32 @@ class TestFilterChain_parser(unittest.TestCase):
         self.assertEqual(self.f('b1|b2&c~foo|ci~bar'), self.f('c~foo&b2|ci~bar|b1'))
         self.assertNotEqual(self.f('b1|b2&c~foo|ci~bar'), self.f('c~foo&b2|b1'))
 
+    def test_compiled_filters(self):
+        calls = []
+
+        class FooFilter(Filter):
+            BOOLEAN_FILTERS = {'slow': BoolFilterSpec(lambda i: calls.append(i) or True, cost=10),
+                               'everything': BoolFilterSpec(None)}
+            COMPARATIVE_FILTERS = {'n': CmpFilterSpec(value_type=int, needed_keys=('n',)),
+                                   's': CmpFilterSpec(value_type=str, needed_keys=('s',))}
+
+        class FooFilterChain(FilterChain):
+            filterclass = FooFilter
+
+        namespace = {}
+        self.assertEqual(FooFilter('n>5').source(namespace), "(obj['n'] > _0)")
+        self.assertEqual(FooFilter('s!~x').source(namespace), "not (_1 in obj['s'])")
+        self.assertEqual(FooFilter('!everything').source(namespace), 'not (True)')
+        self.assertEqual(namespace, {'_0': 5, '_1': 'x'})
+
+        items = ({'n': 1, 's': 'foo'}, {'n': 10, 's': 'bar'}, {'n': 20, 's': 'baz'})
+        fc = FooFilterChain('slow&n>5&s=~^ba')
+        self.assertEqual(list(fc.apply(items)), [items[1], items[2]])
+        self.assertEqual(calls, [items[1], items[2]])
+        self.assertIs(fc.match(items[0]), False)
+        self.assertIs(fc.match(items[1]), True)
+        self.assertEqual(list(FooFilterChain('s~z|n<5&slow').apply(items)), [items[0], items[2]])
+
     def test_combined_needed_keys(self):
         f1 = self.f('b1')
         f2 = self.f('b2')
@@ -482,6 +508,15 @@ class TestFilterChain_parser(unittest.TestCase):
         self.assertEqual(set((f1 | f2).needed_keys), {'a', 'b', 'c'})
         self.assertEqual(set((f1 & f2).needed_keys), {'a', 'b', 'c'})
 
+    def test_relaxed(self):
+        f = self.f('b1&b2|c~foo&!b1')
+        self.assertIs(f.relaxed(('a', 'b', 'c')), f)
+        self.assertEqual(f.relaxed(('a', 'b')), self.f('b1|!b1'))
+        self.assertEqual(f.relaxed(('a', 'c')), self.f())
+        f = self.f('b1&c~foo|b2&c~bar')
+        self.assertEqual(f.relaxed(('a', 'c')), self.f('c~foo|c~bar'))
+        self.assertEqual(self.f().relaxed(()), self.f())
+
     def test_combining_filters_with_or_operator(self):
         f1 = self.f('b1') | self.f('c~foo')
         self.assertEqual(f1, self.f('b1|c~foo'))
@@ -1,6 +1,8 @@
+import random
 import unittest
 
 from filter_helpers import HelpersMixin
+from stig.client.filters.torrent import TorrentFilter as TorrentFilterChain
 from stig.client.filters.torrent import _SingleFilter as TorrentFilter
 from stig.client.ttypes import Status
 
@@ -31,18 +33,18 @@ class TestTorrentFilter(unittest.TestCase, HelpersMixin):
     def test_stopped(self):
         self.check_bool_filter(TorrentFilter,
                                filter_names=('stopped', 'stp'),
-                               items=({'id': 1, 'status': (Status.STOPPED,)},
-                                      {'id': 2, 'status': (Status.IDLE, Status.SEED)},
-                                      {'id': 3, 'status': (Status.UPLOAD, Status.SEED)}),
+                               items=({'id': 1, 'status': Status((Status.STOPPED,))},
+                                      {'id': 2, 'status': Status((Status.IDLE, Status.SEED))},
+                                      {'id': 3, 'status': Status((Status.UPLOAD, Status.SEED))}),
                                test_cases=(('{name}', (1,)),
                                            ('!{name}', (2, 3))))
 
     def test_active(self):
         self.check_bool_filter(TorrentFilter,
                                filter_names=('active', 'act'),
-                               items=({'id': 1, 'status': (Status.STOPPED,)},
-                                      {'id': 2, 'status': (Status.CONNECTED, Status.IDLE, Status.SEED)},
-                                      {'id': 3, 'status': (Status.VERIFY,)}),
+                               items=({'id': 1, 'status': Status((Status.STOPPED,))},
+                                      {'id': 2, 'status': Status((Status.CONNECTED, Status.IDLE, Status.SEED))},
+                                      {'id': 3, 'status': Status((Status.VERIFY,))}),
                                test_cases=(('{name}', (2, 3)),
                                            ('!{name}', (1,))))
 
@@ -67,49 +69,49 @@ class TestTorrentFilter(unittest.TestCase, HelpersMixin):
     def test_leeching(self):
         self.check_bool_filter(TorrentFilter,
                                filter_names=('leeching', 'lcg'),
-                               items=({'id': 1, '%downloaded': 0, 'status': (Status.STOPPED,)},
-                                      {'id': 2, '%downloaded': 50, 'status': (Status.IDLE,)},
-                                      {'id': 3, '%downloaded': 50, 'status': (Status.CONNECTED, Status.DOWNLOAD)},
-                                      {'id': 4, '%downloaded': 100, 'status': (Status.SEED, Status.IDLE)}),
+                               items=({'id': 1, '%downloaded': 0, 'status': Status((Status.STOPPED,))},
+                                      {'id': 2, '%downloaded': 50, 'status': Status((Status.IDLE,))},
+                                      {'id': 3, '%downloaded': 50, 'status': Status((Status.CONNECTED, Status.DOWNLOAD))},
+                                      {'id': 4, '%downloaded': 100, 'status': Status((Status.SEED, Status.IDLE))}),
                                test_cases=(('{name}', (2, 3)),
                                            ('!{name}', (1, 4))))
 
     def test_seeding(self):
         self.check_bool_filter(TorrentFilter,
                                filter_names=('seeding', 'sdg'),
-                               items=({'id': 1, '%downloaded': 100, 'status': (Status.STOPPED,)},
-                                      {'id': 2, '%downloaded': 50, 'status': (Status.IDLE,)},
-                                      {'id': 3, '%downloaded': 50, 'status': (Status.CONNECTED, Status.DOWNLOAD)},
-                                      {'id': 4, '%downloaded': 100, 'status': (Status.SEED, Status.IDLE)}),
+                               items=({'id': 1, '%downloaded': 100, 'status': Status((Status.STOPPED,))},
+                                      {'id': 2, '%downloaded': 50, 'status': Status((Status.IDLE,))},
+                                      {'id': 3, '%downloaded': 50, 'status': Status((Status.CONNECTED, Status.DOWNLOAD))},
+                                      {'id': 4, '%downloaded': 100, 'status': Status((Status.SEED, Status.IDLE))}),
                                test_cases=(('{name}', (4,)),
                                            ('!{name}', (1, 2, 3))))
 
     def test_verifying(self):
         self.check_bool_filter(TorrentFilter,
                                filter_names=('verifying', 'vfg'),
-                               items=({'id': 1, 'status': (Status.STOPPED,)},
-                                      {'id': 2, 'status': (Status.IDLE,)},
-                                      {'id': 3, 'status': (Status.VERIFY)}),
+                               items=({'id': 1, 'status': Status((Status.STOPPED,))},
+                                      {'id': 2, 'status': Status((Status.IDLE,))},
+                                      {'id': 3, 'status': Status((Status.VERIFY,))}),
                                test_cases=(('{name}', (3,)),
                                            ('!{name}', (1, 2))))
 
     def test_idle(self):
         self.check_bool_filter(TorrentFilter,
                                filter_names=('idle',),
-                               items=({'id': 1, 'status': (Status.STOPPED,)},
-                                      {'id': 2, 'status': (Status.IDLE,)},
-                                      {'id': 3, 'status': (Status.VERIFY)},
-                                      {'id': 4, 'status': (Status.DOWNLOAD)}),
+                               items=({'id': 1, 'status': Status((Status.STOPPED,))},
+                                      {'id': 2, 'status': Status((Status.IDLE,))},
+                                      {'id': 3, 'status': Status((Status.VERIFY,))},
+                                      {'id': 4, 'status': Status((Status.DOWNLOAD,))}),
                                test_cases=(('{name}', (2,)),
                                            ('!{name}', (1, 3, 4))))
 
     def test_isolated(self):
         self.check_bool_filter(TorrentFilter,
                                filter_names=('isolated', 'isl'),
-                               items=({'id': 1, 'status': (Status.STOPPED, Status.SEED)},
-                                      {'id': 2, 'status': (Status.VERIFY)},
-                                      {'id': 3, 'status': (Status.IDLE, Status.ISOLATED)},
-                                      {'id': 4, 'status': (Status.DOWNLOAD)}),
+                               items=({'id': 1, 'status': Status((Status.STOPPED, Status.SEED))},
+                                      {'id': 2, 'status': Status((Status.VERIFY,))},
+                                      {'id': 3, 'status': Status((Status.IDLE, Status.ISOLATED))},
+                                      {'id': 4, 'status': Status((Status.DOWNLOAD,))}),
                                test_cases=(('{name}', (3,)),
                                            ('!{name}', (1, 2, 4))))
 
@@ -272,3 +274,42 @@ class TestTorrentFilter(unittest.TestCase, HelpersMixin):
         self.check_timestamp_filter(TorrentFilter, default_sign=-1,
                                     filter_names=('completed', 'tcmp'),
                                     key='time-completed')
+
+
+def make_torrent(tid, rnd):
+    return {'id': tid, 'name': 'Torrent %d' % (tid % 50), 'hash': '%040x' % tid,
+            'rate-up': rnd.choice((0, 0, 0, 100, 3000, 80000)),
+            'rate-down': rnd.choice((0, 0, 0, 100, 2000, 50000)),
+            'size-final': rnd.choice((1e3, 1e6, 5e6, 1e9)),
+            '%downloaded': rnd.choice((0, 25, 50, 100, 100)),
+            'peers-connected': rnd.randint(0, 5),
+            'peers-seeding': rnd.randint(-1, 3),
+            'private': rnd.choice((True, False)),
+            'status': Status((rnd.choice((Status.STOPPED, Status.IDLE, Status.UPLOAD)),))}
+
+
+class TestCompiledTorrentFilter(unittest.TestCase):
+    FILTERS = ('name~1', 'name=~^Torrent 1', 'size>1M', 'complete', 'private',
+               'name~foo&size>1M', 'uploading|downloading&!complete',
+               'name=~^Torrent 1&rate-up>1k', '!private&peers>2|seeds<1',
+               'stopped|name~3&!complete|rate-down=2000', '!name~2&!stopped&size<=1M')
+
+    def interpreted_match(self, tfilter, torrent):
+        return any(all(f.match(torrent) for f in AND_chain)
+                   for AND_chain in tfilter._filterchains)
+
+    def test_same_results_as_individual_filters(self):
+        rnd = random.Random(1)
+        torrents = [make_torrent(tid, rnd) for tid in range(1, 2001)]
+        for fstr in self.FILTERS:
+            tfilter = TorrentFilterChain(fstr)
+            exp = [t for t in torrents if self.interpreted_match(tfilter, t)]
+            self.assertEqual(list(tfilter.apply(torrents)), exp, fstr)
+            self.assertEqual([t for t in torrents if tfilter.match(t)], exp, fstr)
+
+    def test_cheap_filters_are_evaluated_first(self):
+        # 'tracker' would raise TypeError if it was evaluated
+        torrent = {'name': 'foo', 'size-final': 1000, 'trackers': None}
+        tfilter = TorrentFilterChain('tracker~foo&name=~fo&size>1M')
+        self.assertFalse(tfilter.match(torrent))
+        self.assertEqual(list(tfilter.apply((torrent,))), [])
@@ -0,0 +1,151 @@
+import unittest
+
+from stig.client import ttypes
+from stig.client.aiotransmission.torrent import PeerList
+from stig.client.peerrates import PeerRateEstimator
+
+
+class TestPeerRateEstimator(unittest.TestCase):
+    def test_first_progress_change_is_not_used(self):
+        est = PeerRateEstimator()
+        self.assertEqual(est.sample('p', 0.1, 1000, now=0), 0)
+        self.assertEqual(est.sample('p', 0.2, 1000, now=10), 0)
+        self.assertAlmostEqual(est.sample('p', 0.3, 1000, now=20), 10)
+
+    def test_unchanged_progress_keeps_rate(self):
+        est = PeerRateEstimator()
+        est.sample('p', 0.1, 1000, now=0)
+        est.sample('p', 0.2, 1000, now=10)
+        est.sample('p', 0.3, 1000, now=20)
+        self.assertAlmostEqual(est.sample('p', 0.3, 1000, now=25), 10)
+        self.assertAlmostEqual(est.rate('p'), 10)
+
+    def test_decreasing_progress(self):
+        est = PeerRateEstimator()
+        est.sample('p', 0.5, 1000, now=0)
+        est.sample('p', 0.6, 1000, now=10)
+        self.assertEqual(est.sample('p', 0.1, 1000, now=20), 0)
+        self.assertAlmostEqual(est.sample('p', 0.2, 1000, now=30), 10)
+
+    def test_moving_average(self):
+        est = PeerRateEstimator(time_constant=60)
+        now, progress = 0, 0
+        for _ in range(50):
+            now += 10
+            progress += 0.01
+            rate = est.sample('p', progress, 10000, now=now)
+        self.assertAlmostEqual(rate, 10)
+
+        # Rate changes to 20 B/s; the estimate approaches it gradually
+        rates = []
+        for _ in range(50):
+            now += 10
+            progress += 0.02
+            rates.append(est.sample('p', progress, 10000, now=now))
+        self.assertTrue(10 < rates[0] < 20)
+        self.assertEqual(rates, sorted(rates))
+        self.assertAlmostEqual(rates[-1], 20, places=2)
+
+    def test_max_peers(self):
+        est = PeerRateEstimator(max_peers=3)
+        for peer in ('a', 'b', 'c'):
+            est.sample(peer, 0.1, 1000, now=0)
+        est.sample('a', 0.1, 1000, now=1)
+        est.sample('d', 0.1, 1000, now=2)
+        self.assertEqual(len(est), 3)
+        self.assertEqual(set(est._peers), {'a', 'c', 'd'})
+        self.assertEqual(est.stats['evicted'], 1)
+
+        est.max_peers = 1
+        self.assertEqual(set(est._peers), {'d'})
+
+    def test_max_age(self):
+        est = PeerRateEstimator(max_age=100)
+        est.sample('a', 0.1, 1000, now=0)
+        est.sample('b', 0.1, 1000, now=50)
+        est.sample('c', 0.1, 1000, now=120)
+        self.assertEqual(set(est._peers), {'b', 'c'})
+        self.assertEqual(est.stats['expired'], 1)
+
+    def test_touching_peers_prevents_expiry(self):
+        est = PeerRateEstimator(max_age=100)
+        est.sample('a', 0.1, 1000, now=0)
+        est.sample('b', 0.1, 1000, now=10)
+        est.touch('a', now=90)
+        est.touch('c', now=90)
+        est.sample('b', 0.1, 1000, now=150)
+        self.assertEqual(set(est._peers), {'a', 'b'})
+        est.sample('b', 0.1, 1000, now=200)
+        self.assertEqual(set(est._peers), {'b'})
+
+    def test_memory_is_bounded(self):
+        est = PeerRateEstimator(max_peers=1000)
+        for i in range(100000):
+            est.sample((1, '10.0.%d.%d' % (i // 256, i % 256), 1234), 0.1, 1000, now=i)
+        stats = est.stats
+        self.assertEqual(stats['peers'], 1000)
+        self.assertEqual(stats['evicted'], 99000)
+        self.assertEqual(stats['samples'], 100000)
+        self.assertLess(stats['memory'], 1000 * 1000)
+
+    def test_error_stats(self):
+        est = PeerRateEstimator()
+        self.assertIs(est.stats['error'], None)
+        est.sample('p', 0.1, 1000, now=0)
+        est.sample('p', 0.2, 1000, now=10)
+        est.sample('p', 0.3, 1000, now=20)
+        est.sample('p', 0.5, 1000, now=30)
+        self.assertAlmostEqual(est.stats['error'], 0.5)
+        self.assertEqual(est.stats['rates'], 1)
+
+
+class TestTorrentPeerRateEstimate(unittest.TestCase):
+    def setUp(self):
+        self.orig_estimator = ttypes.TorrentPeer.rate_estimator
+        ttypes.TorrentPeer.rate_estimator = PeerRateEstimator()
+
+    def tearDown(self):
+        ttypes.TorrentPeer.rate_estimator = self.orig_estimator
+
+    def make_peer(self, progress):
+        return ttypes.TorrentPeer(tid=1, tname='foo', tsize=1e6, ip='1.2.3.4', port=123,
+                                  client='bar', downloaded=progress * 1e6,
+                                  pdownloaded=progress * 100, rate_up=0, rate_down=0)
+
+    def test_rate_and_eta(self):
+        peer = self.make_peer(0.1)
+        self.assertEqual(peer['rate-est'], 0)
+        self.assertEqual(peer['eta'], ttypes.Timedelta.UNKNOWN)
+
+        estimator = ttypes.TorrentPeer.rate_estimator
+        peer_id = (1, '1.2.3.4', 123)
+        peer.update(client='bar', downloaded=0.2 * 1e6, pdownloaded=20, rate_up=0, rate_down=0)
+        self.assertEqual(peer['rate-est'], 0)
+        estimator._peers[peer_id][1] -= 10
+        peer.update(client='bar', downloaded=0.3 * 1e6, pdownloaded=30, rate_up=0, rate_down=0)
+        self.assertAlmostEqual(peer['rate-est'], 10000, delta=100)
+        self.assertAlmostEqual(peer['eta'], 70, delta=1)
+
+    def test_complete_peer(self):
+        peer = self.make_peer(1)
+        self.assertEqual(peer['rate-est'], 0)
+        self.assertEqual(peer['eta'], ttypes.Timedelta.NOT_APPLICABLE)
+        self.assertEqual(len(ttypes.TorrentPeer.rate_estimator), 0)
+
+    def test_unchanged_peers_do_not_expire(self):
+        estimator = ttypes.TorrentPeer.rate_estimator = PeerRateEstimator(max_age=100)
+
+        def raw_torrent(*progresses):
+            return {'id': 1, 'name': 'foo', 'totalSize': 1e6,
+                    'peers': [{'address': '1.2.3.4', 'port': port, 'clientName': 'bar',
+                               'progress': progress, 'rateToPeer': 0, 'rateToClient': 0}
+                              for port,progress in enumerate(progresses)]}
+
+        peers = PeerList(raw_torrent(0.1, 0.1))
+        tuple(peers)
+        for data in estimator._peers.values():
+            data[0] -= 1000
+        # Only the second peer has changed and is sampled again
+        peers.update(raw_torrent(0.1, 0.2))
+        tuple(peers)
+        self.assertEqual(set(estimator._peers), {(1, '1.2.3.4', 0), (1, '1.2.3.4', 1)})
@@ -217,3 +217,55 @@ class TestRequestPoller(asynctest.ClockedTestCase):
         await self.advance(0)
         self.assertEqual(self.mock_request_calls, 3)
         await rp.stop()
+
+    async def test_max_interval(self):
+        times = []
+
+        async def request():
+            times.append(self.loop.time())
+
+        rp = self.make_poller(request, interval=2, max_interval=5)
+        await rp.start()
+        await self.advance(20)
+        self.assertEqual([b - a for a,b in zip(times, times[1:])], [3, 4.5, 5, 5])
+
+        # Activity resets the interval and polls immediately
+        rp.report_activity()
+        await self.advance(0)
+        self.assertEqual(times[-1], 20)
+        await self.advance(10)
+        self.assertEqual(times[-4:], [20, 22, 25, 29.5])
+
+        # Polling manually also resets the interval
+        rp.poll()
+        await self.advance(0)
+        self.assertEqual(times[-1], 30)
+        await self.advance(2)
+        self.assertEqual(times[-1], 32)
+        await rp.stop()
+
+    async def test_max_interval_with_slow_requests(self):
+        times = []
+
+        async def request():
+            times.append(self.loop.time())
+            await asyncio.sleep(2)
+
+        # Delay is increased to 4 times the request time instead of 1.5 times
+        # the interval
+        rp = self.make_poller(request, interval=1, max_interval=60)
+        await rp.start()
+        await self.advance(10)
+        self.assertEqual(times, [0, 10])
+        await rp.stop()
+
+    async def test_no_max_interval(self):
+        rp = self.make_poller(self.mock_request, interval=2, max_interval=None)
+        await rp.start()
+        await self.advance(0)
+        await self.advance(10)
+        self.assertEqual(self.mock_request_calls, 6)
+        rp.max_interval = 1
+        await self.advance(10)
+        self.assertEqual(self.mock_request_calls, 11)
+        await rp.stop()
@@ -174,3 +174,35 @@ class TestSorterBase(unittest.TestCase):
 
         srted = self.sortercls(('!bar',)).apply(items, item_getter=item_getter)
         self.assertEqual(tuple(obj.id for obj in srted), (1, 2, 3))
+
+    def test_insert(self):
+        rnd = random.Random(0)
+        for sortstrings in (('foo',), ('!foo',), ('foo', 'bar'), ('!foo', 'bar'), ('foo', '!bar')):
+            sorter = self.sortercls(sortstrings)
+            items = [{'id': i, 'foo': rnd.randint(0, 5), 'bar': rnd.randint(0, 5)}
+                     for i in range(100)]
+            new_items = items[-10:]
+            sorted_items = sorter.apply(items[:-10])
+            sorter.insert(sorted_items, new_items)
+            exp = sorter.apply(items)
+            self.assertEqual([(i['foo'], i['bar']) for i in sorted_items],
+                             [(i['foo'], i['bar']) for i in exp], sortstrings)
+            self.assertEqual(sorted(i['id'] for i in sorted_items), list(range(100)))
+
+    def test_insert_after_equal_items(self):
+        items = [{'id': 1, 'foo': 'a', 'bar': 'x'},
+                 {'id': 2, 'foo': 'b', 'bar': 'x'},
+                 {'id': 3, 'foo': 'c', 'bar': 'x'}]
+        self.sortercls(('bar',)).insert(items, [{'id': 4, 'foo': 'd', 'bar': 'x'}])
+        self.assertEqual(tuple(item['id'] for item in items), (1, 2, 3, 4))
+        items.reverse()
+        self.sortercls(('!foo',)).insert(items, [{'id': 5, 'foo': 'b', 'bar': 'x'}])
+        self.assertEqual(tuple(item['id'] for item in items), (4, 3, 2, 5, 1))
+
+    def test_insert_item_getter(self):
+        from types import SimpleNamespace
+        items = [SimpleNamespace(id=3, values={'foo': 'c', 'bar': 'x'}),
+                 SimpleNamespace(id=1, values={'foo': 'a', 'bar': 'z'})]
+        self.sortercls(('!foo',)).insert(items, [SimpleNamespace(id=2, values={'foo': 'b', 'bar': 'y'})],
+                                         item_getter=lambda obj: obj.values)
+        self.assertEqual(tuple(obj.id for obj in items), (3, 2, 1))
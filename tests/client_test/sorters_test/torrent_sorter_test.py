@@ -1,8 +1,11 @@
 import random
+import unittest
 from types import SimpleNamespace
 
 from sorter_helpers import TestSorterBase
+from stig.client.aiotransmission.torrent import Torrent
 from stig.client.sorters import TorrentSorter
+from stig.client.ttypes import Status
 
 
 class MockTracker(dict):
@@ -63,9 +66,9 @@ class TestTorrentSorter(TestSorterBase):
         self.assert_sorted_ids('path', items, (3, 1, 2))
 
     def test_status(self):
-        items = [{'id': 1, 'name': 'foo', 'status': 'a'},
-                 {'id': 2, 'name': 'bar', 'status': 'c'},
-                 {'id': 3, 'name': 'baz', 'status': 'b'}]
+        items = [{'id': 1, 'name': 'foo', 'status': Status((Status.UPLOAD, Status.CONNECTED))},
+                 {'id': 2, 'name': 'bar', 'status': Status((Status.SEED,))},
+                 {'id': 3, 'name': 'baz', 'status': Status((Status.IDLE,))}]
         self.assert_sorted_ids('status', items, (1, 3, 2))
 
     def test_error(self):
@@ -193,3 +196,70 @@ class TestTorrentSorter(TestSorterBase):
                  {'id': 2, 'name': 'bar', 'time-completed': 28},
                  {'id': 3, 'name': 'baz', 'time-completed': 84}]
         self.assert_sorted_ids('completed', items, (2, 1, 3))
+
+
+def multipass_sort(sorter, items, item_getter=lambda item: item):
+    # Sort the way sorters did before they were combined into a single pass:
+    # One full sort for each key function of each sort order
+    for keyfunc,reverse,_ in sorter._levels:
+        items = sorted(items, key=lambda item: keyfunc(item_getter(item)), reverse=reverse)
+    return items
+
+
+def make_torrent(tid, rnd):
+    return {'id': tid, 'name': rnd.choice(('foo', 'Foo', 'bar', 'baz', 'Bar')),
+            'path': rnd.choice(('/a', '/b')),
+            'size-final': rnd.choice((1e3, 1e6, 1e9)),
+            'size-uploaded': rnd.choice((0, 1e3, 1e6)),
+            'size-downloaded': rnd.choice((0, 1e3, 1e6)),
+            '%downloaded': rnd.choice((0, 50, 100)),
+            '%metadata': rnd.choice((50, 100)),
+            '%verified': rnd.choice((0, 50)),
+            'peers-seeding': rnd.randint(-1, 2),
+            'rate-up': rnd.choice((0, 0, 100, 2000)),
+            'rate-down': rnd.choice((0, 0, 100, 2000)),
+            'ratio': rnd.choice((-1, 0, 0.5, 2)),
+            'status': Status((rnd.choice((Status.IDLE, Status.UPLOAD, Status.STOPPED)),)),
+            'trackers': rnd.choice(((), (MockTracker('x.org'),), (MockTracker('y.org'),)))}
+
+
+class TestSinglePassSorting(unittest.TestCase):
+    SORTS = (('name',), ('!name',), ('size',), ('!size',), ('tracker', '!size', 'name'),
+             ('!tracker', '!size', 'name'), ('%downloaded',), ('!%downloaded', 'status'),
+             ('status', '!seeds', 'ratio', '!rate'), ('!path', '!uploaded', '!downloaded'),
+             ('rate-up', 'rate-down', '!id'), ('!name', '!seeds', 'tracker'))
+
+    def test_same_result_as_multipass_sort(self):
+        rnd = random.Random(0)
+        torrents = [make_torrent(tid, rnd) for tid in range(1, 501)]
+        for sortstrs in self.SORTS:
+            sorter = TorrentSorter(sortstrs)
+            self.assertEqual([t['id'] for t in sorter.apply(torrents)],
+                             [t['id'] for t in multipass_sort(sorter, torrents)], sortstrs)
+
+            items = list(torrents)
+            sorter.apply(items, inplace=True)
+            self.assertEqual(items, multipass_sort(sorter, torrents), sortstrs)
+
+
+class TestInsertingChangedTorrents(unittest.TestCase):
+    def test_changed_torrents_are_moved_to_sorted_position(self):
+        rnd = random.Random(0)
+        torrents = [Torrent({'id': tid, 'name': 'Torrent %d' % rnd.randint(1, 100),
+                             'sizeWhenDone': rnd.choice((1e3, 1e6, 5e6, 1e9)),
+                             'rateDownload': rnd.choice((0, 0, 100, 2000))})
+                    for tid in range(1, 501)]
+        sorter = TorrentSorter(('!rate-down', 'name'))
+        sorted_torrents = sorter.apply(torrents)
+
+        # Five torrents change their rates
+        changed = rnd.sample(sorted_torrents, 5)
+        for t in changed:
+            t.update({'id': t['id'], 'rateDownload': rnd.choice((0, 50, 5000))})
+        exp = sorter.apply(sorted_torrents)
+
+        changed_ids = {id(t) for t in changed}
+        sorted_torrents = [t for t in sorted_torrents if id(t) not in changed_ids]
+        sorter.insert(sorted_torrents, changed)
+        self.assertEqual([(t['rate-down'], t['name']) for t in sorted_torrents],
+                         [(t['rate-down'], t['name']) for t in exp])
@@ -3,7 +3,9 @@ from types import SimpleNamespace
 
 import asynctest
 
+from stig.client.aiotransmission.api_torrent import TorrentChanges
 from stig.client.aiotransmission.torrent import Torrent
+from stig.client.errors import ClientError
 from stig.client.filters.torrent import TorrentFilter
 from stig.client.trequestpool import TorrentRequestPool
 from stig.client.utils import Response
@@ -21,29 +23,45 @@ class FakeTorrentAPI():
         self.arg_torrents = None
         self.arg_keys = None
         self.exc = None
+        self.arg_recently_active = None
         self.tlist = FAKE_TORRENTS
+        self.changes = TorrentChanges()
         self.delay = 0
+        self.columns = None
+        self.filter_cache = None
 
-    async def torrents(self, torrents=None, keys='ALL'):
+    async def torrents(self, torrents=None, keys='ALL', recently_active=False):
         if self.delay:
             await asyncio.sleep(self.delay)
         self.calls += 1
         self.arg_torrents = torrents
         self.arg_keys = keys
+        self.arg_recently_active = recently_active
         if self.exc is None:
             return Response(success=False, torrents=self.tlist)
         else:
             raise self.exc
 
+    def cached_torrents(self, keys, tfilter=None):
+        self.arg_keys = keys
+        return self.tlist if tfilter is None else tuple(tfilter.apply(self.tlist))
+
+    def pop_changes(self):
+        changes = self.changes
+        self.changes = TorrentChanges()
+        return changes
+
 
 class FakeCallback():
     def __init__(self):
         self.calls = 0
         self.args = None
+        self.changes = None
 
-    def __call__(self, torrents):
+    def __call__(self, torrents, changes):
         self.calls += 1
         self.args = torrents
+        self.changes = changes
 
 
 class Subscriber():
@@ -231,3 +249,221 @@ class TestTorrentRequestPool(asynctest.ClockedTestCase):
         self.assertEqual(self.api.calls, apicalls + 1)
 
         await self.rp.stop()
+
+    async def test_requesting_recently_active_torrents(self):
+        self.rp.full_interval = 3
+        await self.rp.start()
+
+        foo = Subscriber('name~foo', 'name', 'rate-down')
+        baz = Subscriber('private', 'id', 'size-total')
+        self.rp.register('foo', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+        self.rp.register('baz', baz.callback, keys=baz.keys, tfilter=baz.tfilter)
+        await self.advance(0)
+
+        # Filtering is done locally, so all torrents are requested
+        self.assert_api_request(calls=1, keys=(foo + baz).keys_needed)
+        self.assertEqual(self.api.arg_torrents, None)
+        self.assertEqual(self.api.arg_recently_active, False)
+        self.assertEqual(tuple(foo.callback.args), (FAKE_TORRENTS[0],))
+        self.assertEqual(tuple(baz.callback.args), (FAKE_TORRENTS[1], FAKE_TORRENTS[2]))
+
+        for calls in (2, 3):
+            await self.advance(self.rp.interval)
+            self.assert_api_request(calls=calls)
+            self.assertEqual(self.api.arg_recently_active, True)
+            self.assertEqual(tuple(foo.callback.args), (FAKE_TORRENTS[0],))
+            self.assertEqual(tuple(baz.callback.args), (FAKE_TORRENTS[1], FAKE_TORRENTS[2]))
+
+        await self.advance(self.rp.interval)
+        self.assert_api_request(calls=4)
+        self.assertEqual(self.api.arg_recently_active, False)
+
+        await self.rp.stop()
+
+    async def test_callbacks_get_changes(self):
+        await self.rp.start()
+        foo = Subscriber('name~foo', 'name')
+        bar = Subscriber('name~bar', 'name')
+        self.rp.register('foo', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+        self.rp.register('bar', bar.callback, keys=bar.keys, tfilter=bar.tfilter)
+
+        self.api.changes.add(1)
+        self.api.changes.change(2, ('name',))
+        await self.advance(0)
+        for cb in (foo.callback, bar.callback):
+            self.assertEqual(cb.changes.added, {1})
+            self.assertEqual(cb.changes.changed, {2: {'name'}})
+            self.assertEqual(cb.changes.removed, set())
+
+        # Changes are only reported once
+        await self.advance(self.rp.interval)
+        for cb in (foo.callback, bar.callback):
+            self.assertFalse(cb.changes)
+
+        await self.rp.stop()
+
+    async def test_requesting_torrents_by_id(self):
+        await self.rp.start()
+        foo = Subscriber((1,), 'name')
+        bar = Subscriber([3, 1], 'rate-up')
+        self.rp.register('foo', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+        self.rp.register('bar', bar.callback, keys=bar.keys, tfilter=bar.tfilter)
+        await self.advance(0)
+        self.assert_api_request(calls=1, tfilter=(1, 3), keys=('id', 'name', 'rate-up'))
+        self.assertEqual(tuple(foo.callback.args), (FAKE_TORRENTS[0],))
+        self.assertEqual(tuple(bar.callback.args), (FAKE_TORRENTS[0], FAKE_TORRENTS[2]))
+
+        # IDs are combined with other filters
+        baz = Subscriber('name~bar', 'name')
+        self.rp.register('baz', baz.callback, keys=baz.keys, tfilter=baz.tfilter)
+        await self.advance(self.rp.interval)
+        self.assert_api_request(calls=2, tfilter=TorrentFilter('id=1|id=3|name~bar'),
+                                keys=('id', 'name', 'rate-up'))
+        self.assertEqual(tuple(foo.callback.args), (FAKE_TORRENTS[0],))
+        self.assertEqual(tuple(bar.callback.args), (FAKE_TORRENTS[0], FAKE_TORRENTS[2]))
+        self.assertEqual(tuple(baz.callback.args), (FAKE_TORRENTS[1],))
+        await self.rp.stop()
+
+    async def test_errors_are_reported_to_subscribers(self):
+        await self.rp.start()
+        errors = {'foo': [], 'bar': []}
+
+        def foo_error(error):
+            errors['foo'].append(error)
+
+        def bar_error(error):
+            errors['bar'].append(error)
+
+        foo, bar, baz = FakeCallback(), FakeCallback(), FakeCallback()
+        self.rp.register('foo', foo, on_error=foo_error)
+        self.rp.register('bar', bar, on_error=bar_error)
+        self.rp.register('baz', baz)
+        self.rp.pause('bar')
+        self.api.exc = ClientError('Nope')
+        await self.advance(0)
+        self.assertEqual([str(e) for e in errors['foo']], ['Nope'])
+        self.assertEqual(errors['bar'], [])
+
+        # Removed subscribers don't get errors anymore
+        self.rp.remove('foo')
+        self.rp.resume('bar')
+        self.api.exc = ClientError('Still nope')
+        await self.advance(0)
+        self.assertEqual(len(errors['foo']), 1)
+        self.assertEqual([str(e) for e in errors['bar']], ['Still nope'])
+        await self.rp.stop()
+
+    async def test_send_cached(self):
+        foo = Subscriber('name~foo', 'name')
+        self.rp.register('foo', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+        self.rp.send_cached()
+        self.assertEqual(self.api.calls, 0)
+        self.assertEqual(set(self.api.arg_keys), set(foo.keys_needed))
+        self.assertEqual(foo.callback.calls, 1)
+        self.assertEqual(tuple(foo.callback.args), (FAKE_TORRENTS[0],))
+        self.assertEqual(foo.callback.changes, None)
+
+    async def test_first_response_after_send_cached_has_no_changes(self):
+        await self.rp.start()
+        foo = Subscriber(None, 'name')
+        self.rp.register('foo', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+        self.rp.send_cached()
+        self.api.changes.change(2, ('name',))
+        await self.advance(0)
+        self.assertEqual(foo.callback.calls, 2)
+        self.assertEqual(foo.callback.changes, None)
+
+        self.api.changes.change(2, ('name',))
+        await self.advance(self.rp.interval)
+        self.assertEqual(foo.callback.changes.changed, {2: {'name'}})
+        await self.rp.stop()
+
+    async def test_resumed_subscribers_get_no_changes(self):
+        await self.rp.start()
+        foo = Subscriber(None, 'name')
+        bar = Subscriber(None, 'name')
+        self.rp.register('foo', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+        self.rp.register('bar', bar.callback, keys=bar.keys, tfilter=bar.tfilter)
+        await self.advance(0)
+
+        # Changes while bar is paused only go to foo
+        self.rp.pause('bar')
+        self.api.changes.change(2, ('name',))
+        await self.advance(self.rp.interval)
+        self.assertEqual(foo.callback.changes.changed, {2: {'name'}})
+
+        # bar must update everything because it missed changes
+        self.rp.resume('bar')
+        self.api.changes.change(3, ('name',))
+        await self.advance(0)
+        self.assertEqual(foo.callback.changes.changed, {3: {'name'}})
+        self.assertEqual(bar.callback.changes, None)
+
+        # Following responses report changes again
+        self.api.changes.change(1, ('name',))
+        await self.advance(self.rp.interval)
+        self.assertEqual(bar.callback.changes.changed, {1: {'name'}})
+        await self.rp.stop()
+
+    async def test_not_reporting_changes(self):
+        srvapi = SimpleNamespace(torrent=self.api)
+        rp = TorrentRequestPool(srvapi, report_changes=False)
+        await rp.start()
+        foo = Subscriber('name~foo', 'name')
+        rp.register('foo', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+
+        self.api.changes.add(1)
+        await self.advance(0)
+        self.assertEqual(foo.callback.calls, 1)
+        self.assertEqual(foo.callback.changes, None)
+        # Changes are left for other pools
+        self.assertEqual(self.api.changes.added, {1})
+
+        await rp.stop()
+
+    async def test_pausing_subscribers(self):
+        await self.rp.start()
+        foo = Subscriber('name~foo', 'name', 'rate-down')
+        bar = Subscriber('name~bar', 'name', 'rate-up')
+        self.rp.register('foo', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+        self.rp.register('bar', bar.callback, keys=bar.keys, tfilter=bar.tfilter)
+        await self.advance(0)
+        self.assert_api_request(calls=1, tfilter=foo.tfilter | bar.tfilter,
+                                keys=(foo + bar).keys_needed)
+
+        self.rp.pause('bar')
+        self.assertEqual(self.rp.is_paused('bar'), True)
+        await self.advance(self.rp.interval)
+        self.assert_api_request(calls=2, tfilter=foo.tfilter, keys=foo.keys_needed)
+        self.assertEqual((foo.callback.calls, bar.callback.calls), (2, 1))
+
+        # Paused subscribers are updated immediately when resumed
+        self.rp.resume('bar')
+        self.assertEqual(self.rp.is_paused('bar'), False)
+        await self.advance(0)
+        self.assert_api_request(calls=3, tfilter=foo.tfilter | bar.tfilter,
+                                keys=(foo + bar).keys_needed)
+        self.assertEqual((foo.callback.calls, bar.callback.calls), (3, 2))
+        self.assertEqual(tuple(bar.callback.args), (FAKE_TORRENTS[1],))
+
+        # No request is made if all subscribers are paused
+        self.rp.pause('foo')
+        self.rp.pause('bar')
+        self.assertEqual(self.rp.request, None)
+        self.assertEqual(self.rp.has_subscribers, True)
+
+        await self.rp.stop()
+
+    async def test_pools_do_not_share_subscriber_ids(self):
+        other_rp = TorrentRequestPool(SimpleNamespace(torrent=self.api))
+        foo = Subscriber('name~foo', 'name')
+        bar = Subscriber('name~bar', 'name')
+        self.rp.register('sid', foo.callback, keys=foo.keys, tfilter=foo.tfilter)
+        other_rp.register('sid', bar.callback, keys=bar.keys, tfilter=bar.tfilter)
+
+        other_rp.pause('sid')
+        self.assertEqual(self.rp.is_paused('sid'), False)
+        await self.rp.start()
+        await self.advance(0)
+        self.assertEqual((foo.callback.calls, bar.callback.calls), (1, 0))
+        await self.rp.stop()
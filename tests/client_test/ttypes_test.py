@@ -117,6 +117,38 @@ class TestStatus(unittest.TestCase):
                (ttypes.Status.SEED,)]
         self.assertEqual(sort, exp)
 
+    def test_bitmask(self):
+        Status = ttypes.Status
+        status = Status((Status.SEED, Status.STOPPED, Status.IDLE))
+        self.assertIsInstance(status, int)
+        self.assertEqual(status, Status.BITS[Status.STOPPED] | Status.BITS[Status.SEED]
+                         | Status.BITS[Status.IDLE])
+        self.assertEqual(Status(int(status)), status)
+        self.assertTrue(status & Status.BITS[Status.SEED])
+        self.assertFalse(status & Status.BITS[Status.UPLOAD])
+
+    def test_sequence(self):
+        Status = ttypes.Status
+        status = Status((Status.IDLE, Status.SEED, Status.STOPPED))
+        self.assertEqual(tuple(status), (Status.STOPPED, Status.SEED, Status.IDLE))
+        self.assertEqual(status[0], Status.STOPPED)
+        self.assertEqual(len(status), 3)
+        self.assertIn(Status.SEED, status)
+        self.assertNotIn(Status.UPLOAD, status)
+        self.assertNotIn('foo', status)
+        self.assertEqual(', '.join(status), 'stopped, seeding, idle')
+        self.assertEqual(str(status), "('stopped', 'seeding', 'idle')")
+        self.assertFalse(Status(()))
+        self.assertEqual(tuple(Status(())), ())
+
+    def test_rank(self):
+        Status = ttypes.Status
+        for status in Status.ORDER:
+            self.assertEqual(Status((status,)).rank, Status.ORDER.index(status))
+        self.assertEqual(Status((Status.STOPPED, Status.SEED)).rank,
+                         Status.ORDER.index(Status.STOPPED))
+        self.assertEqual(Status(()).rank, -1)
+
 
 MIN = ttypes.SECONDS[5][1]
 HOUR = ttypes.SECONDS[4][1]
@@ -0,0 +1,271 @@
+import unittest
+
+from ._handle_urwidpatches import setUpModule, tearDownModule  # noqa: F401
+
+
+def make_list_widget(sort=None):
+    # Importing views applies urwid patches, which must be removed after
+    # these tests
+    import urwid
+    from stig.client.sorters.base import SorterBase, SortSpec
+    from stig.tui.keymap import KeyMap
+    from stig.tui.table import ColumnHeaderWidget
+    from stig.tui.views.base import CellWidgetBase, ItemWidgetBase, ListWidgetBase, Style
+    from stig.tui.views.common_columns import MarkedBase
+
+    class NameCell(CellWidgetBase):
+        style = Style(prefix='test.name', focusable=False)
+        wrap = 'clip'
+
+        def get_value(self):
+            return self.data['name']
+
+    class MarkedCell(MarkedBase):
+        style = Style(prefix='test.marked', focusable=False)
+        header = urwid.AttrMap(ColumnHeaderWidget(), 'header')
+
+    class ItemWidget(ItemWidgetBase):
+        palette_unfocused = 'test'
+        rows_per_item     = 1
+
+        @property
+        def id(self):
+            return self.data['id']
+
+    class ListWidget(ListWidgetBase):
+        tuicolumns      = {'marked': MarkedCell, 'name': NameCell}
+        ListItemClass   = ItemWidget
+        keymap_context  = 'test'
+        palette_name    = 'test'
+        focusable_items = True
+
+        hidden_ids = frozenset()
+
+        def _limit_items(self, widgets):
+            hidden_ids = self.hidden_ids
+            for w in widgets:
+                if w.id in hidden_ids:
+                    yield w
+
+    class NameSorter(SorterBase):
+        SORTSPECS = {'name': SortSpec(lambda data: data['name'], description='name')}
+
+    if sort is not None:
+        sort = NameSorter((sort,))
+    return ListWidget(srvapi=None, keymap=KeyMap(), columns=('marked', 'name'), sort=sort)
+
+
+def hide_or_unhide_by_lookup(walker, widgets, limited_widgets):
+    """Reference implementation that looks up each widget in `walker`"""
+    hidden_ids = tuple(w.id for w in limited_widgets)
+    for w in widgets:
+        widget_is_visible = w in walker
+        hide_widget = w.id in hidden_ids
+        if hide_widget and widget_is_visible:
+            walker.remove(w)
+        elif not hide_widget and not widget_is_visible:
+            walker.append(w)
+
+
+class TestHidingAndUnhidingItems(unittest.TestCase):
+    def setUp(self):
+        self.lw = make_list_widget()
+
+    def make_data(self, ids):
+        return {id: {'id': id, 'name': 'Item %d' % id} for id in ids}
+
+    def render(self, data=None):
+        if data is not None:
+            self.lw._set_data(dict(data))
+        self.lw._invalidate()
+        self.lw.render((80, 30))
+
+    def assert_listed_ids(self, exp_ids):
+        listed_ids = [w.id for w in self.lw._listbox.body]
+        self.assertEqual(len(listed_ids), len(set(listed_ids)))
+        self.assertEqual(set(listed_ids), set(exp_ids))
+
+    def test_filtered_items_are_hidden(self):
+        data = self.make_data(range(100))
+        self.render(data)
+        self.assert_listed_ids(range(100))
+
+        self.lw.hidden_ids = frozenset(range(0, 100, 2))
+        self.render()
+        self.assert_listed_ids(range(1, 100, 2))
+
+        self.lw.hidden_ids = frozenset(range(0, 100, 3))
+        self.render()
+        self.assert_listed_ids(id for id in range(100) if id % 3 != 0)
+
+        self.lw.hidden_ids = frozenset()
+        self.render()
+        self.assert_listed_ids(range(100))
+
+    def test_new_and_removed_items(self):
+        self.lw.hidden_ids = frozenset((0, 1, 2, 101))
+        self.render(self.make_data(range(100)))
+        self.assert_listed_ids(range(3, 100))
+
+        # Remove visible and hidden items, add visible and hidden items
+        data = self.make_data(id for id in range(102) if id not in (2, 50))
+        self.render(data)
+        self.assert_listed_ids(id for id in range(3, 101) if id != 50)
+        self.assertEqual(set(self.lw._existing_widgets), set(data))
+
+        self.lw.hidden_ids = frozenset()
+        self.render()
+        self.assert_listed_ids(id for id in range(102) if id not in (2, 50))
+
+    def test_cleared_items_are_listed_again(self):
+        self.render(self.make_data(range(10)))
+        self.lw.clear()
+        self.assert_listed_ids(())
+        self.render()
+        self.assert_listed_ids(range(10))
+
+    def test_same_result_as_lookup(self):
+        ids = range(300)
+        self.lw.hidden_ids = frozenset(range(0, 300, 3))
+        self.render(self.make_data(ids))
+
+        # Secondary filter hides or unhides 10 items
+        self.lw.hidden_ids = frozenset(range(0, 300, 3)) ^ frozenset(range(100, 110))
+        widgets = tuple(self.lw._existing_widgets.values())
+        walker = list(self.lw._listbox.body)
+        hide_or_unhide_by_lookup(walker, widgets, tuple(self.lw._limit_items(widgets)))
+        self.lw._hide_or_unhide_widgets()
+
+        exp_ids = set(id for id in ids if id not in self.lw.hidden_ids)
+        self.assertEqual(set(w.id for w in walker), exp_ids)
+        self.assert_listed_ids(exp_ids)
+
+
+class TestSortingItems(unittest.TestCase):
+    def setUp(self):
+        self.lw = make_list_widget(sort='name')
+
+    def render(self, names, changed_ids=None):
+        self.lw._set_data({id: {'id': id, 'name': name} for id,name in names.items()},
+                          changed_ids=changed_ids)
+        self.lw._invalidate()
+        self.lw.render((80, 30))
+
+    def assert_listed(self, names):
+        self.assertEqual([(w.id, w.data['name']) for w in self.lw._listbox.body], names)
+
+    def test_changed_items_are_moved(self):
+        names = {1: 'a', 2: 'b', 3: 'c'}
+        self.render(names)
+        self.assert_listed([(1, 'a'), (2, 'b'), (3, 'c')])
+        names[1] = 'd'
+        self.render(names, changed_ids=(1,))
+        self.assert_listed([(2, 'b'), (3, 'c'), (1, 'd')])
+
+    def test_changes_while_not_visible_are_not_missed(self):
+        names = {1: 'a', 2: 'b', 3: 'c'}
+        self.render(names)
+
+        # Changes while the list is not displayed are not reported
+        self.lw.visible = False
+        names[1] = 'd'
+        self.lw.visible = True
+        names[2] = 'e'
+        self.render(names, changed_ids=(2,))
+        self.assert_listed([(3, 'c'), (1, 'd'), (2, 'e')])
+
+
+class TestBuildingItemsLazily(unittest.TestCase):
+    rows = 30
+
+    def setUp(self):
+        self.lw = make_list_widget(sort='name')
+        self.render({id: 'Item %03d' % id for id in range(500)})
+
+    def render(self, names=None, changed_ids=None):
+        if names is not None:
+            self.lw._set_data({id: {'id': id, 'name': name} for id,name in names.items()},
+                              changed_ids=changed_ids)
+        self.lw._invalidate()
+        canvas = self.lw.render((80, self.rows))
+        # Remove scrollbar and collapse whitespace between cells
+        return [' '.join(line.decode()[:-1].split()) for line in canvas.text]
+
+    @property
+    def built_ids(self):
+        return set(id for id,w in self.lw._existing_widgets.items() if w.is_built)
+
+    def assert_built_near_focus(self):
+        from stig.tui.views.base import KEEP_ROWS_SCREENS
+        walker = self.lw._listbox.body
+        focus = self.lw.focus_position
+        distance = self.rows * KEEP_ROWS_SCREENS
+        near_ids = set(w.id for w in walker[max(0, focus - distance):focus + distance + 1])
+        self.assertTrue(self.built_ids)
+        self.assertLessEqual(self.built_ids, near_ids)
+        self.assertEqual(set(self.lw._table._members), self.built_ids)
+
+    def test_rows_are_known_without_building(self):
+        # The scrollbar gets the height of every item
+        self.assertEqual(len(self.lw._listbox.body), 500)
+        self.assert_built_near_focus()
+        self.assertLess(len(self.built_ids), 500)
+        w = self.lw._existing_widgets[499]
+        self.assertEqual(w.is_built, False)
+        self.assertEqual(w.rows((80,)), 1)
+        self.assertEqual(w.is_built, False)
+
+    def test_table_rows_are_unregistered(self):
+        self.lw.focus_position = 499
+        self.render()
+        self.assert_built_near_focus()
+        self.assertEqual(self.lw._existing_widgets[0].is_built, False)
+
+        # Rows of removed items are unregistered, built or not
+        names = {id: 'Item %03d' % id for id in range(500) if id not in (0, 498)}
+        self.render(names)
+        self.assertNotIn(498, self.lw._existing_widgets)
+        self.assert_built_near_focus()
+
+    def test_marks_on_unbuilt_items(self):
+        self.lw.mark(all=True)
+        self.assertEqual(self.lw.marked_count, 500)
+        self.assertLess(len(self.built_ids), 500)
+        self.assertTrue(all(w.is_marked for w in self.lw._existing_widgets.values()))
+
+        # Items that are built later display their mark
+        self.lw.focus_position = 400
+        lines = self.render()
+        self.assertIn('# Item 400', lines)
+        self.assertEqual(self.lw._existing_widgets[400]._cells.marked.is_marked, True)
+
+        # Unmarking doesn't need cells either
+        self.lw.focus_position = 0
+        self.render()
+        self.lw.unmark(all=True)
+        self.assertEqual(self.lw.marked_count, 0)
+        self.assertEqual(self.lw._existing_widgets[400].is_built, False)
+        self.lw.focus_position = 400
+        lines = self.render()
+        self.assertIn('Item 400', lines)
+
+    def test_focus_and_sort_across_released_items(self):
+        names = {id: 'Item %03d' % id for id in range(500)}
+        self.lw.focus_position = 450
+        self.render()
+        self.assertEqual(self.lw._existing_widgets[10].is_built, False)
+
+        # A released item is moved to its sorted position without building it
+        # and focus stays on the same item
+        names[10] = 'Item 999'
+        self.render(names, changed_ids=(10,))
+        self.assertEqual(self.lw.focused_id, 450)
+        self.assertEqual([w.id for w in self.lw._listbox.body][-1], 10)
+        self.assertEqual([w.data['name'] for w in self.lw._listbox.body], sorted(names.values()))
+
+        # Items are built again with current data when they are displayed
+        self.lw.focus_position = len(self.lw._listbox.body) - 1
+        lines = self.render()
+        self.assertEqual(self.lw.focused_id, 10)
+        self.assertIn('Item 999', lines)
+        self.assert_built_near_focus()
@@ -0,0 +1,95 @@
+from unittest.mock import Mock, patch
+
+import urwid
+
+import asynctest
+
+from stig.tui import mainloop
+from stig.tui.mainloop import MainLoop
+
+
+class FakeScreen(urwid.display_common.BaseScreen):
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+        self.frames = []
+        self.frame_times = []
+        self.input_callback = None
+
+    def hook_event_loop(self, event_loop, callback):
+        self.input_callback = callback
+
+    def unhook_event_loop(self, event_loop):
+        self.input_callback = None
+
+    def get_cols_rows(self):
+        return (10, 1)
+
+    def draw_screen(self, size, canvas):
+        self.frames.append(canvas.text[0].decode().strip())
+        self.frame_times.append(self.clock())
+
+
+class TestMainLoop(asynctest.ClockedTestCase):
+    def setUp(self):
+        # Frames are timed by the test loop's clock
+        patcher = patch.object(mainloop, 'time', Mock(monotonic=self.loop.time))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.text = urwid.Text('')
+        self.screen = FakeScreen(clock=self.loop.time)
+        self.mainloop = MainLoop(urwid.Filler(self.text),
+                                 screen=self.screen,
+                                 event_loop=urwid.AsyncioEventLoop(loop=self.loop),
+                                 unhandled_input=self.text.set_text,
+                                 handle_mouse=False,
+                                 max_fps=10)
+
+    async def run_mainloop(self, seconds):
+        self.start_time = self.loop.time()
+        self.mainloop.start()
+        try:
+            await self.advance(seconds)
+        finally:
+            self.mainloop.stop()
+
+    @property
+    def frame_times(self):
+        """Seconds after start of the main loop when frames were drawn"""
+        return [round(t - self.start_time, 3) for t in self.screen.frame_times]
+
+    async def test_first_frame_is_drawn_immediately(self):
+        self.text.set_text('foo')
+        await self.run_mainloop(0.01)
+        self.assertEqual(self.screen.frames, ['foo'])
+
+    async def test_nothing_is_drawn_if_nothing_changes(self):
+        await self.run_mainloop(1)
+        self.assertEqual(self.screen.frames, [''])
+
+    async def test_invalidations_are_drawn_together(self):
+        def change_text(n):
+            self.text.set_text(str(n))
+            if n < 50:
+                self.loop.call_later(0.01, change_text, n + 1)
+        self.loop.call_soon(change_text, 1)
+        await self.run_mainloop(1)
+        # 50 changes in 0.5 seconds at 10 frames per second
+        self.assertEqual(self.screen.frames, ['1', '11', '20', '30', '40', '50'])
+        self.assertEqual(self.frame_times, [0, 0.1, 0.2, 0.3, 0.4, 0.5])
+
+    async def test_input_is_drawn_before_next_frame(self):
+        self.mainloop.max_fps = 1
+
+        def change_text():
+            self.text.set_text('update')
+            self.loop.call_later(0.01, self.screen.input_callback, ['x'], [120])
+        self.loop.call_later(0.05, change_text)
+        await self.run_mainloop(0.2)
+        self.assertEqual(self.screen.frames, ['', 'x'])
+        self.assertEqual(self.frame_times, [0, 0.06])
+
+    def test_invalid_max_fps(self):
+        with self.assertRaises(ValueError):
+            self.mainloop.max_fps = 0
@@ -438,6 +438,24 @@ class TestTabs(unittest.TestCase):
             tabs.move(-4, 0)
         assert str(cm.exception) == 'No tab at position: -4'
 
+    def test_visibility(self):
+        class Content(urwid.Text):
+            visible = None
+
+        c1, c2, c3, c4 = Content('1'), Content('2'), Content('3'), Content('4')
+        tabs = Tabs((urwid.Text('Tab1'), c1), (urwid.Text('Tab2'), c2))
+        self.assertEqual((c1.visible, c2.visible), (False, True))
+        tabs.focus_position = 0
+        self.assertEqual((c1.visible, c2.visible), (True, False))
+        tabs.insert(urwid.Text('Tab3'), c3, focus=False)
+        self.assertEqual((c1.visible, c2.visible, c3.visible), (True, False, False))
+        tabs.move(0, 'right')
+        self.assertEqual((c1.visible, c2.visible, c3.visible), (True, False, False))
+        tabs.set_content(c4, position=tabs.focus_position)
+        self.assertEqual((c1.visible, c4.visible), (False, True))
+        tabs.remove()
+        self.assertEqual((c2.visible, c3.visible, c4.visible), (False, True, False))
+
 
 class TestTabsKeyPress(unittest.TestCase):
     def setUp(self):